@@ -5,6 +5,19 @@ end
 function onReceiveOSC(message, connections)
     welcomeScreen(false)
     
+    if message[1] == "/ping" then
+        -- latency probe: echo on the same connection, adding our clock
+        local arguments = message[2]
+        arguments[#arguments + 1] = { tag = 'f', value = getMillis() }
+        sendOSC({ "/pong", arguments }, connections)
+        return true
+    end
+    
+    if message[1] == "/stats" then
+        showStats(message[2])
+        return true
+    end
+    
     if not message[1]:match("_control$") then
         return  -- pass to routing table
     end
@@ -100,6 +113,26 @@ function updateColor(control, r,g,b)
   end
 end
 
+-- /stats reply: <first> then alternating name, value arguments, split over
+-- several messages; first is the index of the message's first pair and 0
+-- starts a new reply. Shown in the label named "stats" on the Stats page.
+local statsLines = {}
+
+function showStats(arguments)
+  local label = self:findByName("stats", true)
+  if not label or #arguments < 1 then
+    return
+  end
+  local first = math.floor(tonumber(arguments[1].value) or 0)
+  if first == 0 then
+    statsLines = {}
+  end
+  for i = 2, #arguments - 1, 2 do
+    statsLines[first + i // 2] = string.format("%s: %g", arguments[i].value, arguments[i + 1].value)
+  end
+  label.values.text = table.concat(statsLines, "\n")
+end
+
 function welcomeScreen(visible)
   self.children.WelcomeScreen.visible = visible
   self.children.WelcomeScreen.children.bg.visible = visible
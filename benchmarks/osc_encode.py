@@ -0,0 +1,112 @@
+"""
+BasicTouch benchmark - OSC message encoding throughput.
+
+Compares the previous per-call encoding against the template-cached encoder
+for the messages BasicTouch sends most: fader/XY/color values every frame and
+the static /hide_control burst on setup.
+
+    python benchmarks/osc_encode.py [--seconds 1.0] [--min-speedup 1.5]
+
+Exits non-zero when the cached path is slower than --min-speedup times the
+previous one, so it can guard against regressions.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+SOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sources')
+
+
+def load_source(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SOURCES, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def workload():
+    """Messages in the proportions of a running show."""
+    messages = []
+    for i in range(1, 17):
+        messages.append((f'/fader{i}', [i / 17.0]))
+    for i in range(1, 5):
+        messages.append((f'/xy{i}', [0.25, 0.75]))
+    for i in range(1, 4):
+        messages.append((f'/color{i}', [0.1, 0.2, 0.3]))
+    messages.append(('/radio1', [2]))
+    return messages
+
+
+def hide_burst(control_limits):
+    return [('/hide_control', [control_type, i])
+            for control_type, count in control_limits.items()
+            for i in range(1, count + 1)]
+
+
+def legacy_encoder(encoder):
+    """The encoding BasicTouch used before templates: every string re-encoded, every arg packed."""
+    def build(address, args):
+        tags = [',']
+        data_parts = []
+        for a in (args or []):
+            t, d = encoder._pack_arg(a)
+            tags.append(t)
+            data_parts.append(d)
+        return b''.join((encoder._pack_string(address), encoder._pack_string(''.join(tags)),
+                         b''.join(data_parts)))
+    return build
+
+
+def rate(fn, messages, seconds):
+    """Messages per second for fn(address, args) over the given workload."""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for address, args in messages:
+            fn(address, args)
+        count += len(messages)
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument('--min-speedup', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    osc = load_source('OSC')
+    encoder = osc.OSCEncoder()
+    limits = {"label": 24, "fader": 16, "button": 16, "color": 3,
+              "radio": 4, "xy": 4, "plabel": 10, "pbutton": 10}
+
+    legacy = legacy_encoder(encoder)
+    values = workload()
+    hides = hide_burst(limits)
+
+    # Both paths must produce identical packets
+    for address, argv_ in values + hides:
+        assert encoder.encode(address, argv_) == legacy(address, argv_), address
+        assert encoder.encode_static(address, argv_) == legacy(address, argv_), address
+
+    results = [
+        ('values  before', rate(legacy, values, args.seconds)),
+        ('values  after', rate(encoder.encode, values, args.seconds)),
+        ('hide    before', rate(legacy, hides, args.seconds)),
+        ('hide    after', rate(encoder.encode_static, hides, args.seconds)),
+    ]
+    for label, value in results:
+        print(f'{label:<16} {value:>12,.0f} msg/s')
+
+    speedup = results[1][1] / results[0][1]
+    print(f'speedup (values) {speedup:>12.2f}x')
+    if speedup < args.min_speedup:
+        print(f'FAIL: speedup below {args.min_speedup}x')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
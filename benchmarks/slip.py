@@ -0,0 +1,122 @@
+"""
+BasicTouch benchmark - SLIP framing throughput.
+
+Measures SlipCodec against the previous per-byte encoder/decoder on the
+stream of a burst of fader messages. tests/test_osc.py checks that both
+give the same frames on a fuzz corpus.
+
+    python benchmarks/slip.py [--seconds 1.0]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+SOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sources')
+
+END, ESC, ESC_END, ESC_ESC = 0xC0, 0xDB, 0xDC, 0xDD
+
+
+def load_source(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SOURCES, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_encode(payload):
+    encoded = bytearray((END,))
+    for b in payload:
+        if b == END:
+            encoded.extend((ESC, ESC_END))
+        elif b == ESC:
+            encoded.extend((ESC, ESC_ESC))
+        else:
+            encoded.append(b)
+    encoded.append(END)
+    return bytes(encoded)
+
+
+def legacy_decode(incoming):
+    """The previous per-byte decoder, for a single read."""
+    frames = []
+    frame = bytearray()
+    esc = False
+    for byte in incoming:
+        if esc:
+            if byte == ESC_END:
+                frame.append(END)
+            elif byte == ESC_ESC:
+                frame.append(ESC)
+            else:
+                frame.append(byte)
+            esc = False
+            continue
+        if byte == ESC:
+            esc = True
+            continue
+        if byte == END:
+            if frame:
+                frames.append(bytes(frame))
+                frame.clear()
+            continue
+        frame.append(byte)
+    return frames
+
+
+def throughput(fn, chunks, seconds):
+    total = sum(len(c) for c in chunks)
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        fn(chunks)
+        count += 1
+    return count * total / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    osc = load_source('OSC')
+
+    encoder = osc.OSCEncoder()
+    packets = [encoder.encode(f'/fader{i % 16 + 1}', [i / 1000.0]) for i in range(1000)]
+    stream = b''.join(legacy_encode(p) for p in packets)
+    # TCP reads of ~1.5 kB, so frames straddle reads
+    chunks = [stream[i:i + 1460] for i in range(0, len(stream), 1460)]
+
+    def old_decode(chunks):
+        for c in chunks:
+            legacy_decode(c)
+
+    codec = osc.SlipCodec()
+
+    def new_decode(chunks):
+        for c in chunks:
+            codec.decode(c)
+
+    def old_encode(_):
+        for p in packets:
+            legacy_encode(p)
+
+    def new_encode(_):
+        for p in packets:
+            codec.encode(p)
+
+    results = [
+        ('decode before', throughput(old_decode, chunks, args.seconds)),
+        ('decode after', throughput(new_decode, chunks, args.seconds)),
+        ('encode before', throughput(old_encode, chunks, args.seconds)),
+        ('encode after', throughput(new_encode, chunks, args.seconds)),
+    ]
+    for label, value in results:
+        print(f'{label:<16} {value / 1e6:>10.2f} MB/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,528 @@
+"""
+BasicTouch benchmark - end-to-end socket soak test.
+
+Runs the extension on the stand-in runtime with its OSC In / OSC Out /
+TCP/IP DATs backed by real localhost sockets, against a simulated TouchOSC
+surface running in a separate process:
+
+    1. the surface says hello (UDP) or connects (TCP) and BasicTouch runs
+       "Setup Controls";
+    2. the surface collects the /modify_control setup and, once /tabs ends
+       it, moves N of the faders/XYs it was given at M Hz;
+    3. every value is the tick number it was sent in, encoded exactly in a
+       float32, so the harness can tell from the target's parameters which
+       tick was applied, when, and in which order.
+
+Per run it reports:
+
+    loss %     messages the surface sent that never reached the DAT
+    latency    from sending a value to the end of the frame in which it, or
+               a newer value of the same control, was applied (values the
+               extension coalesces away count until they are superseded)
+    reord      values applied after a newer one of the same control
+    final      controls that ended on the last value sent
+    frame p95  extension time per frame; above 1/fps TouchDesigner drops frames
+    late       ticks the surface process itself sent behind schedule
+
+A run is sustained ("ok") with no loss or reordering, every control final,
+p99 latency within three frames and frame p95 within one.
+
+    python benchmarks/soak.py [--transports udp,tcp] [--controls 4,20]
+                              [--rates 30,60,120,240,480] [--seconds 3]
+                              [--fps 60] [--save benchmarks/results/soak.json]
+
+Both processes timestamp with time.monotonic_ns(), which is one clock across
+processes on Linux, macOS and Windows. Nothing leaves 127.0.0.1.
+"""
+import argparse
+import json
+import os
+import select
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+SEQ_SCALE = 1 << 21  # tick k travels as (k + 1) / 2**21, exact in a float32
+HELLO = '/soak/hello'
+
+
+# ---------------------------------------------------------
+# OSC codec of the simulated surface and the socket DATs
+# (independent of sources/OSC.py, like TouchOSC and the OSC DATs are)
+# ---------------------------------------------------------
+def _osc_string(value: str) -> bytes:
+    data = value.encode('utf-8') + b'\x00'
+    return data + b'\x00' * (-len(data) % 4)
+
+
+def _osc_args(args, tags, data):
+    for arg in args:
+        if isinstance(arg, bool):
+            tags.append('T' if arg else 'F')
+        elif arg is None:
+            tags.append('N')
+        elif isinstance(arg, int):
+            tags.append('i')
+            data.append(struct.pack('>i', arg))
+        elif isinstance(arg, float):
+            tags.append('f')
+            data.append(struct.pack('>f', arg))
+        elif isinstance(arg, (list, tuple)):
+            tags.append('[')
+            _osc_args(arg, tags, data)
+            tags.append(']')
+        else:
+            tags.append('s')
+            data.append(_osc_string(str(arg)))
+
+
+def encode_message(address: str, args) -> bytes:
+    tags, data = [','], []
+    _osc_args(args, tags, data)
+    return _osc_string(address) + _osc_string(''.join(tags)) + b''.join(data)
+
+
+def _read_string(data: bytes, off: int):
+    end = data.index(b'\x00', off)
+    return data[off:end].decode('utf-8', errors='replace'), (end + 4) & ~3
+
+
+def decode_packet(data: bytes):
+    """(address, args) of every message in a packet, bundles flattened."""
+    if data.startswith(b'#bundle\x00'):
+        messages = []
+        off = 16
+        while off + 4 <= len(data):
+            size = struct.unpack_from('>i', data, off)[0]
+            messages += decode_packet(data[off + 4:off + 4 + size])
+            off += 4 + size
+        return messages
+    address, off = _read_string(data, 0)
+    tags, off = _read_string(data, off)
+    args = []
+    stack = [args]
+    for tag in tags[1:]:
+        if tag in 'if':
+            stack[-1].append(struct.unpack_from('>' + tag, data, off)[0])
+            off += 4
+        elif tag in 'hd':
+            stack[-1].append(struct.unpack_from('>' + ('q' if tag == 'h' else 'd'), data, off)[0])
+            off += 8
+        elif tag == 's':
+            value, off = _read_string(data, off)
+            stack[-1].append(value)
+        elif tag == 'b':
+            size = struct.unpack_from('>i', data, off)[0]
+            stack[-1].append(data[off + 4:off + 4 + size])
+            off += 4 + size + (-size % 4)
+        elif tag in 'TFN':
+            stack[-1].append({'T': True, 'F': False, 'N': None}[tag])
+        elif tag == '[':
+            stack[-1].append([])
+            stack.append(stack[-1][-1])
+        elif tag == ']':
+            stack.pop()
+    return [(address, args)]
+
+
+SLIP_END, SLIP_ESC = b'\xc0', b'\xdb'
+
+
+def slip_encode(packet: bytes) -> bytes:
+    body = packet.replace(SLIP_ESC, b'\xdb\xdd').replace(SLIP_END, b'\xdb\xdc')
+    return SLIP_END + body + SLIP_END
+
+
+class SlipDecoder:
+    def __init__(self):
+        self.buffer = b''
+
+    def feed(self, data: bytes):
+        self.buffer += data
+        *frames, self.buffer = self.buffer.split(SLIP_END)
+        return [frame.replace(b'\xdb\xdc', SLIP_END).replace(b'\xdb\xdd', SLIP_ESC)
+                for frame in frames if frame]
+
+
+def readable(sock, timeout=0.0) -> bool:
+    return bool(select.select([sock], [], [], timeout)[0])
+
+
+class SocketOSCOutDAT(touchdesigner.OSCOutDAT):
+    """OSC Out DAT sending UDP datagrams to the surface once its address is known."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.address = None
+
+    def sendOSC(self, address, args):
+        super().sendOSC(address, args)
+        self._send(encode_message(address, args))
+
+    def sendBytes(self, data):
+        super().sendBytes(data)
+        self._send(data)
+
+    def _send(self, data):
+        if self.address is not None:
+            self.sock.sendto(data, self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+class SocketOSCInDAT(touchdesigner.TableDAT):
+    """OSC In DAT on a UDP port; poll() hands every message to the extension's callback."""
+
+    def __init__(self, path, out: SocketOSCOutDAT):
+        super().__init__(path)
+        self.out = out
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.received = {}  # address -> messages
+
+    def poll(self, ext):
+        while readable(self.sock):
+            data, peer = self.sock.recvfrom(65536)
+            for address, args in decode_packet(data):
+                if address == HELLO:
+                    # Network Address of the OSC Out DAT points at the surface
+                    self.out.address = peer
+                    continue
+                self.received[address] = self.received.get(address, 0) + 1
+                ext.OnReceiveOSC_UDP(self, 0, None, data, None, address, args, peer)
+
+    def close(self):
+        self.sock.close()
+
+
+class SocketTCPIPDAT(touchdesigner.TCPIPDAT):
+    """TCP/IP DAT in server mode; the surface connects to it."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.conn = None
+        self.decoder = SlipDecoder()
+        self.received = {}
+
+    def sendBytes(self, data):
+        super().sendBytes(data)
+        if self.conn is not None:
+            self.conn.sendall(data)
+
+    def poll(self, ext):
+        if self.conn is None:
+            if readable(self.server):
+                self.conn, _ = self.server.accept()
+                self.conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.conn.settimeout(5.0)
+                ext.OnConnect()
+            return
+        while readable(self.conn):
+            data = self.conn.recv(65536)
+            if not data:
+                self.conn.close()
+                self.conn = None
+                return
+            # Count what arrived before the extension's own SLIP/OSC decoder sees it
+            for frame in self.decoder.feed(data):
+                for address, _ in decode_packet(frame):
+                    self.received[address] = self.received.get(address, 0) + 1
+            ext.OnReceiveOSC_TCP(data)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.server.close()
+
+
+# ---------------------------------------------------------
+# Simulated TouchOSC surface (runs in its own process)
+# ---------------------------------------------------------
+class Surface:
+    def __init__(self, transport, port):
+        self.transport = transport
+        if transport == 'tcp':
+            self.sock = socket.create_connection(('127.0.0.1', port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.decoder = SlipDecoder()
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self.sock.bind(('127.0.0.1', 0))
+            self.target = ('127.0.0.1', port)
+        self.controls = {}  # address -> control type, from /modify_control
+        self.received = {}  # address -> messages from BasicTouch
+        self.setup_done = False
+
+    def send(self, address, args):
+        packet = encode_message(address, args)
+        if self.transport == 'tcp':
+            self.sock.sendall(slip_encode(packet))
+        else:
+            self.sock.sendto(packet, self.target)
+
+    def receive(self, timeout):
+        """Handle what BasicTouch sent, waiting at most `timeout` seconds for the first packet."""
+        while readable(self.sock, timeout):
+            timeout = 0.0
+            if self.transport == 'tcp':
+                data = self.sock.recv(65536)
+                if not data:
+                    raise ConnectionError('BasicTouch closed the connection')
+                packets = self.decoder.feed(data)
+            else:
+                packets = [self.sock.recv(65536)]
+            for packet in packets:
+                for address, args in decode_packet(packet):
+                    self.handle(address, args)
+
+    def handle(self, address, args):
+        self.received[address] = self.received.get(address, 0) + 1
+        if address == '/modify_control' and args[0] in ('fader', 'xy'):
+            self.controls[f'/{args[0]}{args[1]}'] = args[0]
+        elif address == '/hide_control' and args[0] in ('fader', 'xy'):
+            self.controls.pop(f'/{args[0]}{args[1]}', None)
+        elif address == '/tabs':
+            self.setup_done = True
+
+
+def peer_main(args):
+    surface = Surface(args.transport, args.port)
+    deadline = time.monotonic() + 10.0
+    while not surface.setup_done:
+        if surface.transport == 'udp':
+            surface.send(HELLO, [])
+        surface.receive(0.05)
+        if time.monotonic() > deadline:
+            raise TimeoutError('no setup from BasicTouch')
+    surface.receive(0.2)  # rest of the setup
+
+    # Faders and XYs alternate so both paths are loaded
+    faders = [(a, t) for a, t in surface.controls.items() if t == 'fader']
+    xys = [(a, t) for a, t in surface.controls.items() if t == 'xy']
+    mixed = [control for pair in zip(faders, xys) for control in pair]
+    driven = (mixed + faders[len(xys):] + xys[len(faders):])[:args.controls]
+
+    ticks = max(1, int(args.seconds * args.rate))
+    sent_ns = []
+    start = time.monotonic()
+    behind = 0
+    for tick in range(ticks):
+        due = start + tick / args.rate
+        wait = due - time.monotonic()
+        if wait > 0:
+            surface.receive(wait)
+            while time.monotonic() < due:
+                pass
+        else:
+            behind += 1
+        value = (tick + 1) / SEQ_SCALE
+        sent_ns.append(time.monotonic_ns())
+        for address, control_type in driven:
+            surface.send(address, [value, value] if control_type == 'xy' else [value])
+    surface.receive(0.3)
+
+    json.dump({
+        'controls': [address for address, _ in driven],
+        'sent_ns': sent_ns,
+        'messages': ticks * len(driven),
+        'behind': behind,
+        'received': surface.received,
+    }, sys.stdout)
+    return 0
+
+
+# ---------------------------------------------------------
+# Harness (plays TouchDesigner)
+# ---------------------------------------------------------
+def soak_pars():
+    """16 float faders and 4 XY pads: a full page of moving controls."""
+    pars = [(f'Fader{i}', 'Float', {'value': 0.0, 'label': f'Fader {i}'}) for i in range(1, 17)]
+    pars += [(f'Pad{i}', 'XY', {'value': 0.0, 'label': f'Pad {i}'}) for i in range(1, 5)]
+    return pars
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+def run_soak(transport, controls, rate, seconds, fps):
+    runtime = touchdesigner.Runtime()
+    owner = runtime.owner.path
+    out = runtime.add(SocketOSCOutDAT(f'{owner}/oscout2'))
+    osc_in = runtime.add(SocketOSCInDAT(f'{owner}/oscin2', out))
+    tcp = runtime.add(SocketTCPIPDAT(f'{owner}/tcpip1'))
+    target = runtime.addTarget(TARGET, soak_pars())
+    # Tall enough for all 20 controls on the first page
+    ext = runtime.createExtension(Base=TARGET, Udptcp=transport == 'tcp', Templateresolutionh=2048)
+    dat = tcp if transport == 'tcp' else osc_in
+
+    peer = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--peer', '--transport', transport,
+         '--port', str(dat.port), '--controls', str(controls), '--rate', str(rate),
+         '--seconds', str(seconds)],
+        stdout=subprocess.PIPE, text=True)
+
+    frame_s = 1.0 / fps
+    frame_ms = []
+    observed = {}  # address -> [(tick, applied ns)]
+    last = {}      # address -> last normVal seen
+    started = False
+    try:
+        # Surface first: the hello gives the OSC Out DAT its address, TCP connects
+        deadline = time.monotonic() + 10.0
+        while not (tcp.conn if transport == 'tcp' else out.address):
+            dat.poll(ext)
+            if time.monotonic() > deadline or peer.poll() is not None:
+                raise RuntimeError('simulated surface did not show up')
+            time.sleep(0.005)
+
+        next_frame = time.monotonic()
+        while True:
+            t0 = time.perf_counter()
+            dat.poll(ext)
+            if not started:
+                ext.Start(full=True)
+                started = True
+            runtime.step()
+            now = time.monotonic_ns()
+            control_map = ext.osc_manager.control_map or {}
+            for (control_type, index), par in control_map.items():
+                if control_type not in ('fader', 'xy'):
+                    continue
+                value = par.normVal
+                address = f'/{control_type}{index}'
+                if value != last.get(address, 0.0):
+                    last[address] = value
+                    observed.setdefault(address, []).append((round(value * SEQ_SCALE) - 1, now))
+            frame_ms.append((time.perf_counter() - t0) * 1000.0)
+
+            if peer.poll() is not None:
+                dat.poll(ext)
+                break
+            next_frame += frame_s
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.monotonic()  # dropped frames, TouchDesigner does not catch up
+        report = json.loads(peer.stdout.read() or '{}')
+    finally:
+        if peer.poll() is None:
+            peer.kill()
+        peer.wait()
+        for closable in (out, osc_in, tcp):
+            closable.close()
+
+    if not report.get('controls'):
+        raise RuntimeError('simulated surface got no fader or XY controls to drive')
+    sent_ns = report['sent_ns']
+    # Every tick sent counts, also the ones coalesced away: its latency is
+    # until a value at least as new was applied
+    latencies = []
+    reordered = 0
+    final_ok = 0
+    for address in report['controls']:
+        newest = -1
+        for tick, applied in observed.get(address, ()):
+            if tick < newest:
+                reordered += 1
+                continue
+            for covered in range(newest + 1, min(tick + 1, len(sent_ns))):
+                latencies.append((applied - sent_ns[covered]) / 1e6)
+            newest = tick
+        if newest == len(sent_ns) - 1:
+            final_ok += 1
+    received = sum(dat.received.get(address, 0) for address in report['controls'])
+    latencies.sort()
+    frame_ms.sort()
+    return {
+        'transport': transport,
+        'controls': len(report['controls']),
+        'rate_hz': rate,
+        'messages': report['messages'],
+        'loss_pct': 100.0 * (1.0 - received / report['messages']) if report['messages'] else 0.0,
+        'applied_pct': 100.0 * len(latencies) / (len(sent_ns) * len(report['controls'])),
+        'latency_p50_ms': percentile(latencies, 0.5),
+        'latency_p95_ms': percentile(latencies, 0.95),
+        'latency_p99_ms': percentile(latencies, 0.99),
+        'latency_max_ms': latencies[-1] if latencies else None,
+        'reordered': reordered,
+        'final_ok': final_ok,
+        'frame_p95_ms': percentile(frame_ms, 0.95),
+        'frames_over_budget': sum(1 for ms in frame_ms if ms > frame_s * 1000.0),
+        'surface_behind': report['behind'],
+        'in_errors': ext.stats.counters.get('in errors', 0),
+    }
+
+
+def sustained(result, fps) -> bool:
+    """No loss or reordering, every control on its last value, p99 within three frames
+    and 95% of the frames within their budget."""
+    return (result['loss_pct'] == 0.0 and result['reordered'] == 0
+            and result['final_ok'] == result['controls'] and not result['in_errors']
+            and result['latency_p99_ms'] is not None
+            and result['latency_p99_ms'] <= 3000.0 / fps
+            and result['frame_p95_ms'] <= 1000.0 / fps)
+
+
+def _ms(value):
+    return f'{value:8.2f}' if value is not None else '       -'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transports', default='udp,tcp')
+    parser.add_argument('--controls', default='4,20', help='moving controls per run (at most 20)')
+    parser.add_argument('--rates', default='30,60,120,240,480', help='updates per second per control')
+    parser.add_argument('--seconds', type=float, default=3.0, help='length of each run')
+    parser.add_argument('--fps', type=float, default=60.0, help='frame rate of the stand-in')
+    parser.add_argument('--save', help='write results to this JSON file')
+    # Simulated surface process
+    parser.add_argument('--peer', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--transport', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--rate', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.peer:
+        args.controls = int(args.controls)
+        return peer_main(args)
+
+    results = []
+    print(f"{'transport':<9} {'ctrls':>5} {'Hz':>5} {'loss %':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'reord':>5} {'final':>5} {'frame p95':>9} {'late':>5}  ok")
+    for transport in args.transports.split(','):
+        for controls in (int(n) for n in args.controls.split(',')):
+            for rate in (float(r) for r in args.rates.split(',')):
+                result = run_soak(transport, controls, rate, args.seconds, args.fps)
+                result['sustained'] = sustained(result, args.fps)
+                results.append(result)
+                print(f"{transport:<9} {result['controls']:>5} {rate:>5.0f} {result['loss_pct']:>7.2f} "
+                      f"{_ms(result['latency_p50_ms'])} {_ms(result['latency_p95_ms'])} "
+                      f"{_ms(result['latency_p99_ms'])} {_ms(result['latency_max_ms'])} "
+                      f"{result['reordered']:>5} {result['final_ok']:>2}/{result['controls']:<2} "
+                      f"{_ms(result['frame_p95_ms'])}  {result['surface_behind']:>5}  {'yes' if result['sustained'] else 'NO'}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'fps': args.fps, 'seconds': args.seconds, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
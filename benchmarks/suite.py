@@ -0,0 +1,211 @@
+"""
+BasicTouch benchmark - end-to-end suite on the TouchDesigner stand-in runtime.
+
+Runs the extension's hot paths against targets of several sizes:
+
+    start         Start(full=True) on a fresh extension until the setup job is done
+    start_cached  the same with a layout cache hit
+    resetup       Start(full=False) again with nothing changed (diff setup)
+    receive       OnReceiveOSC_UDP throughput over the bound controls, drained
+    value_change  OnValueChange fan-out for every numeric target parameter, flushed
+    randomize     one Randomize(1.0, 'all') press, flushed
+
+    python benchmarks/suite.py [--sizes 10,100,1000] [--seconds 0.5]
+                               [--save benchmarks/results/NAME.json]
+                               [--compare benchmarks/results/OLD.json]
+
+Results are written as JSON so two versions can be compared; --compare
+prints the ratio of each case against an earlier file (>1 is faster).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+
+
+def setup(size, folder=None, **settings):
+    runtime = touchdesigner.Runtime(project_folder=folder)
+    target = runtime.addTarget(TARGET, touchdesigner.target_pars(size))
+    # Paged, so every control of a large target gets laid out and set up
+    ext = runtime.createExtension(Base=TARGET, **dict({'Paging': True}, **settings))
+    return runtime, target, ext
+
+
+def started(size, **settings):
+    runtime, target, ext = setup(size, **settings)
+    ext.Start(full=True)
+    runtime.settle()
+    runtime.udp.reset()
+    return runtime, target, ext
+
+
+def measure(fn, seconds, unit_count=1):
+    """Repeat fn for about `seconds`; returns per-op stats for unit_count units per call."""
+    times = []
+    deadline = time.perf_counter() + seconds
+    while not times or time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    median = times[len(times) // 2]
+    return {
+        'runs': len(times),
+        'median_ms': median * 1000.0,
+        'min_ms': times[0] * 1000.0,
+        'per_second': unit_count / median if median else float('inf'),
+    }
+
+
+def case_start(size, seconds):
+    def fn():
+        runtime, target, ext = setup(size)
+        ext.Start(full=True)
+        runtime.settle()
+        shutil.rmtree(runtime.project.folder, ignore_errors=True)
+    return measure(fn, seconds)
+
+
+def case_start_cached(size, seconds):
+    folder = tempfile.mkdtemp(prefix='basictouch-')
+    runtime, target, ext = setup(size, folder=folder, Layoutcache=True)
+    ext.Start(full=True)
+    runtime.settle()
+
+    def fn():
+        runtime, target, ext = setup(size, folder=folder, Layoutcache=True)
+        ext.Start(full=True)
+        runtime.settle()
+    try:
+        return measure(fn, seconds)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def case_resetup(size, seconds):
+    runtime, target, ext = started(size)
+
+    def fn():
+        ext.Start(full=False)
+        runtime.settle()
+    return measure(fn, seconds)
+
+
+def case_receive(size, seconds):
+    runtime, target, ext = started(size)
+    controls = list(ext.osc_manager.control_map.items())
+    messages = []
+    for i in range(1000):
+        (control_type, index), par = controls[i % len(controls)]
+        args = [(i % 100) / 100.0] * len(par.parGroup) if par.isNumber else [i % 2]
+        messages.append((f'/{control_type}{index}', args))
+
+    def fn():
+        for address, args in messages:
+            ext.OnReceiveOSC_UDP(None, 0, None, None, 0, address, args, None)
+        runtime.settle()
+    return measure(fn, seconds, len(messages))
+
+
+def case_value_change(size, seconds):
+    runtime, target, ext = started(size)
+    # Parameters off the current page reach OnValueChange too
+    pars = [par for par in target.par if par.isNumber]
+    state = {'value': 0.0}
+
+    def fn():
+        state['value'] = (state['value'] + 0.37) % 1.0
+        for par in pars:
+            par.normVal = state['value']
+        runtime.settle()
+    return measure(fn, seconds, max(1, len(pars)))
+
+
+def case_randomize(size, seconds):
+    runtime, target, ext = started(size)
+    ext.randomize_manager.Seed(1)
+
+    def fn():
+        ext.randomize_manager.Randomize(1.0, 'all')
+        runtime.settle()
+    return measure(fn, seconds)
+
+
+CASES = {
+    'start': case_start,
+    'start_cached': case_start_cached,
+    'resetup': case_resetup,
+    'receive': case_receive,
+    'value_change': case_value_change,
+    'randomize': case_randomize,
+}
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+def compare(results, baseline):
+    print(f"\nagainst {baseline['meta'].get('revision') or 'baseline'}:")
+    for case, sizes in results['cases'].items():
+        for size, stats in sizes.items():
+            old = baseline['cases'].get(case, {}).get(size)
+            if not old:
+                continue
+            ratio = old['median_ms'] / stats['median_ms'] if stats['median_ms'] else float('inf')
+            print(f"  {case:<13} {size:>5}  {old['median_ms']:9.3f} -> {stats['median_ms']:9.3f} ms  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--seconds', type=float, default=0.5, help='time spent per case and size')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'revision': revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'cases': {},
+    }
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print(f"{'case':<13} {'params':>6} {'median ms':>10} {'min ms':>9} {'ops/s':>12}")
+    for case in args.cases.split(','):
+        for size in sizes:
+            stats = CASES[case](size, args.seconds)
+            results['cases'].setdefault(case, {})[str(size)] = stats
+            print(f"{case:<13} {size:>6} {stats['median_ms']:10.3f} {stats['min_ms']:9.3f} "
+                  f"{stats['per_second']:12.0f}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
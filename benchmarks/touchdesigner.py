@@ -0,0 +1,523 @@
+"""
+BasicTouch benchmark - TouchDesigner stand-in runtime.
+
+Just enough of the TouchDesigner Python API to run the modules in sources/
+outside TouchDesigner: table DATs, Pars with parGroups, COMPs, OSC Out and
+TCP/IP DATs, and the op / run / ParMode / debug / ui / project globals.
+
+    runtime = Runtime()
+    target = runtime.addTarget('/project1/target', target_pars(100))
+    ext = runtime.createExtension(Base=target.path)
+    ext.Start(full=True)
+    runtime.settle()
+
+run() callbacks are queued per frame and executed by Runtime.step(), so
+frame-sliced work (setup jobs, flushes, drains, tweens) advances one frame
+at a time like it does in TouchDesigner. Value changes on the target reach
+the extension's OnValueChange synchronously, like a Parameter Execute DAT.
+"""
+import builtins
+import enum
+import importlib.util
+import os
+import random
+import tempfile
+
+SOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sources')
+
+
+class ParMode(enum.Enum):
+    CONSTANT = 0
+    EXPRESSION = 1
+    EXPORT = 2
+    BIND = 3
+
+
+class Cell:
+    __slots__ = ('val',)
+
+    def __init__(self, val):
+        self.val = str(val)
+
+    def __eq__(self, other):
+        return self.val == (other.val if isinstance(other, Cell) else other)
+
+    def __hash__(self):
+        return hash(self.val)
+
+    def __str__(self):
+        return self.val
+
+
+class TableDAT:
+    def __init__(self, path, rows=()):
+        self.path = path
+        self.name = path.rsplit('/', 1)[-1]
+        self._rows = [[Cell(v) for v in row] for row in rows]
+
+    @property
+    def numRows(self):
+        return len(self._rows)
+
+    @property
+    def numCols(self):
+        return len(self._rows[0]) if self._rows else 0
+
+    def _col(self, col):
+        if isinstance(col, str):
+            for i, cell in enumerate(self._rows[0] if self._rows else ()):
+                if cell.val == col:
+                    return i
+            return None
+        return col
+
+    def __getitem__(self, key):
+        row, col = key
+        col = self._col(col)
+        if col is None or not 0 <= row < len(self._rows) or col >= len(self._rows[row]):
+            return None
+        return self._rows[row][col]
+
+    def __setitem__(self, key, value):
+        row, col = key
+        col = self._col(col)
+        self._rows[row][col] = Cell(value)
+
+    def row(self, index):
+        return list(self._rows[index])
+
+    def rows(self):
+        return [list(row) for row in self._rows]
+
+    def clear(self):
+        self._rows = []
+
+    def appendRow(self, values):
+        self._rows.append([Cell(v) for v in values])
+
+    def appendRows(self, rows):
+        self._rows.extend([Cell(v) for v in row] for row in rows)
+
+    def cols(self):
+        return [[row[i] if i < len(row) else None for row in self._rows] for i in range(self.numCols)]
+
+    def appendCol(self, values):
+        """Append a column; a single value goes in the first row, missing values are empty."""
+        if isinstance(values, str) or not hasattr(values, '__iter__'):
+            values = [values]
+        values = list(values)
+        for i, row in enumerate(self._rows):
+            row.append(Cell(values[i] if i < len(values) else ''))
+
+    def deleteRow(self, index):
+        del self._rows[index]
+
+    def copy(self, other):
+        self._rows = [[Cell(cell.val) for cell in row] for row in other._rows]
+
+    def table(self):
+        return [[cell.val for cell in row] for row in self._rows]
+
+
+class Par:
+    """One parameter. Numbers keep a float/int val; menus a menu name; toggles a bool."""
+
+    def __init__(self, owner, name, style, label='', value=0.0, normMin=0.0, normMax=1.0,
+                 menuNames=None, menuLabels=None):
+        self.owner = owner
+        self.name = name
+        self.style = style
+        self.label = label or name
+        self.normMin = normMin
+        self.normMax = normMax
+        self.menuNames = list(menuNames or [])
+        self.menuLabels = list(menuLabels or self.menuNames)
+        self.mode = ParMode.CONSTANT
+        self.readOnly = False
+        self.enable = True
+        self.valid = True
+        self.parGroup = (self,)
+        self.pulses = 0
+        self._val = value
+
+    isNumber = property(lambda self: self.style in ('Float', 'Int', 'XY', 'XYZ', 'XYZW', 'RGB', 'RGBA', 'UV', 'UVW', 'WH'))
+    isInt = property(lambda self: self.style == 'Int')
+    isFloat = property(lambda self: self.isNumber and not self.isInt)
+    isMenu = property(lambda self: self.style in ('Menu', 'StrMenu'))
+    isToggle = property(lambda self: self.style == 'Toggle')
+    isPulse = property(lambda self: self.style == 'Pulse')
+    isMomentary = property(lambda self: self.style == 'Momentary')
+
+    def eval(self):
+        return self._val
+
+    @property
+    def val(self):
+        return self._val
+
+    @val.setter
+    def val(self, value):
+        if self.isInt:
+            value = int(round(value))
+        elif self.isNumber:
+            value = float(value)
+        elif self.isToggle or self.isMomentary:
+            value = bool(value)
+        prev = self._val
+        self._val = value
+        if value != prev:
+            self.owner._changed(self, prev)
+
+    @property
+    def normVal(self):
+        if self.isNumber:
+            span = self.normMax - self.normMin
+            return (self._val - self.normMin) / span if span else 0.0
+        if self.isMenu:
+            return self.menuIndex / max(1, len(self.menuNames) - 1)
+        return 1.0 if self._val else 0.0
+
+    @normVal.setter
+    def normVal(self, value):
+        if self.isNumber:
+            self.val = self.normMin + float(value) * (self.normMax - self.normMin)
+        elif self.isMenu:
+            self.menuIndex = round(float(value) * max(1, len(self.menuNames) - 1))
+        else:
+            self.val = bool(value)
+
+    @property
+    def menuIndex(self):
+        try:
+            return self.menuNames.index(self._val)
+        except ValueError:
+            return 0
+
+    @menuIndex.setter
+    def menuIndex(self, index):
+        if self.menuNames:
+            self.val = self.menuNames[max(0, min(int(index), len(self.menuNames) - 1))]
+
+    def pulse(self):
+        self.pulses += 1
+
+    def __repr__(self):
+        return f'<Par {self.owner.path}:{self.name}={self._val!r}>'
+
+
+class ParCollection:
+    def __init__(self):
+        self._pars = {}
+
+    def __getitem__(self, name):
+        return self._pars.get(name)
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_pars'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        return iter(self._pars.values())
+
+    def __len__(self):
+        return len(self._pars)
+
+
+# Tuplet suffixes TouchDesigner uses for multi-value parameter styles
+SUFFIXES = {'XY': 'xy', 'XYZ': 'xyz', 'XYZW': 'xyzw', 'RGB': 'rgb', 'RGBA': 'rgba',
+            'UV': 'uv', 'UVW': 'uvw', 'WH': 'wh'}
+
+
+class COMP:
+    def __init__(self, path):
+        self.path = path
+        self.name = path.rsplit('/', 1)[-1]
+        self.par = ParCollection()
+        self.customPages = []
+        self.listener = None  # called as listener(par, prev) after a value changes
+
+    def addPar(self, name, style, label='', size=1, value=0.0, **kwargs):
+        """Add a parameter tuplet; returns its Pars. Tuplet members share a parGroup."""
+        suffixes = SUFFIXES.get(style) or ([''] if size == 1 else [str(i) for i in range(1, size + 1)])
+        pars = tuple(Par(self, name + suffix, style, label or name, value, **kwargs)
+                     for suffix in suffixes)
+        for par in pars:
+            par.parGroup = pars
+            self.par._pars[par.name] = par
+        return pars
+
+    def appendCustomPage(self, name):
+        page = Page(self, name)
+        self.customPages.append(page)
+        return page
+
+    def create(self, optype, name):
+        """Create a child operator in the runtime that installed the globals."""
+        return builtins.op.__self__.add(optype(f'{self.path}/{name}'))
+
+    def _changed(self, par, prev):
+        if self.listener is not None:
+            self.listener(par, prev)
+
+    def source_parameters(self):
+        """Rows of the Parameter DAT BasicTouch reads its target from."""
+        rows = [['name', 'label', 'style', 'size']]
+        for par in self.par:
+            rows.append([par.name, par.label, par.style, str(len(par.parGroup))])
+        return rows
+
+
+class Page:
+    """Custom parameter page; appended parameters are added to its COMP."""
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+        self.pars = []
+
+    def appendToggle(self, name, label=None):
+        return self._append(name, 'Toggle', label, False)
+
+    def appendFloat(self, name, label=None, size=1):
+        return self._append(name, 'Float', label, 0.0, size)
+
+    def _append(self, name, style, label, value, size=1):
+        pars = self.owner.addPar(name, style, label=label or name, size=size, value=value)
+        self.pars.extend(pars)
+        return pars
+
+
+class OSCOutDAT:
+    """OSC Out DAT; counts what would go on the wire."""
+
+    def __init__(self, path):
+        self.path = path
+        self.messages = 0
+        self.packets = 0
+        self.bytes = 0
+
+    def sendOSC(self, address, args):
+        self.messages += 1
+        self.packets += 1
+
+    def sendBytes(self, data):
+        self.packets += 1
+        self.bytes += len(data)
+
+    def reset(self):
+        self.messages = self.packets = self.bytes = 0
+
+
+class TCPIPDAT(OSCOutDAT):
+    pass
+
+
+class ModuleDAT:
+    """Text DAT holding one of the extension's modules.
+
+    Modules are compiled once per process, like TouchDesigner keeps a DAT's
+    module until its text changes; they only reach TouchDesigner through
+    builtins, so every Runtime can share them.
+    """
+    _loaded = {}
+
+    def __init__(self, path, name, file=None):
+        self.path = path
+        self.file = file or os.path.join(SOURCES, f'{name}.py')
+
+    @property
+    def module(self):
+        module = self._loaded.get(self.file)
+        if module is None:
+            name = os.path.splitext(os.path.basename(self.file))[0]
+            spec = importlib.util.spec_from_file_location(name, self.file)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._loaded[self.file] = module
+        return module
+
+
+class UI:
+    def __init__(self):
+        self.dialogs = []
+
+    def messageBox(self, title, message, buttons=None):
+        self.dialogs.append((title, message))
+        return 0
+
+
+class Runtime:
+    """Operator registry, frame clock and the globals the modules expect."""
+
+    # Self-rescheduling jobs that settle() does not wait for
+    PERIODIC = ('._publishTick()', '._probeTick()')
+
+    def __init__(self, project_folder=None):
+        self.ops = {}
+        self.frame = 0
+        self._queue = []  # (due frame, sequence, code, args)
+        self._seq = 0
+        self.debug_messages = 0
+        self.ui = UI()
+        self.project = type('Project', (), {})()
+        self.project.folder = project_folder or tempfile.mkdtemp(prefix='basictouch-')
+        self.project.cookRate = 60.0
+
+        self.owner = COMP('/project1/BasicTouch')
+        # No 'stats' DAT, as in the shipped .tox; the Stats module creates it
+        for name in ('param_control', 'presets', 'source_parameters'):
+            self.add(TableDAT(f'{self.owner.path}/{name}'))
+        self.add(OSCOutDAT(f'{self.owner.path}/oscout2'))
+        self.add(TCPIPDAT(f'{self.owner.path}/tcpip1'))
+        self.add(TableDAT(f'{self.owner.path}/oscin2'))
+        for filename in sorted(os.listdir(SOURCES)):
+            name, ext = os.path.splitext(filename)
+            if ext == '.py' and name != 'BasicTouch':
+                self.add(ModuleDAT(f'{self.owner.path}/modules/{name}', name))
+        self.install()
+
+    # -----------------------
+    # Globals
+    # -----------------------
+    def install(self):
+        """Make this runtime the one the modules see through builtins."""
+        builtins.op = self.op
+        builtins.run = self.run
+        builtins.ParMode = ParMode
+        builtins.debug = self.debug
+        builtins.ui = self.ui
+        builtins.project = self.project
+        # Types the modules name in annotations
+        builtins.COMP = COMP
+        builtins.Par = Par
+        builtins.tableDAT = TableDAT
+        builtins.OPShortcut = COMP
+        return self
+
+    def add(self, operator):
+        self.ops[operator.path] = operator
+        return operator
+
+    def op(self, path):
+        """Resolve absolute paths, and relative ones against the BasicTouch COMP.
+
+        Module DATs resolve '../name' to a sibling of their 'modules' base,
+        which is the BasicTouch COMP too, so the leading '../' is dropped.
+        """
+        if path in self.ops:
+            return self.ops[path]
+        while path.startswith('../'):
+            path = path[3:]
+        return self.ops.get(f'{self.owner.path}/{path}')
+
+    def run(self, code, *args, delayFrames=0, **kwargs):
+        self._seq += 1
+        self._queue.append((self.frame + max(1, delayFrames), self._seq, code, args))
+
+    def debug(self, *messages):
+        self.debug_messages += 1
+
+    # -----------------------
+    # Frames
+    # -----------------------
+    def step(self):
+        """Advance one frame and run everything scheduled for it."""
+        self.frame += 1
+        due = [item for item in self._queue if item[0] <= self.frame]
+        if not due:
+            return 0
+        self._queue = [item for item in self._queue if item[0] > self.frame]
+        for _, _, code, args in sorted(due, key=lambda item: item[1]):
+            eval(code, {'args': args})
+        return len(due)
+
+    def settle(self, max_frames=100000):
+        """Step frames until only periodic jobs are scheduled; returns the number of frames."""
+        start = self.frame
+        while self.busy and self.frame - start < max_frames:
+            self.step()
+        return self.frame - start
+
+    @property
+    def busy(self) -> bool:
+        """Whether anything other than a periodic job (see PERIODIC) is scheduled."""
+        return any(not item[2].endswith(self.PERIODIC) for item in self._queue)
+
+    # -----------------------
+    # Scene
+    # -----------------------
+    def addTarget(self, path, pars):
+        """Create the target COMP from (name, style, kwargs) and fill source_parameters."""
+        target = self.add(COMP(path))
+        for name, style, kwargs in pars:
+            target.addPar(name, style, **kwargs)
+        self.op('source_parameters')._rows = TableDAT('', target.source_parameters())._rows
+        return target
+
+    def createExtension(self, **settings):
+        """Build the BasicTouch extension on the owner COMP with the given parameters."""
+        values = {
+            'Base': '', 'Templateresolutionw': 1024, 'Templateresolutionh': 768,
+            'Scalecontrolsheight': 1, 'Fontsize': 14, 'Mincontrolheight': 60,
+            'Udptcp': False, 'Debuglog': False, 'Presetscallbacks': '',
+            'Layoutcache': False, 'Paging': False,
+        }
+        values.update(settings)
+        owner = self.owner
+        # Parameters not given here are created by the extension, as on the shipped .tox
+        owner.par = ParCollection()
+        owner.customPages = []
+        for name, value in values.items():
+            style = 'Str' if isinstance(value, str) else 'Toggle' if isinstance(value, bool) else 'Float'
+            owner.addPar(name, style, value=value)
+        owner.addPar('Color', 'RGB', value=0.5)
+
+        module = ModuleDAT(f'{owner.path}/BasicTouch', 'BasicTouch').module
+        ext = module.BasicTouch(owner)
+        target = self.op(values['Base']) if values['Base'] else None
+        if target is not None:
+            target.listener = ext.OnValueChange
+        return ext
+
+    @property
+    def udp(self) -> OSCOutDAT:
+        return self.op('oscout2')
+
+    @property
+    def tcp(self) -> TCPIPDAT:
+        return self.op('tcpip1')
+
+
+def target_pars(count, seed=1):
+    """A target with `count` parameter rows in the mix of a typical TOX.
+
+    Mostly floats, some ints, toggles, pulses and menus, and a few XY/XYZ and
+    RGB tuplets (which count as one row per member).
+    """
+    rng = random.Random(seed)
+    kinds = ['Float'] * 10 + ['Int'] * 2 + ['Toggle', 'Pulse', 'Menu', 'XY', 'XYZ', 'RGB']
+    pars = []
+    rows = 0
+    n = 0
+    while rows < count:
+        n += 1
+        style = rng.choice(kinds)
+        size = len(SUFFIXES.get(style, ' '))
+        if rows + size > count:
+            style, size = 'Float', 1
+        name = f'P{n}'
+        if style == 'Menu':
+            names = [f'item{i}' for i in range(rng.randrange(2, 8))]
+            kwargs = {'value': names[0], 'menuNames': names}
+        elif style in ('Toggle', 'Pulse'):
+            kwargs = {'value': False}
+        elif style == 'Int':
+            kwargs = {'value': 0, 'normMax': float(rng.choice([4, 10, 100]))}
+        else:
+            kwargs = {'value': rng.random()}
+        kwargs['label'] = f'Param {n}'
+        pars.append((name, style, kwargs))
+        rows += size
+    return pars
@@ -6,43 +6,187 @@ Created by: @from.vacuum aka Serhiy P.
 Licence: CC0 
 """
 
+import time
+from collections import deque
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple, Union
 
 class BasicTouch:
     def __init__(self, comp: COMP):
+        self.ownerComp = comp
+        added = _ensure_custom_pars(comp)
         self.config: BasicTouchConfig = BasicTouchConfig.from_comp(comp)
+        self.log = op('modules/Log').module.Logger(self)
+        self.profiler = op('modules/Profiler').module.Profiler(self)
         self.debug('Init BasicTouch...')
+        if added:
+            self.log.info("Added parameters missing from the component: %s", ', '.join(added))
         self.base_comp: Optional[OPShortcut] = op(self.config.base_comp_path) if self.config.base_comp_path else None
 
         self.params_dat: tableDAT = op('param_control')
+        self.current_page = 1  # page of the layout bound to the surface's controls
 
         # Load modules 
+        self.stats = op('modules/Stats').module.Stats(self)
         self.layout_manager = op('modules/Layout').module.Layout(self)
         self.osc_manager = op('modules/OSC').module.OSCManager(self)
         self.parameter_manager = op('modules/Parameters').module.ParameterManager(self)
+        self.latency_probe = op('modules/Latency').module.LatencyProbe(self)
 
-        if self.config.presets_callbacks:
+        self.tween_engine = op('modules/Tween').module.TweenEngine(self)
+        if self.config.native_presets and self.base_comp is not None:
+            self.snapshot_store = op('modules/Snapshots').module.SnapshotStore(self)
+        else:
+            self.snapshot_store = None
+
+        if self.config.presets_callbacks or self.snapshot_store:
             self.preset_manager = op('modules/Presets').module.PresetManager(self)
         else:
             self.preset_manager = None
             op('presets').clear()
 
         self.randomize_manager = op('modules/Randomize').module.RandomizeManager(self)
+
+        if self.config.layout_cache and self.base_comp is not None:
+            self.layout_cache = op('modules/LayoutCache').module.LayoutCache(self)
+        else:
+            self.layout_cache = None
+        self.setup_job: Optional[SetupJob] = None
         
-    def Start(self):
-        self.parameter_manager.loadParameters()
-        # Calculate UI layout
-        self.layout_manager.__init__(self)
-        self.layout_manager.calculateControlInfo()
-        self.layout_manager.calculateControlPositions()
+    def Start(self, full=True):
+        """Set up the surface as a SetupJob sliced over frames, cancelling any running one.
+
+        "Setup Controls" hides and resends everything: over UDP nothing tells
+        us the surface restarted, so the press is how users recover it.
+        Start(full=False) only sends controls that changed since the last
+        setup, for re-setups made from code when the surface is known intact.
+        Parameters are re-read first: if any changed since init (e.g. a new
+        Target Base), the extension is rebuilt against them before the setup.
+        """
+        self.CancelSetup()
+        if BasicTouchConfig.from_comp(self.ownerComp) != self.config:
+            self._reinit()
+        if _eval_par_value(getattr(self.ownerComp.par, 'Profile', None)):
+            self.profiler.begin('setup')
+        self.setup_job = SetupJob(self, self._setupSteps(full))
+        self.setup_job.step()
+        return self.setup_job
+
+    def CancelSetup(self):
+        if self.setup_job and self.setup_job.running:
+            self.setup_job.cancel()
+
+    def onDestroyTD(self):
+        """Called by TouchDesigner before the extension is reinitialized or destroyed.
+
+        Ends the jobs that reschedule themselves, which would otherwise keep
+        running on the old instance, and writes out a running profile.
+        """
+        self.CancelSetup()
+        self.profiler.end()
+        self.tween_engine.clear()
+        self.stats.stop()
+        self.latency_probe.stop()
+        if self.preset_manager:
+            self.preset_manager.shutdown()
+
+    def _reinit(self):
+        """Rebuild every module from the current parameters, keeping the log."""
+        records = list(self.log.records)
+        self.onDestroyTD()
+        self.__init__(self.ownerComp)
+        self.log.records = deque(records + list(self.log.records), maxlen=self.config.log_size)
+        self.debug('Reinitialized for %s', self.config.base_comp_path)
+
+    def SetPage(self, page: int):
+        """Bind the surface's controls to another page of the layout."""
+        page = max(1, min(int(page), self.layout_manager.pages))
+        if page == self.current_page:
+            return
+        self.current_page = page
+        self.CancelSetup()
+        self.setup_job = SetupJob(self, self._bindPageSteps())
+        self.setup_job.step()
+
+    def NextPage(self):
+        self.SetPage(self.current_page + 1)
+
+    def PrevPage(self):
+        self.SetPage(self.current_page - 1)
+
+    def SavePreset(self, name: Optional[str] = None) -> Optional[str]:
+        """Snapshot the target's current values as a built-in preset; returns its name."""
+        if self.preset_manager:
+            return self.preset_manager.savePreset(name)
+        return None
+
+    def DeletePreset(self, name: str):
+        if self.preset_manager:
+            self.preset_manager.deletePreset(name)
+
+    def StartProfile(self, name: str = 'capture'):
+        """Profile everything until StopProfile(); see the Profiler module."""
+        self.profiler.begin(name)
+
+    def StopProfile(self):
+        """End the capture and write its files; returns (pstats path, trace path)."""
+        return self.profiler.end()
+
+    def Ping(self, transport: Optional[str] = None):
+        """Send one latency probe, on 'udp' or 'tcp' or the active transport."""
+        self.latency_probe.ping(transport)
+
+    @property
+    def SetupProgress(self) -> float:
+        """Progress of the last setup, 0..1."""
+        return self.setup_job.progress if self.setup_job else 0.0
+
+    def _setupSteps(self, full=False):
+        """Setup as a generator; each yield is a point where the job may pause until next frame."""
+        phase = self.profiler.phase
+        self.osc_manager.invalidateControlMap()
+        self.tween_engine.clear()
+        with phase('layout cache load'):
+            signature = self.layout_cache.signature() if self.layout_cache else None
+            cached = self.layout_cache.load(signature) if signature else None
+        if cached:
+            # Known target: reuse its table and setup messages
+            table, controls = cached
+            with phase('layout restore'):
+                self.layout_manager.restore(table)
+        else:
+            with phase('load parameters'):
+                self.parameter_manager.loadParameters()
+            # Calculate UI layout
+            with phase('layout'):
+                self.layout_manager.__init__(self)
+                self.layout_manager.calculatePages()
+            with phase('layout commit'):
+                table = self.layout_manager.commit()
+            with phase('layout messages'):
+                controls = self.osc_manager.layoutMessages(1)
+            if signature:
+                with phase('layout cache store'):
+                    self.layout_cache.store(signature, table, controls)
+        with phase('randomize plans'):
+            self.randomize_manager.buildPlans()
+        if self.snapshot_store:
+            with phase('snapshot bind'):
+                self.snapshot_store.bind()
+        self.current_page = min(self.current_page, self.layout_manager.pages)
+        if self.current_page != 1:
+            # Cached messages are for the first page
+            controls = None
+        yield 0.1
         
         # Send controls to OSC
         self.osc_manager.resetOSC()
-        self.osc_manager.sendControlsToOSC()
+        for progress in self._bindPageSteps(full, controls):
+            yield 0.1 + 0.8 * progress
         
         # Set up randomization controls
         self.randomize_manager.sendRandomizeButtonsToOSC()
+        yield 0.95
         
         # Set up presets if we have them
         if self.preset_manager:
@@ -51,19 +195,51 @@ class BasicTouch:
         # Send font size
         self.osc_manager.sendOSC('/tabs', [self.config.font_size, self.config.min_control_height])
     
+    def _bindPageSteps(self, full=False, controls=None):
+        """Rebind controls, routes and value mappings to the current page and send the difference."""
+        phase = self.profiler.phase
+        self.osc_manager.invalidateControlMap()
+        with phase('rebind'):
+            self.parameter_manager.rebind()
+            self.osc_manager.buildControlMap()
+            self.osc_manager.buildRoutes()
+        if controls is None:
+            with phase('layout messages'):
+                controls = self.osc_manager.layoutMessages(self.current_page)
+        yield from self.osc_manager.iterControlsToOSC(full, controls)
+        if self.config.paging:
+            self.osc_manager.sendOSC('/page', [self.current_page, self.layout_manager.pages])
+
     # Main extension callbacks - these delegate to the appropriate module
     def OnReceiveOSC_UDP(self, dat, rowIndex, message, byteData, timeStamp, address, args, peer):
-        return self.osc_manager.OnReceiveOSC(dat, rowIndex, message, byteData, timeStamp, address, args, peer)
+        start = time.perf_counter()
+        try:
+            return self.osc_manager.OnReceiveOSC(dat, rowIndex, message, byteData, timeStamp, address, args, peer)
+        finally:
+            self.stats.time('OnReceiveOSC', start)
     
     def OnReceiveOSC_TCP(self, byteData):   
-        return self.osc_manager.OnReceiveOSC_TCP(byteData)
+        start = time.perf_counter()
+        try:
+            return self.osc_manager.OnReceiveOSC_TCP(byteData)
+        finally:
+            self.stats.time('OnReceiveOSC_TCP', start)
         
     def OnValueChange(self, par, prev):
-        return self.parameter_manager.OnValueChange(par, prev)
+        start = time.perf_counter()
+        try:
+            return self.parameter_manager.OnValueChange(par, prev)
+        finally:
+            self.stats.time('OnValueChange', start)
     
     def OnModeChange(self, par, prev):
         return self.parameter_manager.OnModeChange(par, prev)
 
+    def OnConnect(self):
+        """Surface (re)connected: resend every value. Wire to the TCP/IP DAT's onConnect."""
+        self.osc_manager.forgetLayout()
+        return self.parameter_manager.resendValues()
+
     def OnEnableChange(self, par, val, prev):
         return self.parameter_manager.OnModeChange(par, prev)    
 
@@ -71,9 +247,12 @@ class BasicTouch:
 # Helper functions
 # ---------------------------------------------------------
 
-    def debug(self, message):
-        if self.config.debug_log:
-            debug(message)
+    def debug(self, message, *args):
+        self.log.debug(message, *args)
+
+    def DumpLog(self, target=None):
+        """Write the log ring buffer to a DAT or file (a new file in the project folder by default)."""
+        return self.log.dump(target)
 
     def showWarningDialog(self, message, title="Warning"):
         result = ui.messageBox(title, message) 
@@ -81,6 +260,79 @@ class BasicTouch:
     
 
 
+class SetupJob:
+    """Resumable "Setup Controls": runs setup steps for at most setup_budget_ms per frame.
+
+    Each frame's messages go out as one bundle. The job cancels itself when the
+    component's Target Base no longer matches the one it started with.
+    """
+
+    def __init__(self, parent: BasicTouch, steps):
+        self.parent = parent
+        self.steps = steps
+        # Start() re-read the parameters, so this is the target being set up
+        self.target = parent.config.base_comp_path
+        self.progress = 0.0
+        self.frames = 0
+        self.state = 'running'  # running | done | cancelled | failed
+        self._started = time.perf_counter()
+
+    @property
+    def running(self) -> bool:
+        return self.state == 'running'
+
+    def step(self):
+        """Advance the job by one frame's budget and reschedule until done."""
+        if not self.running:
+            return
+        if str(_eval_par_value(self.parent.ownerComp.par.Base) or "") != self.target:
+            self.cancel()
+            # Controls now belong to a different target
+            self.parent.osc_manager.invalidateControlMap()
+            return
+
+        osc = self.parent.osc_manager
+        budget = self.parent.config.setup_budget_ms / 1000.0
+        start = time.perf_counter()
+        deadline = start + budget
+        self.frames += 1
+        osc.beginBundle()
+        try:
+            for self.progress in self.steps:
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self._finish('done')
+        except Exception as e:
+            self._finish('failed')
+            self.parent.log.error("Setup failed: %s", e)
+        finally:
+            osc.flushBundle()
+
+        self.parent.stats.time('Setup frame', start)
+        if self.running:
+            self.parent.debug("Setup %.0f%%", self.progress * 100)
+            run("args[0].step()", self, delayFrames=1)
+
+    def cancel(self):
+        if self.running:
+            self.steps.close()
+            self._finish('cancelled')
+
+    def _finish(self, state: str):
+        self.state = state
+        self.parent.stats.count(f'setup {state}')
+        if state == 'done':
+            self.progress = 1.0
+            self.parent.stats.time('Start', self._started)
+        profiler = self.parent.profiler
+        if state != 'cancelled' and profiler.capturing and profiler.name == 'setup':
+            # Keep capturing the traffic that follows the setup
+            profiler.endAfter(self.parent.config.profile_window)
+        elapsed = (time.perf_counter() - self._started) * 1000.0
+        self.parent.debug("Setup %s after %s frame(s), %.1f ms", state, self.frames, elapsed)
+
+
 @dataclass(frozen=True)
 class BasicTouchConfig:
     base_comp_path: str
@@ -91,13 +343,28 @@ class BasicTouchConfig:
     font_size: float
     padding: float
     min_control_height: float
-    sleep_time: float
+    setup_budget_ms: float
+    bundle_size: int
+    coalesce_bundle: bool
+    inbound_budget_ms: float
+    deadband_steps: int
+    coalesced_controls: Tuple[str, ...]
     control_limits: Dict[str, int]
     supported_styles: List[str]
     color: Tuple[float, float, float]
     presets_callbacks: Optional[str]
     use_udp_tcp: bool
+    layout_cache: bool
+    paging: bool
+    randomize_glide: bool
+    native_presets: bool
+    presets_async: bool
+    stats_interval: int
+    probe_interval: float
+    profile_window: float
     debug_log: bool
+    log_echo: bool
+    log_size: int
 
     @classmethod
     def from_comp(cls, comp: COMP) -> "BasicTouchConfig":
@@ -112,6 +379,10 @@ class BasicTouchConfig:
             else None
         )
 
+        layout_cache = fetch("Layoutcache")
+        log_echo = fetch("Logecho")
+        profile_window = fetch("Profilewindow")
+
         return cls(
             base_comp_path=str(fetch("Base") or ""),
             doc_width=float(fetch("Templateresolutionw")),
@@ -120,7 +391,17 @@ class BasicTouchConfig:
             font_size=float(fetch("Fontsize")),
             min_control_height=float(fetch("Mincontrolheight")),
             use_udp_tcp=bool(fetch("Udptcp")),
+            layout_cache=True if layout_cache is None else bool(layout_cache),
+            paging=bool(fetch("Paging")),
+            randomize_glide=bool(fetch("Randomizeglide")),
+            native_presets=bool(fetch("Nativepresets")),
+            presets_async=bool(fetch("Presetsasync")),
+            stats_interval=60,  # frames between stats table updates, 0 to only update on /stats
+            probe_interval=float(fetch("Latencyprobe") or 0.0),  # seconds between /ping probes, 0 is off
+            profile_window=10.0 if profile_window is None else float(profile_window),
             debug_log=bool(fetch("Debuglog")),
+            log_echo=True if log_echo is None else bool(log_echo),
+            log_size=2000,  # records kept in the log ring buffer
             presets_callbacks=presets_callbacks,
             color=[
                 comp.par.Colorr.parGroup[0].eval(),
@@ -129,7 +410,14 @@ class BasicTouchConfig:
             ],
             tab_bar_height=50.0,
             padding=10.0,
-            sleep_time=0.01,
+            setup_budget_ms=4.0,
+            bundle_size=1400,  # bytes per OSC bundle, stays under a UDP datagram on Wi-Fi
+            coalesce_bundle=True,  # send each frame's value updates as one bundle
+            inbound_budget_ms=2.0,
+            deadband_steps=1024,  # float values closer than 1/1024 of range are not resent
+            # Inbound controls where only the newest value per frame matters;
+            # buttons and menus are applied immediately so no press is lost
+            coalesced_controls=("fader", "xy", "color"),
             control_limits={
                 "label": 24, "fader": 16, "button": 16, "color": 3,
                 "radio": 4, "xy": 4, "plabel": 10, "pbutton": 10,
@@ -141,6 +429,41 @@ class BasicTouchConfig:
             ],
         )
 
+# Parameters newer than the saved BasicTouch.tox, created on its custom page
+# when missing: (name, label, default, (min, max) for floats)
+EXTRA_PARS_PAGE = 'Advanced'
+EXTRA_PARS = (
+    ('Paging', 'Paging', False, None),
+    ('Randomizeglide', 'Randomize Glide', False, None),
+    ('Nativepresets', 'Native Presets', False, None),
+    ('Layoutcache', 'Layout Cache', True, None),
+    ('Presetsasync', 'Presets Async', False, None),
+    ('Latencyprobe', 'Latency Probe', 0.0, (0.0, 10.0)),
+    ('Logecho', 'Log Echo', True, None),
+    ('Profile', 'Profile', False, None),
+    ('Profilewindow', 'Profile Window', 10.0, (0.0, 60.0)),
+)
+
+def _ensure_custom_pars(comp: COMP) -> List[str]:
+    """Append the EXTRA_PARS the component lacks, with their defaults; returns their names."""
+    missing = [spec for spec in EXTRA_PARS if getattr(comp.par, spec[0], None) is None]
+    if not missing:
+        return []
+    page = next((page for page in comp.customPages if page.name == EXTRA_PARS_PAGE), None)
+    if page is None:
+        page = comp.appendCustomPage(EXTRA_PARS_PAGE)
+    for name, label, default, limits in missing:
+        if limits is None:
+            par = page.appendToggle(name, label=label)[0]
+        else:
+            par = page.appendFloat(name, label=label)[0]
+            par.min, par.max = limits
+            par.normMin, par.normMax = limits
+            par.clampMin = True
+        par.default = default
+        par.val = default
+    return [name for name, *_ in missing]
+
 def _eval_par_value(par: Optional[Par]) -> Union[float, int, str, bool, None]:
     """Safely evaluate a TouchDesigner parameter."""
     if par is None:
@@ -0,0 +1,164 @@
+"""
+BasicTouch extension - Latency probe module.
+Measures the round trip to the TouchOSC surface.
+
+TouchDesigner sends /ping <transport> <seq> <sent_us>, where sent_us is a
+monotonic microsecond clock wrapped to 31 bits so it stays an OSC int32.
+Root.lua answers on the connection the ping came in on with the same
+arguments plus its own getMillis(): /pong <transport> <seq> <sent_us> <surface_ms>.
+
+The RTT is taken from the echoed timestamp; the sequence number catches
+losses, duplicates and pongs that arrive after the timeout. Every transport
+(udp, tcp) keeps its own rolling window of the last WINDOW probes, so Wi-Fi
+delay and SLIP/TCP framing can be told apart. The results appear in the stats
+table and the /stats reply as 'rtt <transport> ...'.
+
+Probes go out every `Latency Probe` seconds when that parameter is above 0,
+or on demand with Ping().
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import time
+from collections import deque
+
+WINDOW = 256          # probes per transport the distribution is taken over
+TIMEOUT_S = 2.0       # a ping without a pong after this long is lost
+CLOCK_MASK = 0x7FFFFFFF
+
+
+def _now_us() -> int:
+    return (time.perf_counter_ns() // 1000) & CLOCK_MASK
+
+
+class ProbePath:
+    """Rolling RTT, jitter and loss of one transport."""
+
+    def __init__(self):
+        self.seq = 0
+        self.pending = {}  # seq -> perf_counter() at send, for the timeout
+        self.rtts = deque(maxlen=WINDOW)      # ms of answered probes
+        self.outcomes = deque(maxlen=WINDOW)  # True answered, False lost
+        self.expired = deque(maxlen=WINDOW)   # seqs given up on, to tell late pongs from duplicates
+        self.jitter_ms = 0.0  # smoothed |RTT difference|, as RFC 3550 does for transit time
+        self.last_rtt = None
+        self.sent = 0
+        self.late = 0
+        self.duplicates = 0
+
+    def answer(self, seq: int, rtt_ms: float):
+        if self.pending.pop(seq, None) is None:
+            if seq in self.expired:
+                self.late += 1
+            else:
+                self.duplicates += 1
+            return
+        if self.last_rtt is not None:
+            self.jitter_ms += (abs(rtt_ms - self.last_rtt) - self.jitter_ms) / 16.0
+        self.last_rtt = rtt_ms
+        self.rtts.append(rtt_ms)
+        self.outcomes.append(True)
+
+    def expire(self, now: float):
+        for seq, sent_at in list(self.pending.items()):
+            if now - sent_at > TIMEOUT_S:
+                del self.pending[seq]
+                self.outcomes.append(False)
+                self.expired.append(seq)
+
+    def values(self, transport: str):
+        prefix = f'rtt {transport}'
+        values = [(f'{prefix} sent', self.sent)]
+        rtts = sorted(self.rtts)
+        if rtts:
+            def pick(q):
+                return rtts[min(len(rtts) - 1, int(q * len(rtts)))]
+            values += [
+                (f'{prefix} last ms', round(self.last_rtt, 3)),
+                (f'{prefix} min ms', round(rtts[0], 3)),
+                (f'{prefix} p50 ms', round(pick(0.5), 3)),
+                (f'{prefix} p95 ms', round(pick(0.95), 3)),
+                (f'{prefix} max ms', round(rtts[-1], 3)),
+                (f'{prefix} jitter ms', round(self.jitter_ms, 3)),
+            ]
+        if self.outcomes:
+            lost = self.outcomes.count(False)
+            values.append((f'{prefix} loss %', round(100.0 * lost / len(self.outcomes), 2)))
+        values += [(f'{prefix} late', self.late), (f'{prefix} duplicates', self.duplicates)]
+        return values
+
+
+class LatencyProbe:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.paths = {}  # transport -> ProbePath
+        self._scheduled = False
+        self._stopped = False
+        self.schedule()
+
+    @property
+    def transport(self) -> str:
+        """Transport the surface is driven over."""
+        return 'tcp' if self.config.use_udp_tcp else 'udp'
+
+    def ping(self, transport=None):
+        """Send one probe on `transport` ('udp' or 'tcp'), the active one by default."""
+        transport = transport or self.transport
+        path = self.paths.get(transport)
+        if path is None:
+            path = self.paths[transport] = ProbePath()
+        path.expire(time.perf_counter())
+        path.seq = (path.seq + 1) & CLOCK_MASK
+        path.pending[path.seq] = time.perf_counter()
+        path.sent += 1
+        args = [transport, path.seq, _now_us()]
+        osc = self.parent.osc_manager
+        # Straight onto the wire: a probe must not wait in a bundle
+        if transport == 'tcp':
+            osc.sendOSC_TCP('/ping', args)
+        else:
+            osc.stats.message('out', '/ping')
+            osc.udp.sendOSC('/ping', args)
+
+    def onPong(self, args):
+        """Handle /pong <transport> <seq> <sent_us> [<surface_ms>]."""
+        if len(args) < 3:
+            return
+        path = self.paths.get(str(args[0]))
+        if path is None:
+            return
+        rtt_ms = ((_now_us() - int(args[2])) & CLOCK_MASK) / 1000.0
+        path.answer(int(args[1]), rtt_ms)
+
+    def values(self):
+        values = []
+        for transport, path in sorted(self.paths.items()):
+            path.expire(time.perf_counter())
+            values += path.values(transport)
+        return values
+
+    def reset(self):
+        self.paths = {}
+
+    # -----------------------
+    # Periodic probe
+    # -----------------------
+    def schedule(self):
+        interval = self.config.probe_interval
+        if interval > 0 and not self._scheduled and not self._stopped:
+            self._scheduled = True
+            frames = max(1, round(interval * project.cookRate))
+            run("args[0]._probeTick()", self, delayFrames=frames)
+
+    def _probeTick(self):
+        self._scheduled = False
+        if self._stopped:
+            return
+        self.ping()
+        self.schedule()
+
+    def stop(self):
+        """End periodic probing; called when the extension is torn down."""
+        self._stopped = True
@@ -2,54 +2,210 @@
 BasicTouch extension - Layout management module.
 Handles all control positioning and layout calculations.
 
+Layout works on an in-memory copy of params_dat (one LayoutRow per parameter)
+and writes the result back with a single bulk commit().
+
 Created by: @from.vacuum aka Serhiy P.
 
 Licence: CC0
 """
 
+LAYOUT_COLUMNS = ['control_type', 'control_index', 'address',
+                  'x', 'y', 'width', 'height', 'layout_page']
+
+
+class LayoutRow:
+    """One params_dat row. Source columns stay in `cells`; layout results are attributes."""
+    __slots__ = ('cells', 'name', 'label', 'style', 'size', 'mode',
+                 'control_type', 'control_index', 'address',
+                 'x', 'y', 'width', 'height', 'page')
+
+    def __init__(self, cells, cols):
+        self.cells = cells
+        self.name = cells[cols['name']]
+        self.label = cells[cols['label']]
+        self.style = cells[cols['style']]
+        self.size = cells[cols['size']]
+        self.mode = cells[cols['mode']]
+        # Layout columns are empty until calculated, or restored from a committed table
+        self.control_type = cells[cols['control_type']]
+        self.control_index = int(cells[cols['control_index']] or 0)
+        self.address = cells[cols['address']]
+        x = cells[cols['x']]
+        if x == '':
+            self.x = self.y = self.width = self.height = None
+        else:
+            self.x = float(x)
+            self.y = float(cells[cols['y']])
+            self.width = float(cells[cols['width']])
+            self.height = float(cells[cols['height']])
+        self.page = int(cells[cols['layout_page']] or 1)
+
+    def clear(self):
+        """Forget computed control info (row moves to a later page)."""
+        self.control_type = ''
+        self.control_index = 0
+        self.address = ''
+        self.x = self.y = self.width = self.height = None
+
+
 class Layout:
     def __init__(self, parent):
         self.parent = parent
         self.config = parent.config
         self.dat = self.parent.params_dat
-        
-        for col in ['control_type', 'control_index', 'address',
-                    'x', 'y', 'width', 'height']:
-            if col not in self.dat.cols():
-                self.dat.appendCol(col)
+        self._start = 0
+        self._stop = None  # rows[_start:_stop] is the page being positioned
+        self.load()
+
+    def load(self, table=None):
+        """Read params_dat (or a previously committed table) once into the row model."""
+        if table is None:
+            table = [[cell.val for cell in cells] for cells in self.dat.rows()]
+        else:
+            table = [list(cells) for cells in table]
+        self.header = table[0] if table else []
+        for col in ['name', 'label', 'style', 'size', 'mode'] + LAYOUT_COLUMNS:
+            if col not in self.header:
+                self.header.append(col)
+        self.cols = {col: i for i, col in enumerate(self.header)}
+
+        width = len(self.header)
+        self.rows = []
+        for cells in table[1:]:
+            cells.extend([''] * (width - len(cells)))
+            self.rows.append(LayoutRow(cells, self.cols))
+
+    def commit(self):
+        """Write the row model back to params_dat in one bulk operation."""
+        cols = self.cols
+        table = [self.header]
+        for r in self.rows:
+            cells = r.cells
+            cells[cols['mode']] = r.mode
+            cells[cols['control_type']] = r.control_type
+            cells[cols['control_index']] = str(r.control_index) if r.control_type else ''
+            cells[cols['address']] = r.address
+            if r.x is not None:
+                cells[cols['x']] = r.x
+                cells[cols['y']] = r.y
+                cells[cols['width']] = r.width
+                cells[cols['height']] = r.height
+            else:
+                for col in ('x', 'y', 'width', 'height'):
+                    cells[cols[col]] = ''
+            cells[cols['layout_page']] = r.page
+            table.append(cells)
+
+        self.dat.clear()
+        self.dat.appendRows(table)
+        self.parent.debug("Layout committed: %s rows", len(self.rows))
+        return table
+
+    def restore(self, table):
+        """Adopt a committed table (e.g. from the layout cache) as the current layout."""
+        self.load(table)
+        return self.commit()
+
+    def calculatePages(self):
+        """Classify and position every row.
 
-    def calculateControlInfo(self):
+        Without paging everything goes on one page and rows past the control
+        limits or the document height are dropped. With paging the pooled
+        controls become a viewport: whenever a limit or the document height is
+        reached, a new page starts with fresh control indices.
+        """
+        for row in self.rows:
+            row.clear()
+            row.page = 1
+
+        if not self.config.paging:
+            self.calculateControlInfo()
+            self.calculateControlPositions()
+            return
+
+        start = 0
+        page = 1
+        while start < len(self.rows):
+            stop = self.calculateControlInfo(start)
+            end = self.calculateControlPositions(start, stop)
+            end = max(end, start + 1)
+            for row in self.rows[start:end]:
+                row.page = page
+            # Rows that did not fit are laid out again on the next page
+            for row in self.rows[end:]:
+                row.clear()
+            start = end
+            page += 1
+        self.parent.debug("Layout split into %s page(s)", self.pages)
+
+    @property
+    def pages(self) -> int:
+        return max((row.page for row in self.rows), default=1)
+
+    def pageRows(self, page=1):
+        """(row index, label index, row) for every row bound while `page` is shown.
+
+        Labels are numbered by params_dat row; with paging, by row within the page.
+        """
+        if not self.config.paging:
+            return [(i, i + 1, row) for i, row in enumerate(self.rows)]
+        out = []
+        first = None
+        for i, row in enumerate(self.rows):
+            if row.page == page:
+                if first is None:
+                    first = i
+                out.append((i, i - first + 1, row))
+        return out
+
+    def calculateControlInfo(self, start=0):
+        """Assign control type, index and address to rows from `start`.
+
+        Returns the index of the first row that did not get a control (len(rows)
+        when everything fit).
+        """
         # Split responsibilities via helpers; explicit grouping state; reduced duplication
         control_indices = {'fader': 0, 'button': 0, 'color': 0, 'radio': 0, 'xy': 0}
         group_state = {'xy_count': 0, 'color_count': 0}
-        
-        for row in range(1,  self.dat.numRows):
-            style_cell = self.dat[row, "style"]
-            if not style_cell:
+        paging = self.config.paging
+        label_limit = self.config.control_limits['label']
+
+        for i in range(start, len(self.rows)):
+            row = self.rows[i]
+            if not row.style:
                 continue
-            
-            control_type = self._classify_control_type(row, style_cell.val.lower(), self.dat[row, "size"])
+
+            control_type = self._classify_control_type(i, row.style.lower(), row.size)
             if not control_type:
                 continue
-            
+
             index = self._next_index(control_type, group_state, control_indices)
             if index > self.config.control_limits.get(control_type, 0):
+                if paging:
+                    return i
                 self.parent.showWarningDialog(f"Ran out of control for type [{control_type}]")
-                self.removeParamRows(row)
-                continue
+                self.removeParamRows(i)
+                break
+
+            if paging and i - start + 1 > label_limit and control_type != 'radio':
+                # Out of pooled labels; only the first row of a group needs one
+                prev = self.rows[i-1]
+                if not (prev.control_type == control_type and prev.control_index == index):
+                    return i
 
             self._write_row(row, control_type, index)
-        return
+        return len(self.rows)
 
-    def _classify_control_type(self, row: int, style: str, size: str = "") -> str:
+    def _classify_control_type(self, i: int, style: str, size: str = "") -> str:
         if style in ('float', 'int', 'xy', 'xyzw'):
             if size == "1":
                 return 'fader'
             if size == "2":
                 return 'xy'
             if size == "3":
-                prev_label = self.dat[row-2, 'label'].val if row > 2 else None
-                label = self.dat[row, 'label'].val
+                prev_label = self.rows[i-2].label if i > 1 else None
+                label = self.rows[i].label
                 if prev_label == label:
                     return 'fader'
                 return 'xy'
@@ -60,12 +216,6 @@ class Layout:
             return 'color'
         if style in ('menu', 'strmenu'):
             return 'radio'
-        # if style in ('xy', 'xyzw'):
-        #     # # Special-case: when two rows above is 'xyzw', treat current as fader
-        #     # prev2 = self.dat[row-2, 'style'] if row > 2 else None
-        #     # if prev2 and prev2.val.lower() == 'xyzw' and size == "3":
-        #     #     return 'fader'
-        #     return 'xy'
         return ''
 
     def _next_index(self, control_type: str, group_state: dict, control_indices: dict) -> int:
@@ -86,202 +236,192 @@ class Layout:
             control_indices[control_type] += 1
             return control_indices[control_type]
 
-    def _write_row(self, row: int, control_type: str, index: int) -> None:
-        """Write computed info back to the DAT for the given row."""
-        self.parent.debug(f"Control type: {row} {[c.val for c in self.dat.row(row)]}")
-        self.dat[row, "control_type"] = control_type
-        self.dat[row, 'control_index'] = str(index)
-        address = f"/{control_type}{index}"
-        self.dat[row, 'address'] = address
-        
-        par_name_cell = self.dat[row, 'name']
-        if par_name_cell:
-            par = self.parent.base_comp.par[par_name_cell.val]
+    def _write_row(self, row: LayoutRow, control_type: str, index: int) -> None:
+        """Store computed control info on the row."""
+        row.control_type = control_type
+        row.control_index = index
+        row.address = f"/{control_type}{index}"
+
+        if row.name:
+            par = self.parent.base_comp.par[row.name]
             if par is not None:
-                self.dat[row, 'mode'] = self.parent.parameter_manager.param_mode(par)
+                row.mode = self.parent.parameter_manager.param_mode(par)
         return
 
-    def calculateControlPositions(self):
-        """Calculate positions for all controls based on their types"""
+    def calculateControlPositions(self, start=0, stop=None):
+        """Calculate positions for all controls based on their types
+
+        Works on rows[start:stop] and returns where that page ends: with paging,
+        the first control group that overflows the document starts the next page.
+        """
         y = self.config.padding
-        
-        row = 1
-        while row < self.dat.numRows:
-            control_type = self.dat[row, 'control_type'].val
+        self._start = start
+        self._stop = len(self.rows) if stop is None else stop
+        self._control_height = self._calc_control_height()
+
+        i = start
+        while i < self._stop:
+            control_type = self.rows[i].control_type
             if control_type == '':
-                row += 1
+                i += 1
                 continue
-            
+
             x = self.config.padding
+            group_start = i
 
             # Handle different control types with dedicated functions
             if control_type == 'button':
                 # Check for consecutive buttons and position them
-                row, y = self.position_buttons(row, y)
+                i, y = self.position_buttons(i, y)
             elif control_type == 'xy':
                 # Position XY controls (possibly in pairs)
-                row, x, y = self.position_xy_control(row, x, y)
+                i, x, y = self.position_xy_control(i, x, y)
             elif control_type == 'color':
                 # Position color controls (rgb/rgba triplets) and skip their extra rows
-                row, y = self.position_color_control(row, x, y)
+                i, y = self.position_color_control(i, x, y)
             else:
                 # Position standard controls (fader, radio, etc.)
-                row, y = self.position_standard_control(row, x, y)
+                i, y = self.position_standard_control(i, x, y)
 
             # Check if we're running out of vertical space
             if y > self.config.doc_height - self.config.tab_bar_height:
+                if self.config.paging:
+                    if group_start == start:
+                        # A page always takes at least one control
+                        return i
+                    for row in self.rows[group_start:i]:
+                        row.x = row.y = row.width = row.height = None
+                    return group_start
                 self.parent.showWarningDialog(
                     f"Too many parameters for this document size.\nThe rest will be skipped.",
-                    f"Too many parameters: {row}:{self.dat.numRows} {y} {self.control_height()}"
+                    f"Too many parameters: {i + 1}:{len(self.rows) + 1} {y} {self.control_height()}"
                 )
-                self.removeParamRows(row)
+                self.removeParamRows(i)
                 break
-        
-        return
 
-    def position_buttons(self, row, y):
+        return self._stop
+
+    def _place(self, row: LayoutRow, x, y, width, height):
+        row.x = x
+        row.y = y
+        row.width = width
+        row.height = height
+
+    def position_buttons(self, i, y):
         """Position buttons, grouping consecutive ones horizontally"""
         # Count consecutive buttons (up to 5)
-        button_count = 1
-        button_rows = [row]
-        
-        for check_row in range(row + 1, min(row + 5, self.dat.numRows)):
-            if self.dat[check_row, 'control_type'].val == 'button':
-                button_count += 1
-                button_rows.append(check_row)
+        button_rows = [self.rows[i]]
+
+        for check in range(i + 1, min(i + 5, self._stop)):
+            if self.rows[check].control_type == 'button':
+                button_rows.append(self.rows[check])
             else:
                 break
-        
+        button_count = len(button_rows)
+
         # Calculate width for each button
         available_width = self.config.doc_width - (self.config.padding * (button_count + 1))
         button_width = available_width / button_count
         button_height = self.control_height()
-        
-        # Position each button
-        for i, btn_row in enumerate(button_rows):
-            btn_x = self.config.padding + i * (button_width + self.config.padding)
 
-            self.dat[btn_row, 'x'] = btn_x
-            self.dat[btn_row, 'y'] = y
-            self.dat[btn_row, 'width'] = button_width
-            self.dat[btn_row, 'height'] = button_height
+        # Position each button
+        for n, btn_row in enumerate(button_rows):
+            btn_x = self.config.padding + n * (button_width + self.config.padding)
+            self._place(btn_row, btn_x, y, button_width, button_height)
 
         # Move to next row and return updated position
-        next_row = button_rows[-1] + 1
+        next_i = i + button_count
         next_y = y + button_height + self.config.padding
-        return next_row, next_y
+        return next_i, next_y
 
-    def position_xy_control(self, row, x, y):
+    def position_xy_control(self, i, x, y):
         """Position XY control and handle its components"""
         control_height = self.config.doc_width/2 - self.config.padding*2
         control_width = control_height
-        
+        row = self.rows[i]
+
         # If previous control is also XY, join into one row
-        if row > 2 and self.dat[row-1, 'control_type'].val == 'xy':
-            x = float(self.dat[row-1, 'x'].val) + control_width + self.config.padding
-            y = float(self.dat[row-1, 'y'].val)
-        
-        self.dat[row, 'x'] = x
-        self.dat[row, 'y'] = y
-        self.dat[row, 'width'] = control_width
-        self.dat[row, 'height'] = control_height
-        
+        if i > 1 and i - 1 >= self._start and self.rows[i-1].control_type == 'xy':
+            x = self.rows[i-1].x + control_width + self.config.padding
+            y = self.rows[i-1].y
+
+        self._place(row, x, y, control_width, control_height)
+
         # Check if the next row is the Y component of this XY control
-        control_index = self.dat[row, 'control_index'].val
-        next_row = row + 1
-
-        if (row < self.dat.numRows - 1 and 
-            self.dat[row+1, 'control_type'].val == 'xy' and
-            self.dat[row+1, 'control_index'].val == control_index):
-            
-            self.dat[row+1, 'x'] = x
-            self.dat[row+1, 'y'] = y
-            self.dat[row+1, 'width'] = control_width
-            self.dat[row+1, 'height'] = control_height
-            
-            next_row = row + 2  # Skip to after the Y component
+        nxt = self.rows[i+1] if i + 1 < self._stop else None
+        if nxt is not None and nxt.control_type == 'xy' and nxt.control_index == row.control_index:
+            self._place(nxt, x, y, control_width, control_height)
+            next_i = i + 2  # Skip to after the Y component
         else:
-            next_row = row + 1
-        
+            next_i = i + 1
+
         next_y = y + control_height + self.config.padding
-        return next_row, x, next_y
+        return next_i, x, next_y
 
-    def position_color_control(self, row, x, y):
+    def position_color_control(self, i, x, y):
         """Position a color control composed of 3 rows (rgb/rgba) sharing one index.
         If the next rows belong to the same color group, give them the same rect and skip them.
         """
         control_width = self.control_width()
         control_height = self.control_height()
-        
+        row = self.rows[i]
+
         # Base position for the color control (apply to up to 3 rows)
-        self.dat[row, 'x'] = x
-        self.dat[row, 'y'] = y
-        self.dat[row, 'width'] = control_width
-        self.dat[row, 'height'] = control_height
-        
-        idx = self.dat[row, 'control_index'].val
-        next_row = row + 1
-        
-        # If the next rows are color with same index, align them to the same rect and skip
-        if next_row < self.dat.numRows and self.dat[next_row, 'control_type'].val == 'color' and self.dat[next_row, 'control_index'].val == idx:
-            self.dat[next_row, 'x'] = x
-            self.dat[next_row, 'y'] = y
-            self.dat[next_row, 'width'] = control_width
-            self.dat[next_row, 'height'] = control_height
-            
-            third_row = next_row + 1
-            if third_row < self.dat.numRows and self.dat[third_row, 'control_type'].val == 'color' and self.dat[third_row, 'control_index'].val == idx:
-                self.dat[third_row, 'x'] = x
-                self.dat[third_row, 'y'] = y
-                self.dat[third_row, 'width'] = control_width
-                self.dat[third_row, 'height'] = control_height
-                next_row = row + 3
-            else:
-                next_row = row + 2
-        
+        next_i = i + 1
+        for k in range(3):
+            member = self.rows[i + k] if i + k < self._stop else None
+            if member is None or (k and (member.control_type != 'color' or
+                                         member.control_index != row.control_index)):
+                break
+            self._place(member, x, y, control_width, control_height)
+            next_i = i + k + 1
+
         next_y = y + control_height + self.config.padding
-        return next_row, next_y
+        return next_i, next_y
 
-    def position_standard_control(self, row, x, y):
+    def position_standard_control(self, i, x, y):
         """Position standard controls like faders, radio buttons, etc."""
-        self.dat[row, 'x'] = x
-        self.dat[row, 'y'] = y
-        self.dat[row, 'width'] = self.control_width()
-        self.dat[row, 'height'] = self.control_height()
-        
-        next_row = row + 1
+        self._place(self.rows[i], x, y, self.control_width(), self.control_height())
+
+        next_i = i + 1
         next_y = y + self.control_height() + self.config.padding
-        return next_row, next_y
-    
-    def removeParamRows(self, start_row):
-        for row in range(start_row, self.dat.numRows):
-            self.dat.deleteRow(start_row)
+        return next_i, next_y
+
+    def removeParamRows(self, start):
+        """Drop rows from `start` (0-based model index) to the end."""
+        del self.rows[start:]
         return
 
-        
+
     def calculateGridPositions(self, total_items, cols, rows, item_width, item_height, padding):
         positions = []
-        
+
         for i in range(total_items):
             # Calculate row and column for this item
             col = i % cols
             row = i // cols
-            
+
             # Calculate x and y positions
             x = padding + col * (item_width + padding)
             y = padding + row * (item_height + padding)
-            
+
             positions.append((x, y, item_width, item_height))
-            
+
         return positions
-    
+
     def control_height(self):
+        """Control height for the current pass; counted once per calculateControlPositions()."""
+        height = getattr(self, '_control_height', None)
+        if height is None:
+            height = self._calc_control_height()
+        return height
+
+    def _calc_control_height(self):
         if not getattr(self.config, 'scale_controls_height', 0):
             return self.config.min_control_height
         else:
             # Calculate scaled height with minimum of self.min_control_height
-            num_controls = sum(1 for row in range(1, self.dat.numRows)
-                             if self.dat[row, 'control_type'].val)
+            num_controls = sum(1 for row in self.rows[self._start:self._stop] if row.control_type)
             if not num_controls:
                 return self.config.min_control_height
 
@@ -0,0 +1,150 @@
+"""
+BasicTouch extension - Layout cache module.
+Persists computed layouts so switching between known targets skips the
+parameter load, layout passes and menu label processing.
+
+A cache entry is keyed by a hash of everything the layout depends on: the
+target's parameter table (names, labels, styles, sizes, ...), menu entries,
+parameter modes, document size and appearance settings. Any change there
+produces a different key, so stale entries are simply never hit.
+
+Setup messages are cached as (address, args) lists rather than encoded
+packets: a setup diffs them per control against the last one sent, the UDP
+path hands address and args to the OSC Out DAT, which encodes them itself,
+and only the changed controls of a setup are encoded at all. Caching the
+packets as well would grow every entry for a saving limited to those controls.
+
+The folder keeps the max_entries most recently used entries; a hit refreshes
+its entry's modification time and a store prunes the oldest.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import hashlib
+import json
+import os
+
+# Bump when the cached table or setup message format changes
+CACHE_VERSION = 3
+MAX_ENTRIES = 64
+
+
+class LayoutCache:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.folder = os.path.join(project.folder, 'BasicTouchCache')
+        self.max_entries = MAX_ENTRIES
+
+    def signature(self) -> str:
+        """Hash of the target's parameter signature and the layout settings."""
+        config = self.config
+        base_comp = self.parent.base_comp
+        parameter_manager = self.parent.parameter_manager
+        h = hashlib.sha1()
+
+        def feed(*values):
+            h.update(repr(values).encode('utf-8'))
+
+        feed(CACHE_VERSION, config.doc_width, config.doc_height, config.tab_bar_height,
+             config.scale_controls_height, config.font_size, config.padding,
+             config.min_control_height, tuple(config.color),
+             sorted(config.control_limits.items()), tuple(config.supported_styles),
+             config.paging)
+
+        source = op('../source_parameters')
+        for cells in source.rows():
+            values = [cell.val for cell in cells]
+            feed(*values)
+            par = base_comp.par[values[0]] if base_comp is not None else None
+            if par is not None:
+                feed(parameter_manager.param_mode(par),
+                     tuple(par.menuLabels) if par.isMenu else ())
+
+        return h.hexdigest()
+
+    def path(self, signature: str) -> str:
+        return os.path.join(self.folder, f'{signature}.json')
+
+    def load(self, signature: str):
+        """Cached (table, controls) for the signature, or None on a miss.
+
+        controls has the shape returned by OSCManager.layoutMessages().
+        """
+        try:
+            with open(self.path(signature), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.parent.log.warning("Layout cache unreadable, ignoring: %s", e)
+            return None
+
+        if entry.get('version') != CACHE_VERSION:
+            return None
+
+        controls = {}
+        base_comp = self.parent.base_comp
+        for control_type, control_index, par_name, label_row, messages in entry['controls']:
+            par = base_comp.par[par_name]
+            if par is None:
+                # Signature matched but the target changed underneath; recompute
+                return None
+            controls[(control_type, control_index)] = (par, label_row, messages)
+
+        try:
+            os.utime(self.path(signature))
+        except OSError:
+            pass
+        self.parent.debug("Layout cache hit %s", signature)
+        return entry['table'], controls
+
+    def store(self, signature: str, table, controls):
+        """Write an entry atomically; failures only cost the next switch a full layout."""
+        entry = {
+            'version': CACHE_VERSION,
+            'table': table,
+            'controls': [
+                [control_type, control_index, par.name, label_row, messages]
+                for (control_type, control_index), (par, label_row, messages) in controls.items()
+            ],
+        }
+        path = self.path(signature)
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+            self.parent.debug("Layout cached as %s", signature)
+            self.prune()
+        except (OSError, TypeError, ValueError) as e:
+            self.parent.log.warning("Could not write layout cache: %s", e)
+
+    def prune(self, keep: int = None):
+        """Delete all but the `keep` (max_entries) most recently used entries."""
+        keep = self.max_entries if keep is None else keep
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        entries.sort(reverse=True)
+        for _, path in entries[keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if len(entries) > keep:
+            self.parent.debug("Layout cache pruned %s entries", len(entries) - keep)
+
+    def clear(self):
+        """Delete every cached layout."""
+        if not os.path.isdir(self.folder):
+            return
+        for name in os.listdir(self.folder):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.folder, name))
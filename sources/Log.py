@@ -0,0 +1,114 @@
+"""
+BasicTouch extension - Log module.
+Leveled logging into an in-memory ring buffer.
+
+Calls take a %-style format string and its arguments separately, as the
+logging module does:
+
+    self.parent.log.debug("Parameter %s changed to %s", par.name, value)
+
+The level is checked before anything else, so a disabled call costs one
+comparison; an enabled one stores the unformatted record. Records are only
+formatted when they are echoed to the Textport or dumped, which keeps logging
+usable during a show. Arguments are kept by reference, so pass names and
+values rather than operators.
+
+`Debug Log` sets the level to DEBUG (WARNING otherwise) and prints each
+record to the Textport as it is logged; turn `Log Echo` off to only keep them
+in the buffer during a show. dump() writes the buffer to a DAT or a file.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import os
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+
+class Logger:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.level = DEBUG if self.config.debug_log else WARNING
+        self.echo = self.config.debug_log and self.config.log_echo
+        self.records = deque(maxlen=self.config.log_size)  # (time, level, format, args)
+
+    def log(self, level: int, message: str, *args):
+        if level >= self.level:
+            self._record(level, message, args)
+
+    def debug(self, message: str, *args):
+        if self.level <= DEBUG:
+            self._record(DEBUG, message, args)
+
+    def info(self, message: str, *args):
+        if self.level <= INFO:
+            self._record(INFO, message, args)
+
+    def warning(self, message: str, *args):
+        if self.level <= WARNING:
+            self._record(WARNING, message, args)
+
+    def error(self, message: str, *args):
+        if self.level <= ERROR:
+            self._record(ERROR, message, args)
+
+    def _record(self, level, message, args):
+        record = (time.time(), level, message, args)
+        self.records.append(record)
+        if self.echo:
+            debug(self.format(record))
+
+    @property
+    def debugging(self) -> bool:
+        """Whether debug records are kept; guards work done only to build log arguments."""
+        return self.level <= DEBUG
+
+    @staticmethod
+    def formatMessage(message: str, args) -> str:
+        if not args:
+            return message
+        try:
+            return message % args
+        except Exception:
+            return f"{message} {args!r}"
+
+    def format(self, record) -> str:
+        t, level, message, args = record
+        stamp = time.strftime('%H:%M:%S', time.localtime(t)) + f'.{int(t * 1000) % 1000:03d}'
+        return f"{stamp} {LEVEL_NAMES.get(level, level)} {self.formatMessage(message, args)}"
+
+    def clear(self):
+        self.records.clear()
+
+    def dump(self, target=None):
+        """Write the buffered records to a table/text DAT or a file path; returns where they went.
+
+        Without a target a timestamped file in the project's BasicTouchLogs folder is written.
+        """
+        records = list(self.records)
+        if target is not None and not isinstance(target, str):
+            if hasattr(target, 'appendRows'):
+                target.clear()
+                target.appendRows([['time', 'level', 'message']] + [
+                    [round(t, 3), LEVEL_NAMES.get(level, level), self.formatMessage(message, args)]
+                    for t, level, message, args in records])
+            else:
+                target.text = '\n'.join(self.format(record) for record in records)
+            return target
+
+        path = target or os.path.join(project.folder, 'BasicTouchLogs',
+                                      time.strftime('log-%Y%m%d-%H%M%S.txt'))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(self.format(record))
+                f.write('\n')
+        return path
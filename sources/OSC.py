@@ -6,8 +6,9 @@ Created by: @from.vacuum aka Serhiy P.
 
 Licence: CC0
 """
-import time
+import re
 import struct
+from functools import partial
 from typing import List
 
 
@@ -20,125 +21,222 @@ class OSCManager:
         self.tcp = op('../tcpip1')
         self.udp = op('../oscout2')
         self.osc_in = op('../oscin2')
+        self.stats = parent.stats
+        self.log = parent.log
+        self.encoder = OSCEncoder()
+        self.slip = SlipCodec()
+        self._bundle = None  # encoded packets collected between beginBundle/flushBundle
+        self._bundle_depth = 0
+        self.control_map = None  # (control_type, index) -> Par, built lazily
+        self.routes = None  # exact address -> handler(args), see buildRoutes
+        self._pattern_cache = {}  # address pattern -> matching handlers
+        self.sent_layout = None  # last completed setup, see iterControlsToOSC
+        self.sent_target = None
+        self.hide_generation = 0  # counts hideControls(), so others know to resend
         
-    def sendOSC(self, address, args):
-       if not self.UDP_TCP:
-           self.parent.debug(f"sendOSC_UDP called: {address} {args}")
+    def sendOSC(self, address, args, static=False):
+       if self._bundle is not None:
+           self.log.debug("sendOSC bundled: %s %s", address, args)
+           self._queueBundled(address, args, static)
+       elif not self.UDP_TCP:
+           self.log.debug("sendOSC_UDP called: %s %s", address, args)
+           self.stats.message('out', address)
            self.udp.sendOSC(address, args)
        else:
-           self.parent.debug(f"sendOSC_TCP called: {address} {args}")
-           self.sendOSC_TCP(address, args)        
+           self.log.debug("sendOSC_TCP called: %s %s", address, args)
+           self.sendOSC_TCP(address, args, static)        
     
-    def sendOSC_TCP(self, address, args):
+    def sendOSC_TCP(self, address, args, static=False):
         """Build an OSC packet, SLIP-encode it (OSC 1.1 over TCP), and send via TCP/IP DAT.
 
         Args:
             address (str): OSC address pattern, e.g. '/foo/bar'
             args (list|tuple): OSC arguments. Supports int, float, str, bytes/bytearray (blob),
                                bool (T/F), None (N), and nested lists/tuples (OSC arrays).
+            static (bool): Message never changes (e.g. /hide_control); keep the whole
+                           encoded packet cached instead of re-encoding it.
         """
         try:
-            if not isinstance(address, str) or not address.startswith('/'):
-                raise ValueError('OSC address must be a string starting with "/"')
+            packet = self._encode(address, args, static)
+            self.stats.message('out', address, len(packet))
+            self._sendTcpPacket(packet)
+        except Exception as e:
+            if hasattr(self, 'log'):
+                self.log.error("sendOSC error: %s", e)
+            else:
+                print('sendOSC error:', e)
 
-            # Build OSC message bytes
-            packet = self._build_osc_message(address, args or [])
+    # -----------------------
+    # OSC bundles
+    # -----------------------
+    def beginBundle(self):
+        """Collect every following sendOSC into bundles until flushBundle().
 
-            # SLIP-encode with double END framing per OSC 1.1 recommendation
-            framed = self._slip_encode(packet)
+        Calls nest; only the outermost flushBundle() sends.
+        """
+        self._bundle_depth += 1
+        if self._bundle is None:
+            self._bundle = []
+
+    def flushBundle(self):
+        """Send the collected messages as MTU-sized bundles."""
+        self._bundle_depth = max(0, self._bundle_depth - 1)
+        if self._bundle_depth or self._bundle is None:
+            return
+        packets, self._bundle = self._bundle, None
+        try:
+            for packet in self.encoder.bundles(packets, self.config.bundle_size):
+                self._sendPacket(packet)
+        except Exception as e:
+            self.log.error("sendOSC bundle error: %s", e)
 
-            # Send raw bytes via TCP/IP DAT
-            if hasattr(self.tcp, 'sendBytes'):
-                self.tcp.sendBytes(framed)
-            elif hasattr(self.tcp, 'send'):
-                # Fallback: some builds may allow sending bytes through send()
-                self.tcp.send(framed, terminator='')
-            else:
-                raise RuntimeError('TCP/IP DAT does not support sending bytes via Python API')
+    @property
+    def bundling(self) -> bool:
+        return self._bundle is not None
 
+    def _queueBundled(self, address, args, static):
+        try:
+            packet = self._encode(address, args, static)
+            self.stats.message('out', address, len(packet))
+            self._bundle.append(packet)
         except Exception as e:
-            if hasattr(self, 'parent') and hasattr(self.parent, 'debug'):
-                self.parent.debug(f"sendOSC error: {e}")
-            else:
-                print('sendOSC error:', e)
+            self.log.error("sendOSC error: %s", e)
+
+    def _encode(self, address, args, static=False) -> bytes:
+        if not isinstance(address, str) or not address.startswith('/'):
+            raise ValueError('OSC address must be a string starting with "/"')
+        if static:
+            return self.encoder.encode_static(address, args or [])
+        return self.encoder.encode(address, args or [])
+
+    def _sendPacket(self, packet: bytes):
+        """Send an encoded OSC packet (message or bundle) on the active transport."""
+        if self.UDP_TCP:
+            self._sendTcpPacket(packet)
+        else:
+            self.stats.count('out packets udp')
+            self.stats.count('out wire bytes udp', len(packet))
+            self.udp.sendBytes(packet)
+
+    def _sendTcpPacket(self, packet: bytes):
+        # SLIP-encode with double END framing per OSC 1.1 recommendation
+        framed = self.slip.encode(packet)
+        self.stats.count('out packets tcp')
+        self.stats.count('out wire bytes tcp', len(framed))
+
+        # Send raw bytes via TCP/IP DAT
+        if hasattr(self.tcp, 'sendBytes'):
+            self.tcp.sendBytes(framed)
+        elif hasattr(self.tcp, 'send'):
+            # Fallback: some builds may allow sending bytes through send()
+            self.tcp.send(framed, terminator='')
+        else:
+            raise RuntimeError('TCP/IP DAT does not support sending bytes via Python API')
+
+    def iterControlsToOSC(self, full=False, controls=None):
+        """Send the setup messages of the calculated layout, one control per step.
+
+        Only controls whose setup messages (rect, mode, label, menu, color)
+        differ from the last completed setup are sent, plus hides for controls
+        that are gone. A full setup hides everything and resends all controls;
+        it happens on the first setup, after a target change, or when asked.
+
+        Yields the fraction of changed controls sent so far, so a caller can
+        spread the setup over several frames.
 
-    def sendControlsToOSC(self):
-        """Send OSC messages for each control using data from params_dat"""
-        # Group parameters for faster processing and to avoid duplicates
-        processed_controls = set()
-        self.hideControls()
+        Args:
+            full (bool): Hide and resend everything.
+            controls (dict): Precomputed layoutMessages(), e.g. from the layout cache.
+        """
+        if controls is None:
+            controls = self.layoutMessages(self.parent.current_page)
+        previous = self.sent_layout
+        target = self.parent.config.base_comp_path
+        # Until this setup completes, the surface state is unknown
+        self.sent_layout = None
+
+        if full or previous is None or self.sent_target != target:
+            self.hideControls()
+            previous = {}
+        else:
+            used_labels = {label_row for _, label_row, _ in controls.values()}
+            for key, (_, label_row, _) in previous.items():
+                if key not in controls:
+                    self.sendOSC('/hide_control', list(key), static=True)
+                if label_row is not None and label_row not in used_labels:
+                    self.sendOSC('/hide_control', ['label', label_row], static=True)
+
+        # A control rebound to another parameter (page flip) needs its value resent
+        changed = [key for key, (par, _, messages) in controls.items()
+                   if key not in previous or previous[key][2] != messages
+                   or previous[key][0].name != par.name]
+        self.parent.debug("Setup diff: %s of %s controls changed", len(changed), len(controls))
+
+        for n, key in enumerate(changed, 1):
+            par, _, messages = controls[key]
+            for address, args in messages:
+                self.sendOSC(address, args)
 
-        # Process all parameters
-        for row in range(1, self.parent.params_dat.numRows):
-            param_name = self.parent.params_dat[row, 'name'].val
-            control_type = self.parent.params_dat[row, 'control_type'].val
+            # Send initial value
+            self.parent.parameter_manager.sendValue(par, force=True)
+
+            self.parent.debug("Created control %s%s for %s", key[0], key[1], par.name)
+            yield n / len(changed)
+
+        self.sent_layout = controls
+        self.sent_target = target
+
+    def layoutMessages(self, page=1):
+        """Setup messages of every control laid out on `page`, in layout order.
+
+        Returns:
+            dict: (control_type, control_index) -> (Par, label row or None, [[address, args]])
+        """
+        controls = {}
+        base_comp = self.parent.base_comp
+
+        for i, label_row, row in self.parent.layout_manager.pageRows(page):
+            control_type = row.control_type
             if not control_type:
                 continue
-            control_index = int(
-                self.parent.params_dat[row, 'control_index'].val)
-            control_key = f"{control_type}{control_index}"
+            control_index = row.control_index
+            key = (control_type, control_index)
 
             # Skip if already processed (for paired controls like XY, RGB)
-            if control_key in processed_controls:
+            if key in controls:
                 continue
 
-            processed_controls.add(control_key)
+            if row.x is None:  # Skip if position is not set
+                continue
 
             # Get parameter object
-            par = self.parent.base_comp.par[param_name]
+            par = base_comp.par[row.name]
             if par is None:
-                self.parent.debug(
-                    f"Parameter {param_name} not found in {self.parent.base_comp} base component")
+                self.parent.debug("Parameter %s not found in %s base component", row.name, base_comp.path)
                 continue
 
-            # Extract values from params_dat
-            name = self.parent.params_dat[row, 'label'].val
-            x = self.parent.params_dat[row, 'x'].val
-            y = self.parent.params_dat[row, 'y'].val
-            width = self.parent.params_dat[row, 'width'].val
-            height = self.parent.params_dat[row, 'height'].val
-            mode = self.parent.params_dat[row, 'mode'].val
+            rect = [row.x, row.y, row.width, row.height]
+            # Control configuration
+            messages = [['/modify_control', [
+                control_type, control_index, *rect, row.mode, list(self.menu_labels(par))
+            ]]]
 
-            if x == '':  # Skip if position is not set
-                continue
-
-            
-
-            # Send control configuration
-            self.sendOSC('/modify_control', [
-                control_type,
-                control_index,
-                x, y,
-                width, height,
-                mode,
-                self.menu_labels(par)
-            ])
-            
-            if control_type != 'radio':
-                # Send label position
-                self.sendOSC('/modify_control', [
-                    "label",
-                    row,
-                    x, y,
-                    width, height,
-                    "expression",
-                    []
-                ])
-
-                # Send label text + size
-                self.sendOSC('/label' + str(row), [name])
+            if control_type == 'radio':
+                label_row = None
+            else:
+                # Label position, then label text
+                messages.append(['/modify_control', ['label', label_row, *rect, "expression", []]])
+                messages.append(['/label' + str(label_row), [row.label]])
 
-            # Send initial value
-            self.parent.OnValueChange(par, None)  # This might trigger sendOSC internally, consider if delay is needed there too
+            # Color
+            messages.append(['/color_control', [control_type, control_index, *self.config.color]])
+            controls[key] = (par, label_row, messages)
 
-            # Send color
-            self.sendOSC('/color_control', [control_type, control_index, *self.config.color])
+        return controls
 
-            self.parent.debug(
-                f"Created control {control_type}{control_index} for {par.name}")
-            
-            if self.config.sleep_time > 0:
-                time.sleep(self.config.sleep_time)
+    def forgetLayout(self):
+        """Make the next setup a full one, e.g. after the surface reconnects."""
+        self.sent_layout = None
 
     def menu_labels(self, par) -> List[str]:  
         # For menus, send up to first 20 labels (TouchOSC limit)
@@ -160,112 +258,188 @@ class OSCManager:
 
         
     def hideControls(self):
+        self.hide_generation += 1
         for control_type, count in self.config.control_limits.items():
             for i in range(1, count + 1):
-                self.sendOSC('/hide_control', [control_type, i])
+                self.sendOSC('/hide_control', [control_type, i], static=True)
 
     def OnReceiveOSC(self, dat, rowIndex, message, byteData, timeStamp, address, args, peer):
+        self.stats.message('in', address, len(byteData) if byteData else 0)
         try:
-            if address == '/fadeTimeFader1':
-                self.parent.debug(f"Fade time changed to {args[0]}")
-                if self.parent.preset_manager:
-                    self.parent.preset_manager.setFadeTime(args[0])
+            routes = self.routes if self.routes is not None else self.buildRoutes()
+            handler = routes.get(address)
+            if handler is not None:
+                handler(args)
                 return
 
-            if address == '/Randomize/RandomAmount1':
-                self.parent.debug(f"Random amount changed to {args[0]}")
-                if self.parent.randomize_manager:
-                    self.parent.randomize_manager.random_amount = float(args[0])
+            handlers = self.matchPattern(address)
+            if not handlers:
+                self.stats.count('in dropped')
+                self.log.debug("Unknown OSC address. Ignoring message: %s", address)
                 return
-
-            self.parent.debug(f"Received OSC message: {address} with args: {args}")
-            control_name, control_type, index = self.parseAddress(address)
-
-            if control_name is None:
-                self.parent.debug(f"Cant parse OSC address. Ignoring message: {address}")
-                return
-
-            # Keep existing logic for preset buttons
-            if control_name.startswith('PBUTTONS/'):
-                if self.parent.preset_manager:
-                    self.parent.preset_manager.recall_preset(index)
-                return
-
-            # Keep existing logic for randomize buttons
-            if control_name.startswith('RBUTTONS/'):
-                self.parent.debug(f"Randomize button {index} pressed")
-                if self.parent.randomize_manager:
-                    self.parent.randomize_manager.randomize(index)
-                return
-
-            param_name = self.find_parameter_by_control(control_type, index)
-            if not param_name:
-                self.parent.debug(f"Parameter not found for control {control_name}")
-                return
-
-            param = self.parent.base_comp.par[param_name]
-            if param is None:
-                self.parent.debug(f"Parameter {param_name} not found in base component")
-                return
-
-            # Use parameter manager to update parameter value
-            self.parent.parameter_manager.update_parameter_value(param, args)
-            self.parent.debug(f"Updated {param.name} to {args}")
+            for handler in handlers:
+                handler(args)
         except Exception as e:
-            self.parent.debug(f"Error handling OSC message: {e}")
-
-    def parseAddress(self, address):
-        control_name = address.lstrip('/')
-
-        # Special case handling for PBUTTONS/ and RBUTTONS/
-        if control_name.startswith('PBUTTONS/') or control_name.startswith('RBUTTONS/'):
-            parts = control_name.split('/')
-            if len(parts) == 2 and parts[1].isdigit():
-                return control_name, parts[0], int(parts[1])
-
-        # Find the transition between letters and digits
-        prefix_end = 0
-        for i, char in enumerate(control_name):
-            if char.isdigit():
-                prefix_end = i
-                break
-
-        # If no digits found or starts with digit, can't parse properly
-        if prefix_end == 0 or prefix_end == len(control_name):
-            self.parent.debug(f"Address format not recognized: {address}")
-            return None, None, None
-
-        control_type = control_name[:prefix_end]
-        index_str = control_name[prefix_end:]
-        try:
-            index = int(index_str)
-        except ValueError:
-            self.parent.debug(f"Invalid index {index_str}")
-            return None, None, None
-
-        return control_name, control_type, index
-
-    def find_parameter_by_control(self, control_type, index):
-        """
-        Find parameter name that corresponds to a specific control type and index
-
-        Args:
-            control_type (str): Type of control (fader, button, etc.)
-            index (int): Index of the control
+            self.stats.count('in errors')
+            self.log.error("Error handling OSC message: %s", e)
 
-        Returns:
-            str or None: Parameter name if found, None otherwise
+    # -----------------------
+    # Inbound routing
+    # -----------------------
+    def buildRoutes(self):
+        """Map every exact inbound address to its bound handler, once per setup."""
+        if self.control_map is None:
+            self.buildControlMap()
+
+        routes = {
+            '/fadeTimeFader1': self._onFadeTime,
+            '/Randomize/RandomAmount1': self._onRandomAmount,
+            '/page': self._onPage,
+            '/page/next': partial(self._onPageStep, 1),
+            '/page/prev': partial(self._onPageStep, -1),
+            '/preset/save': self._onPresetSave,
+            '/presets/page': self._onPresetPage,
+            '/presets/next': partial(self._onPresetPageStep, 1),
+            '/presets/prev': partial(self._onPresetPageStep, -1),
+            '/presets/search': self._onPresetSearch,
+            '/stats': self._onStats,
+            '/pong': self.parent.latency_probe.onPong,
+        }
+        for i in range(1, self.config.control_limits['pbutton'] + 1):
+            routes[f'/PBUTTONS/{i}'] = partial(self._onPresetButton, i)
+        for i in range(1, len(self.parent.randomize_manager.random_buttons) + 1):
+            routes[f'/RBUTTONS/{i}'] = partial(self._onRandomizeButton, i)
+        for key, par in self.control_map.items():
+            control_type, index = key
+            routes[f'/{control_type}{index}'] = partial(self._onControl, key, par)
+
+        self.routes = routes
+        self._pattern_cache = {}
+        return routes
+
+    def matchPattern(self, address):
+        """Handlers for an OSC 1.0 address pattern (*, ?, [], {}), cached per pattern."""
+        handlers = self._pattern_cache.get(address)
+        if handlers is not None:
+            return handlers
+
+        handlers = ()
+        if any(c in address for c in '*?[{'):
+            try:
+                regex = re.compile(_osc_pattern_to_regex(address))
+                handlers = tuple(h for a, h in self.routes.items() if regex.fullmatch(a))
+            except (re.error, ValueError):
+                self.log.warning("Invalid OSC address pattern: %s", address)
+
+        if len(self._pattern_cache) >= 1024:
+            self._pattern_cache.clear()
+        self._pattern_cache[address] = handlers
+        return handlers
+
+    def _onControl(self, key, par, args):
+        if not par.valid:
+            # Target's custom parameters were rebuilt; rebind and retry once
+            self.invalidateControlMap()
+            self.buildRoutes()
+            par = self.lookupControl(*key)
+            if par is None:
+                return
+        if key[0] in self.config.coalesced_controls:
+            # Continuous controls: only the newest value per frame is applied
+            self.parent.parameter_manager.queue_parameter_value(key, par, args)
+            return
+        # Use parameter manager to update parameter value
+        self.parent.parameter_manager.update_parameter_value(par, args)
+        self.log.debug("Updated %s to %s", par.name, args)
+
+    def _onFadeTime(self, args):
+        self.parent.debug("Fade time changed to %s", args[0])
+        if self.parent.preset_manager:
+            self.parent.preset_manager.setFadeTime(args[0])
+
+    def _onRandomAmount(self, args):
+        self.parent.debug("Random amount changed to %s", args[0])
+        if self.parent.randomize_manager:
+            self.parent.randomize_manager.random_amount = float(args[0])
+
+    def _onPage(self, args):
+        if args:
+            self.parent.SetPage(int(args[0]))
+
+    def _onPageStep(self, step, args):
+        # Buttons send 1 on press and 0 on release
+        if args and args[0]:
+            self.parent.SetPage(self.parent.current_page + step)
+
+    def _onPresetSave(self, args):
+        # Optional name; a plain button press sends a number
+        name = args[0] if args and isinstance(args[0], str) else None
+        if name is None and args and not args[0]:
+            return  # button release
+        self.parent.SavePreset(name)
+
+    def _onPresetPage(self, args):
+        if args and self.parent.preset_manager:
+            self.parent.preset_manager.setPage(int(args[0]) - 1)
+
+    def _onPresetPageStep(self, step, args):
+        preset_manager = self.parent.preset_manager
+        if args and args[0] and preset_manager:
+            preset_manager.setPage(preset_manager.page + step)
+
+    def _onPresetSearch(self, args):
+        if self.parent.preset_manager:
+            self.parent.preset_manager.search(str(args[0]) if args else '')
+
+    def _onStats(self, args):
+        self.parent.stats.publish()
+        self.parent.stats.reply()
+
+    def _onPresetButton(self, index, args):
+        if self.parent.preset_manager:
+            self.parent.preset_manager.recall_preset(index)
+
+    def _onRandomizeButton(self, index, args):
+        self.parent.debug("Randomize button %s pressed", index)
+        if self.parent.randomize_manager:
+            self.parent.randomize_manager.randomize(index)
+
+    def lookupControl(self, control_type, index):
+        """Resolved Par for a control, via the (control_type, index) index."""
+        if self.control_map is None:
+            self.buildControlMap()
+        par = self.control_map.get((control_type, index))
+        if par is not None and not par.valid:
+            # Target's custom parameters were rebuilt since the index was made
+            self.buildControlMap()
+            par = self.control_map.get((control_type, index))
+        return par
+
+    def buildControlMap(self):
+        """Index (control_type, index) -> Par for the current page in one pass.
+
+        Grouped controls (XY, RGB) share an index; the first row of the group is
+        kept, its parGroup covers the rest.
         """
-        for row in range(1, self.parent.params_dat.numRows):
-            row_control_type = self.parent.params_dat[row, 'control_type'].val
-            if not row_control_type:
-                continue
-
-            row_control_index = int(self.parent.params_dat[row, 'control_index'].val)
-            if row_control_type == control_type and row_control_index == index:
-                return self.parent.params_dat[row, 'name'].val
-
-        return None
+        control_map = {}
+        base_comp = self.parent.base_comp
+        if base_comp is not None:
+            for _, _, row in self.parent.layout_manager.pageRows(self.parent.current_page):
+                if not row.control_type:
+                    continue
+                key = (row.control_type, row.control_index)
+                if key in control_map:
+                    continue
+                par = base_comp.par[row.name]
+                if par is not None:
+                    control_map[key] = par
+        self.control_map = control_map
+        self.parent.debug("Control map built: %s controls", len(control_map))
+
+    def invalidateControlMap(self):
+        """Drop the control index and the routes bound to it."""
+        self.control_map = None
+        self.routes = None
 
     def resetOSC(self):
         pass
@@ -283,140 +457,22 @@ class OSCManager:
         Note: Wire this to the TCP/IP DAT's onReceive callback: call
               op('path/to/thisDAT').par.extension.feedTcpBytes(byteData)
         """
-        if not hasattr(self, '_rx_buf'):
-            self._rx_buf = bytearray()
-
-        END = 0xC0
-        ESC = 0xDB
-        ESC_END = 0xDC
-        ESC_ESC = 0xDD
-
-        buf = self._rx_buf
-        frame = bytearray()
-        esc = False
-
-        for byte in incoming:
-            if esc:
-                if byte == ESC_END:
-                    frame.append(END)
-                elif byte == ESC_ESC:
-                    frame.append(ESC)
-                else:
-                    # Invalid escape, keep raw
-                    frame.append(byte)
-                esc = False
-                continue
-
-            if byte == ESC:
-                esc = True
-                continue
-
-            if byte == END:
-                if frame:
-                    # Complete frame: decode OSC and route
-                    try:
-                        addr, argv = self._decode_osc_message(bytes(frame))
-                        # Reuse existing OnReceiveOSC workflow
-                        self.OnReceiveOSC(None, -1, None, None, None, addr, argv, None)
-                    except Exception as e:
-                        if hasattr(self.parent, 'debug'):
-                            self.parent.debug(f'OSC decode error: {e}')
-                    frame.clear()
-                # else: ignore duplicate ENDs (framing flush)
+        self.stats.count('in wire bytes tcp', len(incoming))
+        for frame in self.slip.decode(incoming):
+            try:
+                messages = self._decode_osc_packet(frame)
+            except Exception as e:
+                self.stats.count('in decode errors')
+                self.log.error('OSC decode error: %s', e)
                 continue
-
-            frame.append(byte)
-
-        # Keep partial in buffer for next call
-        buf[:] = frame
+            for addr, argv in messages:
+                # Reuse existing OnReceiveOSC workflow
+                self.OnReceiveOSC(None, -1, None, None, None, addr, argv, None)
         
         
     # -----------------------
-    # OSC encode/decode utils
-    # -----------------------
-    def _pad4(self, b: bytes) -> bytes:
-        pad = (-len(b)) & 3
-        return b + (b'\x00' * pad)
-
-    def _pack_string(self, s: str) -> bytes:
-        b = s.encode('utf-8') + b'\x00'
-        return self._pad4(b)
-
-    def _pack_blob(self, data: bytes) -> bytes:
-        if not isinstance(data, (bytes, bytearray)):
-            raise TypeError('Blob must be bytes or bytearray')
-        b = bytes(data)
-        return struct.pack('>i', len(b)) + self._pad4(b)
-
-    def _pack_arg(self, a):
-        """Return (typetag_str, encoded_bytes) for a single OSC argument."""
-        if isinstance(a, bool):
-            # T/F have no data payload
-            return ('T' if a else 'F', b'')
-        if a is None:
-            return ('N', b'')
-        if isinstance(a, int):
-            # 32-bit int
-            return ('i', struct.pack('>i', int(a)))
-        if isinstance(a, float):
-            return ('f', struct.pack('>f', float(a)))
-        if isinstance(a, str):
-            return ('s', self._pack_string(a))
-        if isinstance(a, (bytes, bytearray)):
-            return ('b', self._pack_blob(a))
-        if isinstance(a, (list, tuple)):
-            # OSC array: [ elements ]
-            tags = ['[']
-            data = []
-            for el in a:
-                t, d = self._pack_arg(el)
-                tags.append(t)
-                data.append(d)
-            tags.append(']')
-            return (''.join(tags), b''.join(data))
-        # Fallback: coerce to string
-        return ('s', self._pack_string(str(a)))
-
-    def _build_osc_message(self, address: str, args) -> bytes:
-        # address
-        out = [self._pack_string(address)]
-
-        # type tag string: starts with comma
-        tags = [',']
-        data_parts = []
-
-        for a in (args or []):
-            t, d = self._pack_arg(a)
-            tags.append(t)
-            data_parts.append(d)
-
-        out.append(self._pack_string(''.join(tags)))
-        out.append(b''.join(data_parts))
-        return b''.join(out)
-
-    # -----------------------
-    # SLIP framing (RFC1055)
+    # OSC decode utils
     # -----------------------
-    def _slip_encode(self, payload: bytes) -> bytes:
-        END = 0xC0
-        ESC = 0xDB
-        ESC_END = 0xDC
-        ESC_ESC = 0xDD
-
-        encoded = bytearray()
-        # Leading END to flush any line noise per OSC 1.1 guidance
-        encoded.append(END)
-        for b in payload:
-            if b == END:
-                encoded.extend((ESC, ESC_END))
-            elif b == ESC:
-                encoded.extend((ESC, ESC_ESC))
-            else:
-                encoded.append(b)
-        # Trailing END marks frame boundary
-        encoded.append(END)
-        return bytes(encoded)
-
     def _read_padded_string(self, data: bytes, off: int):
         end = data.find(b'\x00', off)
         if end == -1:
@@ -426,6 +482,25 @@ class OSCManager:
         off = (end + 4) & ~3
         return s, off
 
+    def _decode_osc_packet(self, data: bytes):
+        """Decode an OSC message or bundle into a list of (address, args).
+
+        Bundle time tags are ignored: everything is dispatched immediately.
+        """
+        if not data.startswith(BUNDLE_TAG):
+            return [self._decode_osc_message(data)]
+
+        messages = []
+        off = 16  # '#bundle\0' + 64-bit time tag
+        while off < len(data):
+            size = struct.unpack_from('>i', data, off)[0]
+            off += 4
+            if size < 0 or off + size > len(data):
+                raise ValueError('Truncated OSC bundle element')
+            messages.extend(self._decode_osc_packet(data[off:off + size]))
+            off += size
+        return messages
+
     def _decode_osc_message(self, data: bytes):
         """Decode a single OSC message (no bundles) into (address, args)."""
         off = 0
@@ -498,3 +573,285 @@ class OSCManager:
             i += 1
 
         return address, args
+
+
+
+def _osc_pattern_to_regex(pattern: str) -> str:
+    """Translate an OSC 1.0 address pattern into an equivalent regex."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.index(']', i)
+            body = pattern[i + 1:end]
+            negate = body.startswith('!')
+            if negate:
+                body = body[1:]
+            body = body.replace('\\', '\\\\').replace('^', '\\^')
+            out.append(f"[{'^' if negate else ''}{body}]")
+            i = end
+        elif c == '{':
+            end = pattern.index('}', i)
+            options = pattern[i + 1:end].split(',')
+            out.append('(?:' + '|'.join(re.escape(o) for o in options) + ')')
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+BUNDLE_TAG = b'#bundle\x00'
+# OSC time tag 1 means "immediately"
+TIMETAG_IMMEDIATE = struct.pack('>Q', 1)
+
+# OSC typetags of argument types that pack to a fixed-size struct field
+_FIXED_TAGS = {int: 'i', float: 'f'}
+_UNCOMPILED = object()
+
+
+class OSCEncoder:
+    """OSC 1.0 message encoder with per-address templates.
+
+    Padded address/typetag strings are encoded once. Messages whose arguments are
+    all ints and floats are packed with a precompiled struct.Struct per
+    (address, argument types) pair, so a repeated '/fader3' costs one dict lookup and
+    one pack() call. Messages that never change can be kept fully encoded.
+    """
+
+    def __init__(self):
+        self._strings = {}    # str -> padded, null-terminated bytes
+        self._templates = {}  # (address, arg types) -> (header bytes, struct.Struct) or None
+        self._static = {}     # (address, args, arg types) -> encoded packet
+
+    def encode(self, address: str, args) -> bytes:
+        """Encode a message, using the compiled template when the args allow it."""
+        key = (address, tuple(map(type, args)))
+        template = self._templates.get(key, _UNCOMPILED)
+        if template is _UNCOMPILED:
+            template = self._compile(key)
+        if template is None:
+            return self.build(address, args)
+        header, packer = template
+        return header + packer.pack(*args)
+
+    def encode_static(self, address: str, args) -> bytes:
+        """Encode a message that is sent with the same arguments over and over."""
+        try:
+            # With the types, since True == 1 == 1.0 but they encode as T, i and f
+            args = tuple(args)
+            key = (address, args, tuple(map(type, args)))
+            packet = self._static.get(key)
+        except TypeError:
+            # Unhashable args (e.g. nested lists): nothing to key the cache on
+            return self.encode(address, args)
+        if packet is None:
+            packet = self._static[key] = self.encode(address, args)
+        return packet
+
+    def build(self, address: str, args) -> bytes:
+        """Generic (uncached) encoding for any supported argument types."""
+        tags = [',']
+        data_parts = []
+
+        for a in (args or []):
+            t, d = self._pack_arg(a)
+            tags.append(t)
+            data_parts.append(d)
+
+        return b''.join((self._string(address), self._string(''.join(tags)), *data_parts))
+
+    def bundle(self, packets, timetag: bytes = TIMETAG_IMMEDIATE) -> bytes:
+        """Wrap encoded packets into a single '#bundle'."""
+        parts = [BUNDLE_TAG, timetag]
+        for packet in packets:
+            parts.append(struct.pack('>i', len(packet)))
+            parts.append(packet)
+        return b''.join(parts)
+
+    def bundles(self, packets, max_size: int):
+        """Group encoded packets into bundles of at most max_size bytes.
+
+        A packet too large to share a bundle is returned on its own; a group
+        of one is returned as the plain message.
+        """
+        group = []
+        size = len(BUNDLE_TAG) + len(TIMETAG_IMMEDIATE)
+        for packet in packets:
+            element = 4 + len(packet)
+            if group and size + element > max_size:
+                yield group[0] if len(group) == 1 else self.bundle(group)
+                group = []
+                size = len(BUNDLE_TAG) + len(TIMETAG_IMMEDIATE)
+            group.append(packet)
+            size += element
+        if group:
+            yield group[0] if len(group) == 1 else self.bundle(group)
+
+    def clear(self):
+        self._strings.clear()
+        self._templates.clear()
+        self._static.clear()
+
+    def _compile(self, key):
+        """Build and cache the template for (address, arg types); None if not fixed-size."""
+        address, types = key
+        tags = ''.join([_FIXED_TAGS.get(t, '?') for t in types])
+        if '?' in tags:
+            self._templates[key] = None
+            return None
+        template = self._templates[key] = (
+            self._string(address) + self._string(',' + tags),
+            struct.Struct('>' + tags),
+        )
+        return template
+
+    def _string(self, s: str) -> bytes:
+        b = self._strings.get(s)
+        if b is None:
+            b = self._strings[s] = self._pack_string(s)
+        return b
+
+    def _pad4(self, b: bytes) -> bytes:
+        pad = (-len(b)) & 3
+        return b + (b'\x00' * pad)
+
+    def _pack_string(self, s: str) -> bytes:
+        b = s.encode('utf-8') + b'\x00'
+        return self._pad4(b)
+
+    def _pack_blob(self, data: bytes) -> bytes:
+        if not isinstance(data, (bytes, bytearray)):
+            raise TypeError('Blob must be bytes or bytearray')
+        b = bytes(data)
+        return struct.pack('>i', len(b)) + self._pad4(b)
+
+    def _pack_arg(self, a):
+        """Return (typetag_str, encoded_bytes) for a single OSC argument."""
+        if isinstance(a, bool):
+            # T/F have no data payload
+            return ('T' if a else 'F', b'')
+        if a is None:
+            return ('N', b'')
+        if isinstance(a, int):
+            # 32-bit int
+            return ('i', struct.pack('>i', int(a)))
+        if isinstance(a, float):
+            return ('f', struct.pack('>f', float(a)))
+        if isinstance(a, str):
+            return ('s', self._pack_string(a))
+        if isinstance(a, (bytes, bytearray)):
+            return ('b', self._pack_blob(a))
+        if isinstance(a, (list, tuple)):
+            # OSC array: [ elements ]
+            tags = ['[']
+            data = []
+            for el in a:
+                t, d = self._pack_arg(el)
+                tags.append(t)
+                data.append(d)
+            tags.append(']')
+            return (''.join(tags), b''.join(data))
+        # Fallback: coerce to string
+        return ('s', self._pack_string(str(a)))
+
+
+# -----------------------
+# SLIP framing (RFC1055)
+# -----------------------
+SLIP_END = 0xC0
+SLIP_ESC = 0xDB
+SLIP_ESC_END = 0xDC
+SLIP_ESC_ESC = 0xDD
+
+_SLIP_ESCAPED = re.compile(rb'\xdb(.)', re.DOTALL)
+_SLIP_UNESCAPE = {b'\xdc': b'\xc0', b'\xdd': b'\xdb'}
+
+
+def _slip_unescape_match(match):
+    # Invalid escapes keep the raw byte, as the old per-byte decoder did
+    byte = match.group(1)
+    return _SLIP_UNESCAPE.get(byte, byte)
+
+
+class SlipCodec:
+    """SLIP stream codec for OSC 1.1 over TCP.
+
+    Encoding and decoding work on whole buffers (bytes.replace, find, split,
+    regex) instead of Python-level per-byte loops. The decoder keeps one
+    receive buffer across calls, so frames split over several TCP reads are
+    reassembled; consumed bytes are only compacted away once they pile up.
+    """
+
+    COMPACT_THRESHOLD = 4096
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._start = 0  # first byte of the frame being collected
+
+    def encode(self, payload: bytes) -> bytes:
+        """Frame one packet, with a leading END to flush any line noise."""
+        return b''.join((
+            b'\xc0',
+            payload.replace(b'\xdb', b'\xdb\xdd').replace(b'\xc0', b'\xdb\xdc'),
+            b'\xc0',
+        ))
+
+    def decode(self, incoming: bytes):
+        """Feed stream bytes; return the list of complete, unescaped frames."""
+        buf = self._buf
+        scan = len(buf)
+        buf += incoming
+        if buf.find(SLIP_END, scan) == -1:
+            # Still inside the same frame
+            return []
+
+        with memoryview(buf) as view:
+            parts = view[self._start:].tobytes().split(b'\xc0')
+        tail = parts.pop()
+        frames = []
+        pending = None
+
+        for part in parts:
+            if pending is not None:
+                part = pending + b'\xc0' + part
+                pending = None
+            if part.endswith(b'\xdb') and self._escaped(part):
+                # ESC END is not a frame boundary; the END is kept as data
+                pending = part
+                continue
+            # Empty parts (duplicate ENDs) are framing flushes
+            if part:
+                if SLIP_ESC in part:
+                    part = _SLIP_ESCAPED.sub(_slip_unescape_match, part)
+                frames.append(part)
+
+        if pending is not None:
+            tail = pending + b'\xc0' + tail
+        self._consumed(len(buf) - len(tail))
+        return frames
+
+    def reset(self):
+        self._buf.clear()
+        self._start = 0
+
+    def _consumed(self, start: int):
+        """Drop consumed bytes when the buffer is empty or the dead prefix is large."""
+        buf = self._buf
+        if start == len(buf):
+            buf.clear()
+            start = 0
+        elif start >= self.COMPACT_THRESHOLD:
+            del buf[:start]
+            start = 0
+        self._start = start
+
+    @staticmethod
+    def _escaped(part) -> bool:
+        """True if the part ends in an odd run of ESC bytes, i.e. escapes the END after it."""
+        return (len(part) - len(part.rstrip(b'\xdb'))) % 2 == 1
@@ -7,6 +7,7 @@ Created by: @from.vacuum aka Serhiy P.
 Licence: CC0
 """
 
+import time
 from typing import Tuple
 
 class ParameterManager:
@@ -16,7 +17,19 @@ class ParameterManager:
         self.param_mappings = self.map_address() # name -> (index, address)
         self.params_dat = self.parent.params_dat
         self.osc_manager = self.parent.osc_manager
-        self._parameter_locked = False
+        self.log = self.parent.log
+        # Outbound coalescing: address -> Par changed since the last flush
+        self._dirty = {}
+        self._flush_scheduled = False
+        # Inbound coalescing: control key -> (Par, args) waiting to be applied
+        self._inbound = {}
+        self._drain_scheduled = False
+        # Deadband: address -> quantized value last sent to the surface
+        self._last_sent = {}
+        # Echo suppression: address -> quantized value just written from the surface
+        self._echo = {}
+        self.counters = {'changes': 0, 'sent': 0, 'suppressed': 0, 'echoes': 0,
+                         'received': 0, 'applied': 0}
         
     def loadParameters(self):
         self.params_dat.clear()
@@ -29,40 +42,143 @@ class ParameterManager:
         for row in range(1, self.params_dat.numRows):
             if not self.params_dat[row, 'style'] or self.params_dat[row, 'style'].val.lower() not in self.config.supported_styles:
                 rows_to_delete.append(row)
-                self.parent.debug(f"Skipping parameter {self.params_dat[row, 'name'].val} with unsupported style")
+                self.log.debug("Skipping parameter %s with unsupported style", self.params_dat[row, 'name'].val)
         
         for row in sorted(rows_to_delete, reverse=True):
             self.params_dat.deleteRow(row)
         
     def map_address(self) -> dict[str, Tuple[int, str]]:
+        """name -> (params_dat row, address) of the parameters bound on the current page."""
         param_mappings = {}
-        for row in range(1, self.parent.params_dat.numRows):
-            name = self.parent.params_dat[row, 'name'].val
-            param_mappings[name] = (row, self.parent.params_dat[row, 'address'].val)
+        layout = self.parent.layout_manager
+        for i, _, row in layout.pageRows(self.parent.current_page):
+            if row.address:
+                param_mappings[row.name] = (i + 1, row.address)
         return param_mappings
 
+    def rebind(self):
+        """Map parameters to the current page's controls, dropping traffic for the old binding."""
+        self.param_mappings = self.map_address()
+        self._dirty.clear()
+        self._inbound.clear()
+        self.resetSentCache()
+
         
     def OnValueChange(self, par, prev):
-        """Handle parameter value changes and send OSC messages"""
+        """Mark the parameter's address dirty; flushValues() sends it once next frame"""
         
-        if self._parameter_locked:
-            return
-
         if par.name in self.param_mappings:
             row, address = self.param_mappings[par.name]
    
             if par.mode == ParMode.EXPRESSION:
                 return  # TODO: Implement expressions handling
    
-            value = self.calculate_parameter_value(par)
-            
-            self.osc_manager.sendOSC(address, value)
-            self.parent.debug(f"Parameter {par.name} [{address}] changed to {value}")
+            # Latest change per address wins; an XY/RGB group shares one address
+            self.counters['changes'] += 1
+            self._markDirty(address, par)
         else:
-            self.parent.debug(f"Parameter {par.name} not found in mappings")
+            self.parent.debug("Parameter %s not found in mappings", par.name)
         
         return
-    
+
+    def _markDirty(self, address, par):
+        self._dirty[address] = par
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            run("args[0].flushValues()", self, delayFrames=1)
+
+    def flushValues(self):
+        """Send the latest value of every address changed since the last flush."""
+        self._flush_scheduled = False
+        dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        bundle = self.config.coalesce_bundle and len(dirty) > 1
+        if bundle:
+            self.osc_manager.beginBundle()
+        try:
+            for address, par in dirty.items():
+                if par.valid and self.sendValue(par, address):
+                    self.counters['sent'] += 1
+        finally:
+            if bundle:
+                self.osc_manager.flushBundle()
+
+    def sendValue(self, par, address=None, force=False) -> bool:
+        """Send the parameter's current value to its control right away.
+
+        Skipped when it quantizes to the value last sent to that address, or
+        is a float that has not moved a full step from it (see holds), unless
+        force is set. Returns True if a message was sent.
+        """
+        if address is None:
+            row, address = self.param_mappings[par.name]
+        value = self.calculate_parameter_value(par)
+        quantized = self.quantize(par, value)
+        if not force:
+            if self._echo.pop(address, None) == quantized:
+                # The surface sent this value itself
+                self._last_sent[address] = quantized
+                self.counters['echoes'] += 1
+                return False
+            last = self._last_sent.get(address)
+            if last == quantized or self.holds(par, value, last):
+                self.counters['suppressed'] += 1
+                return False
+        self._last_sent[address] = quantized
+        self.osc_manager.sendOSC(address, value)
+        self.log.debug("Parameter %s [%s] changed to %s", par.name, address, value)
+        return True
+
+    def quantize(self, par, value) -> tuple:
+        """Deadband key of an outgoing value: exact steps for ints and menus,
+        1/deadband_steps of the range for floats."""
+        if not par.isNumber:
+            return tuple(value)
+        if par.isInt:
+            steps = max(1, round(par.normMax - par.normMin))
+        else:
+            steps = self.config.deadband_steps
+            if steps <= 0:
+                return tuple(value)
+        return tuple(round(v * steps) for v in value)
+
+    def holds(self, par, value, last) -> bool:
+        """Hysteresis of the float deadband: whether `value` is still within a full step
+        of the step `last` sent, i.e. not yet half a step past the step boundary.
+
+        Without it a value resting on a boundary flips between two steps and
+        resends on every jitter.
+        """
+        if last is None or not par.isNumber or par.isInt or len(last) != len(value):
+            return False
+        steps = self.config.deadband_steps
+        if steps <= 0:
+            return False
+        return all(abs(v * steps - k) < 1.0 for v, k in zip(value, last))
+
+    def resetSentCache(self):
+        """Forget what was sent, so the next send of every address goes out."""
+        self._last_sent.clear()
+        self._echo.clear()
+
+    def resendValues(self):
+        """Force-flush every mapped parameter, e.g. after the surface reconnects."""
+        self.resetSentCache()
+        base_comp = self.parent.base_comp
+        if base_comp is None:
+            return
+        for name, (row, address) in self.param_mappings.items():
+            par = base_comp.par[name]
+            if par is not None:
+                self._markDirty(address, par)
+
+    @property
+    def sends_saved(self) -> int:
+        """Value changes that did not need their own OSC message."""
+        return self.counters['changes'] - self.counters['sent']
+
     def param_mode(self, par) -> str:
         mode = str(par.mode).replace('ParMode.', '').lower()
         if par.readOnly or par.enable == False or mode == "expression":
@@ -70,10 +186,12 @@ class ParameterManager:
         return mode
         
     def OnModeChange(self, par: Par, prev: ParMode):
+        # Randomize only touches parameters in constant mode
+        self.parent.randomize_manager.invalidatePlans()
         if par.name in self.param_mappings:
             mode = self.param_mode(par)
             row, _ = self.param_mappings[par.name]
-            self.parent.debug(f"Mode changed for {par.name}, mode: {mode}, previous: {prev}")
+            self.parent.debug("Mode changed for %s, mode: %s, previous: %s", par.name, mode, prev)
     
             if self.parent.params_dat[row, 'mode'].val != mode:
                     self.osc_manager.sendOSC('/mode_changed_control', [
@@ -82,6 +200,12 @@ class ParameterManager:
                                         mode
                                     ])
                     self.params_dat[row, 'mode'] = mode    
+                    self.parent.layout_manager.rows[row - 1].mode = mode
+        else:
+            # Not bound on this page; the control picks the mode up when its page is shown
+            for row in self.parent.layout_manager.rows:
+                if row.name == par.name:
+                    row.mode = self.param_mode(par)
         
     def calculate_parameter_value(self, par):
         """Calculate parameter value based on its type"""
@@ -100,11 +224,13 @@ class ParameterManager:
 
     def update_parameter_value(self, param, args):
         """Update parameter value based on its type"""
+        # The surface takes over from any glide in progress
+        tween_engine = self.parent.tween_engine
+        if tween_engine.active:
+            tween_engine.cancel(param.parGroup)
         try:
-            self._parameter_locked = True
-            
             if len(param.parGroup) > 1:
-                self.parent.debug(f"Updating parameter group {param.name} with {args}")
+                self.log.debug("Updating parameter group %s with %s", param.name, args)
                 if len(param.parGroup) == 3 and len(args) == 1:
                     # Update Z part of XYZ - single value
                     param.parGroup[2].normVal = float(args[0])
@@ -126,7 +252,43 @@ class ParameterManager:
                     param.menuIndex = int(value)
                     
         finally:
-            run("args[0]._release_lock()", self, delayFrames=4)
+            self._expect_echo(param)
+
+    def _expect_echo(self, param):
+        """Remember the value just written from the surface, so sending it back is skipped."""
+        mapping = self.param_mappings.get(param.name)
+        if mapping is not None:
+            self._echo[mapping[1]] = self.quantize(param, self.calculate_parameter_value(param))
+
+    def queue_parameter_value(self, key, par, args):
+        """Queue an inbound value; only the newest per control is applied by drainInbound()."""
+        self.counters['received'] += 1
+        self._inbound.pop(key, None)
+        self._inbound[key] = (par, args)
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            run("args[0].drainInbound()", self, delayFrames=1)
+
+    def drainInbound(self):
+        """Apply queued inbound values within the frame budget; the rest waits a frame."""
+        self._drain_scheduled = False
+        inbound = self._inbound
+        deadline = time.perf_counter() + self.config.inbound_budget_ms / 1000.0
+        while inbound:
+            key = next(iter(inbound))
+            par, args = inbound.pop(key)
+            if par.valid:
+                try:
+                    self.update_parameter_value(par, args)
+                    self.counters['applied'] += 1
+                except Exception as e:
+                    # One bad value must not hold up the rest of the queue
+                    self.parent.stats.count('in errors')
+                    self.log.error("Error applying %s to %s: %s", args, par.name, e)
+            if time.perf_counter() >= deadline:
+                break
 
-    def _release_lock(self):
-        self._parameter_locked = False
+        if inbound:
+            self.parent.debug("Inbound budget spent, %s control(s) carried to next frame", len(inbound))
+            self._drain_scheduled = True
+            run("args[0].drainInbound()", self, delayFrames=1)
@@ -8,10 +8,75 @@ Presets are provided by an external callbacks DAT (referenced by the
     def readPresets() -> list[str]
     def recall_preset(name: str, fade_time: float) -> None
 
+and optionally
+
+    def presetsToken() -> object
+
+a cheap value that changes whenever the preset list does (a file mtime, a
+revision counter, ...). While it stays the same the cached list is reused.
+With `Presets Async` on, readPresets() runs on a worker thread. It must then
+not touch TouchDesigner operators or parameters: TouchDesigner is not thread
+safe, and such access can return garbage or crash rather than raise. Only if it
+raises is it called on the main thread from then on. Off (the default), it runs
+on the main thread like before.
+
+Without one, the built-in snapshot store (Snapshots module) is used when the
+`Native Presets` parameter is on.
+
+The preset buttons browse the list a page at a time: /presets/next,
+/presets/prev, /presets/page <n> flip pages and /presets/search <text>
+filters by name. The surface is told /presets/page <page> <pages> <matches>.
+
 Created by: @from.vacuum aka Serhiy P.
 
 Licence: CC0
 """
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PresetIndex:
+    """Prefix and substring lookup over preset names, case-insensitive.
+
+    Prefix matches come from a sorted key list, substrings from a trigram
+    index verified against the name, so a keystroke does not scan a large
+    library.
+    """
+
+    def __init__(self, names):
+        self.lower = [name.lower() for name in names]
+        order = sorted(range(len(self.lower)), key=self.lower.__getitem__)
+        self.keys = [self.lower[i] for i in order]
+        self.order = order
+        grams = {}
+        for i, name in enumerate(self.lower):
+            for gram in {name[j:j+3] for j in range(len(name) - 2)}:
+                grams.setdefault(gram, []).append(i)
+        self.grams = grams
+
+    def search(self, query: str):
+        """Indices of matching names: prefix matches first, then other substrings."""
+        query = query.lower()
+        if not query:
+            return list(range(len(self.lower)))
+        lo = bisect_left(self.keys, query)
+        hi = bisect_left(self.keys, query + '\uffff')
+        prefix = sorted(self.order[lo:hi])
+
+        if len(query) < 3:
+            candidates = range(len(self.lower))
+        else:
+            postings = sorted((self.grams.get(query[j:j+3], ()) for j in range(len(query) - 2)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+            candidates = sorted(candidates)
+
+        seen = set(prefix)
+        lower = self.lower
+        return prefix + [i for i in candidates if i not in seen and query in lower[i]]
+
 
 class PresetManager:
     def __init__(self, parent):
@@ -21,16 +86,34 @@ class PresetManager:
         self.presets.clear()
         self.callbacks_dat = None
         self.presets_callbacks = self.config.presets_callbacks
+        # Built-in snapshots, used when no callbacks DAT is set
+        self.store = None if self.presets_callbacks else parent.snapshot_store
         # Fade time passed to the callbacks on recall, in seconds
         self.max_fade_time = 10.0
         self.fade_time = 1.0
         if self.presets_callbacks:
             self.callbacks_dat = op(self.presets_callbacks)
             self.presets = op('../presets')
-            # Default grid settings
-            self.preset_grid_cols = 2
-            self.preset_grid_rows = 4
-            self.max_allowed_presets = 10
+        # Default grid settings
+        self.preset_grid_cols = 2
+        self.preset_grid_rows = 4
+        self.max_allowed_presets = 10
+
+        # Cached preset list and the token it was read under
+        self.names = None
+        self.index = PresetIndex([])
+        # Browser: the buttons show one page of the presets matching the query
+        self.query = ''
+        self.results = []  # indices into names
+        self.page = 0
+        self.token = None
+        self._executor = None
+        self._pending = None  # (future, token) of a background read
+        self._async_ok = self.config.presets_async
+        # Button slot -> /add_preset args last sent, valid while the surface
+        # has not been hidden since (see OSCManager.hide_generation)
+        self.sent_buttons = {}
+        self._sent_generation = None
 
     @property
     def callbacks(self):
@@ -40,115 +123,246 @@ class PresetManager:
         try:
             return self.callbacks_dat.module
         except Exception as e:
-            self.debug(f"Could not load presets callbacks module: {e}")
+            self.parent.log.warning("Could not load presets callbacks module: %s", e)
             return None
 
     def loadPresets(self):
-        if self.presets_callbacks:
-            self.presets.clear()
-            callbacks = self.callbacks
-            if callbacks and hasattr(callbacks, 'readPresets'):
-                # append each preset name returned by the callbacks DAT
-                for entry in callbacks.readPresets():
-                    self.presets.appendRow([entry])
-            else:
-                self.debug("Presets callbacks not found or does not implement readPresets().")
+        """Read the preset list now, on the main thread."""
+        self._applyNames(self._readNames(), self._token())
 
+    def _readNames(self):
+        if self.store:
+            return self.store.names()
+        callbacks = self.callbacks
+        if callbacks and hasattr(callbacks, 'readPresets'):
+            with self.parent.profiler.phase('readPresets'):
+                return [str(entry) for entry in callbacks.readPresets()]
+        self.parent.log.warning("Presets callbacks not found or does not implement readPresets().")
+        return []
 
-    def sendPresetsToOSC(self):
-            self.loadPresets()
-
-            if self.callbacks_dat:
-                # Calculate preset button dimensions
-                num_presets = self.presets.numRows
-                if num_presets == 0:
-                    self.debug("No presets found")
-                    return
-
-                # Check if we have more than the maximum allowed presets
-
-                if num_presets > self.max_allowed_presets:
-                    self.parent.showWarningDialog(
-                        f"You have {num_presets} presets, but only {self.max_allowed_presets} can be displayed. "
-                        f"Some presets will not be accessible through the interface.",
-                        "Too Many Presets"
-                    )
-                    num_presets = self.max_allowed_presets
-
-                # Define grid layout properties
-                cols = self.preset_grid_cols
-                rows = self.preset_grid_rows
-
-                # Calculate maximum items that can fit in the grid
-                max_items = cols * rows
-
-                # Adjust grid if we have fewer presets than grid cells
-                if num_presets < max_items:
-                    # Calculate optimal columns and rows for fewer items
-                    if num_presets <= cols:
-                        actual_cols = num_presets
-                        actual_rows = 1
-                    else:
-                        actual_cols = cols
-                        # Ceiling division
-                        actual_rows = (num_presets + cols - 1) // cols
-                else:
-                    actual_cols = cols
-                    actual_rows = (num_presets + cols - 1) // cols
-
-                # Calculate item size based on available space
-                available_width = self.config.doc_width - \
-                    (self.config.padding * (actual_cols + 1))
-                available_height = self.config.doc_height - \
-                    (self.config.padding * (actual_rows + 1)) - \
-                    120  # bar and fade time fader
-
-                button_width = available_width / actual_cols
-                button_height = available_height / actual_rows
-
-                # Calculate positions for all preset buttons
-                positions = self.parent.layout_manager.calculateGridPositions(
-                    num_presets, actual_cols, actual_rows,
-                    button_width, button_height,
-                    self.config.padding
-                )
-
-                # Send OSC messages for each preset
-                for row in range(0, self.presets.numRows):
-                    if row < len(positions):
-                        x, y, width, height = positions[row]
-                        preset_name = self.presets[row, 0].val
-
-                        self.parent.osc_manager.sendOSC('/add_preset', [
-                            row+1, preset_name, x, y, width, height, *self.config.color
-                        ])
-
-                        self.debug(
-                            f"Added preset {preset_name} to OSC at position ({x}, {y})")
-
-                # Send fade time fader, normalized to the fader's 0..1 range
-                self.parent.osc_manager.sendOSC(
-                    '/fadeTimeFader1', [self.fade_time / self.max_fade_time])
-                self.parent.osc_manager.sendOSC(
-                    '/color_control', ['fadeTimeFader', 1, *self.config.color])
-                self.debug(f"Fade time set to {self.fade_time}")
+    def _token(self):
+        """Change token of the preset list, or None when the source has none."""
+        if self.store:
+            return self.store.revision
+        callbacks = self.callbacks
+        if callbacks and hasattr(callbacks, 'presetsToken'):
+            try:
+                return callbacks.presetsToken()
+            except Exception as e:
+                self.parent.log.warning("presetsToken() failed: %s", e)
+        return None
+
+    def refreshPresets(self, force=False):
+        """Re-read the preset list if its token moved; callback lists are read in the background."""
+        token = self._token()
+        if not force and self.names is not None and token is not None and token == self.token:
             return
+        if self._pending:
+            return
+        callbacks = self.callbacks
+        if self.store or not self._async_ok or not (callbacks and hasattr(callbacks, 'readPresets')):
+            self._applyNames(self._readNames(), token)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='BasicTouchPresets')
+        self._pending = (self._executor.submit(self._readOnWorker, callbacks), token)
+        run("args[0].pollPresets()", self, delayFrames=1)
+
+    def shutdown(self):
+        """Stop the background reader thread; a read still in flight is dropped."""
+        self._pending = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
+    def _readOnWorker(self, callbacks):
+        start = time.perf_counter()
+        try:
+            return callbacks.readPresets()
+        finally:
+            self.parent.profiler.span('readPresets', start)
+
+    def pollPresets(self):
+        """Apply a finished background read; keeps polling once per frame until then."""
+        if not self._pending:
+            return
+        future, token = self._pending
+        if not future.done():
+            run("args[0].pollPresets()", self, delayFrames=1)
+            return
+        self._pending = None
+        try:
+            names = [str(entry) for entry in future.result()]
+        except Exception as e:
+            self.parent.log.warning("readPresets() failed on the worker thread, reading on the main thread: %s", e)
+            self._async_ok = False
+            names = self._readNames()
+        self._applyNames(names, token)
+
+    def _applyNames(self, names, token):
+        self.token = token
+        if names == self.names:
+            return
+        self.names = names
+        self.index = PresetIndex(names)
+        self.presets.clear()
+        if names:
+            self.presets.appendRows([[name] for name in names])
+        self.search(self.query, keep_page=True)
+
+    # -----------------------
+    # Browser
+    # -----------------------
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.results) // self.max_allowed_presets))
+
+    def view(self):
+        """Names on the buttons: the current page of the search results."""
+        start = self.page * self.max_allowed_presets
+        names = self.names or []
+        return [names[i] for i in self.results[start:start + self.max_allowed_presets]]
+
+    def search(self, query: str, keep_page=False):
+        """Filter the buttons to presets whose name contains `query`."""
+        self.query = query
+        self.results = self.index.search(query)
+        self.page = min(self.page, self.pages - 1) if keep_page else 0
+        self.sendPresetButtons()
+
+    def setPage(self, page: int):
+        page = max(0, min(int(page), self.pages - 1))
+        if page != self.page:
+            self.page = page
+            self.sendPresetButtons()
+
+    def sendPresetsToOSC(self):
+        """Show the cached preset list right away and refresh it in the background."""
+        if self.names is not None:
+            self.sendPresetButtons()
+        self.refreshPresets()
+
+    def sendPresetButtons(self):
+        """Send the preset buttons whose name or place changed since they were last sent."""
+        osc = self.parent.osc_manager
+        if self._sent_generation != osc.hide_generation:
+            # Surface was cleared; everything goes out again
+            self.sent_buttons = {}
+            self._sent_generation = osc.hide_generation
+            fresh = True
+        else:
+            fresh = False
+
+        names = self.view()
+        buttons = {}
+        if names:
+            # Once there is more than a page, the grid keeps its size on the last page
+            cells = min(len(self.results), self.max_allowed_presets)
+            for slot, (x, y, width, height) in enumerate(self._buttonPositions(cells), 1):
+                if slot <= len(names):
+                    buttons[slot] = [slot, names[slot-1], x, y, width, height, *self.config.color]
+
+        sent = 0
+        for slot, args in buttons.items():
+            if self.sent_buttons.get(slot) != args:
+                osc.sendOSC('/add_preset', args)
+                sent += 1
+        for slot in self.sent_buttons.keys() - buttons.keys():
+            osc.sendOSC('/hide_control', ['pbutton', slot], static=True)
+            osc.sendOSC('/hide_control', ['plabel', slot], static=True)
+        self.sent_buttons = buttons
+        if sent:
+            self.debug("Sent %s of %s preset buttons", sent, len(buttons))
+        if self.names:
+            osc.sendOSC('/presets/page', [self.page + 1, self.pages, len(self.results)])
+
+        if fresh and buttons:
+            # Send fade time fader, normalized to the fader's 0..1 range
+            osc.sendOSC('/fadeTimeFader1', [self.fade_time / self.max_fade_time])
+            osc.sendOSC('/color_control', ['fadeTimeFader', 1, *self.config.color])
+            self.debug("Fade time set to %s", self.fade_time)
+
+    def _buttonPositions(self, num_presets):
+        # Define grid layout properties
+        cols = self.preset_grid_cols
+        rows = self.preset_grid_rows
+
+        # Calculate maximum items that can fit in the grid
+        max_items = cols * rows
+
+        # Adjust grid if we have fewer presets than grid cells
+        if num_presets < max_items:
+            # Calculate optimal columns and rows for fewer items
+            if num_presets <= cols:
+                actual_cols = num_presets
+                actual_rows = 1
+            else:
+                actual_cols = cols
+                # Ceiling division
+                actual_rows = (num_presets + cols - 1) // cols
+        else:
+            actual_cols = cols
+            actual_rows = (num_presets + cols - 1) // cols
+
+        # Calculate item size based on available space
+        available_width = self.config.doc_width - \
+            (self.config.padding * (actual_cols + 1))
+        available_height = self.config.doc_height - \
+            (self.config.padding * (actual_rows + 1)) - \
+            120  # bar and fade time fader
+
+        button_width = available_width / actual_cols
+        button_height = available_height / actual_rows
+
+        # Calculate positions for all preset buttons
+        return self.parent.layout_manager.calculateGridPositions(
+            num_presets, actual_cols, actual_rows,
+            button_width, button_height,
+            self.config.padding
+        )
 
     def setFadeTime(self, normalized):
         """Store fade time from the normalized (0..1) OSC fader value."""
         self.fade_time = float(normalized) * self.max_fade_time
-        self.debug(f"Fade time set to {self.fade_time}")
+        self.debug("Fade time set to %s", self.fade_time)
+
+    def savePreset(self, name=None):
+        """Snapshot the current values into the built-in store and refresh the buttons."""
+        if not self.store:
+            self.debug("Saving presets needs the built-in store (no callbacks DAT)")
+            return None
+        if not name:
+            n = len(self.store.names()) + 1
+            while f"Preset {n}" in self.store.presets:
+                n += 1
+            name = f"Preset {n}"
+        if self.store.capture(name):
+            self.debug("Saved preset %s", name)
+            self.refreshPresets()
+            return name
+        return None
+
+    def deletePreset(self, name):
+        if self.store and self.store.delete(name):
+            self.debug("Deleted preset %s", name)
+            self.refreshPresets()
 
     def recall_preset(self, index):
+        view = self.view()
+        if index > len(view):
+            return
+        # get preset name by button slot from the page in view
+        preset_name = view[index-1]
+        if self.store:
+            self.debug("Recalling preset %s ", preset_name)
+            self.store.recall(preset_name, self.fade_time)
+            return
         callbacks = self.callbacks
         if callbacks and hasattr(callbacks, 'recall_preset'):
-            # get preset name by id from presets DAT
-            preset_name = self.presets[index-1, 0].val
-            self.debug(f"Recalling preset {preset_name} ")
+            self.debug("Recalling preset %s ", preset_name)
             callbacks.recall_preset(preset_name, self.fade_time)
         else:
-            self.debug("Presets callbacks not found or does not implement recall_preset().")
+            self.parent.log.warning("Presets callbacks not found or does not implement recall_preset().")
 
-    def debug(self, message):
-        self.parent.debug(message)
+    def debug(self, message, *args):
+        self.parent.debug(message, *args)
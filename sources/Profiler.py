@@ -0,0 +1,134 @@
+"""
+BasicTouch extension - Profiler module.
+On-demand cProfile capture with phase timers.
+
+A capture runs cProfile over everything on the main thread and records
+phase spans: the timings the Stats module keeps (Start, Setup frame,
+OnReceiveOSC, OnValueChange) plus the setup steps and preset reads wrapped in
+phase(). When it ends, two files are written to BasicTouchProfiles/ in the
+project folder:
+
+    <name>-<time>.pstats      open with pstats or snakeviz
+    <name>-<time>.trace.json  Chrome trace events, open in chrome://tracing
+                              or ui.perfetto.dev
+
+With the `Profile` parameter on, "Setup Controls" starts a capture that ends
+`Profile Window` seconds after the setup finished, so the traffic that
+follows is in it too. StartProfile()/StopProfile() capture any other window.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.span(self.name, self.start)
+        return False
+
+
+class Profiler:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.folder = os.path.join(project.folder, 'BasicTouchProfiles')
+        self.profile = None  # cProfile.Profile while capturing
+        self.name = None
+        self.events = []     # Chrome trace events of the capture
+        self.last_files = None
+        self._started = 0.0
+        self._main_thread = threading.get_ident()
+        self._generation = 0  # tells a scheduled end which capture it belongs to
+
+    @property
+    def capturing(self) -> bool:
+        return self.profile is not None
+
+    def begin(self, name: str = 'capture'):
+        """Start a capture; if one is running it continues, without its scheduled end."""
+        self._generation += 1
+        if self.profile is not None:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (or debugger) is active in this process
+            self.parent.log.warning("Could not start profiling: %s", e)
+            return
+        self.name = name
+        self.events = []
+        self._started = time.perf_counter()
+        self.profile = profile
+        self.parent.log.info("Profiling %s", name)
+
+    def end(self):
+        """Stop the capture and write its files; returns (pstats path, trace path)."""
+        if self.profile is None:
+            return None
+        profile, self.profile = self.profile, None
+        profile.disable()
+        self._generation += 1  # a scheduled end is for this capture only
+        stem = os.path.join(self.folder, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            profile.dump_stats(stem + '.pstats')
+            with open(stem + '.trace.json', 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+        except OSError as e:
+            self.parent.log.error("Could not write profile: %s", e)
+            return None
+        self.events = []
+        self.last_files = (stem + '.pstats', stem + '.trace.json')
+        self.parent.log.info("Profile written to %s", stem)
+        return self.last_files
+
+    def endAfter(self, seconds: float):
+        """End the running capture after `seconds`, unless it was ended or replaced by then."""
+        if self.profile is None:
+            return
+        frames = max(1, round(seconds * project.cookRate))
+        run("args[0]._endTick(args[1])", self, self._generation, delayFrames=frames)
+
+    def _endTick(self, generation):
+        if generation == self._generation:
+            self.end()
+
+    # -----------------------
+    # Phase timers
+    # -----------------------
+    def span(self, name: str, start: float, end: float = None):
+        """Record a phase from `start` to `end` (time.perf_counter() values, end defaults to now)."""
+        if self.profile is None:
+            return
+        end = time.perf_counter() if end is None else end
+        thread = threading.get_ident()
+        self.events.append({
+            'name': name, 'ph': 'X', 'pid': 1,
+            'tid': 'main' if thread == self._main_thread else thread,
+            'ts': (start - self._started) * 1e6, 'dur': (end - start) * 1e6,
+        })
+
+    def phase(self, name: str):
+        """Context manager timing a block as a phase; free when not capturing."""
+        if self.profile is None:
+            return _NO_PHASE
+        return _Phase(self, name)
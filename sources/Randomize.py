@@ -6,13 +6,33 @@ Created by: @from.vacuum aka Serhiy P.
 
 Licence: CC0
 """
-import random
+import numpy as np
+
+PLAN_TYPES = ('all', 'fader', 'button', 'color', 'radio', 'xy')
+
+
+class RandomizePlan:
+    """Eligible parameters of one randomize type, split by how they are randomized."""
+    __slots__ = ('numeric', 'pulses', 'toggles', 'menus', 'menu_sizes')
+
+    def __init__(self):
+        self.numeric = []
+        self.pulses = []
+        self.toggles = []
+        self.menus = []
+        self.menu_sizes = []
+
+    def __len__(self):
+        return len(self.numeric) + len(self.pulses) + len(self.toggles) + len(self.menus)
+
 
 class RandomizeManager:
     def __init__(self, parent):
         self.parent = parent
         self.config = parent.config
         self.random_amount = 0.5
+        self.plans = None  # type -> RandomizePlan, built at setup
+        self.Seed(None)
         
         # Set up randomization options
         self.random_buttons = {
@@ -25,57 +45,103 @@ class RandomizeManager:
             'Menu': lambda: self.Randomize(degree=self.random_amount, type='radio'),
             'XY(Z)': lambda: self.Randomize(degree=self.random_amount, type='xy')
         }
-        
+
+    def Seed(self, seed=None):
+        """Restart the random generator; the same seed replays the same randomizations."""
+        self.rng = np.random.default_rng(seed)
+
+    def buildPlans(self):
+        """Resolve the eligible parameters of every randomize type once per setup."""
+        plans = {name: RandomizePlan() for name in PLAN_TYPES}
+        base_comp = self.parent.base_comp
+        if base_comp is not None:
+            for row in self.parent.layout_manager.rows:
+                par = base_comp.par[row.name]
+                # Only parameters in constant mode follow the surface
+                if par is None or par.mode != ParMode.CONSTANT:
+                    continue
+                targets = [plans['all']]
+                if row.control_type in plans:
+                    targets.append(plans[row.control_type])
+                for plan in targets:
+                    if par.isNumber:
+                        plan.numeric.append(par)
+                    elif par.isPulse:
+                        plan.pulses.append(par)
+                    elif par.isToggle:
+                        plan.toggles.append(par)
+                    elif par.isMenu:
+                        plan.menus.append(par)
+                        plan.menu_sizes.append(len(par.menuLabels))
+        self.plans = plans
+        self.parent.debug("Randomize plans built: %s parameters", len(plans['all']))
+
+    def invalidatePlans(self):
+        """Rebuild plans on next use, e.g. after a parameter changed mode."""
+        self.plans = None
+
     def Randomize(self, degree=0.5, type='all'):
         """
         Randomize controls
         
+        All random values are drawn in one pass and applied as one batch; the
+        value changes reach the surface together on the next flush.
+
         Args:
             degree (float): Amount of randomization from 0.0 to 1.0
                 where 0.0 means no change and 1.0 means full randomization
             type (str): Type of controls to randomize. Can be 'all', 'fader', 
                 'button', 'color', 'radio', 'xy'
         """
-        self.parent.debug(f"Randomizing controls of type '{type}' with degree {degree}...")
-        
-        for row in range(1, self.parent.params_dat.numRows):
-            param_name = self.parent.params_dat[row, 'name'].val
-            control_type = self.parent.params_dat[row, 'control_type'].val
-            
-            # Skip if not matching the requested type
-            if type != 'all' and (control_type != type):
-                continue
-                
-            par = self.parent.base_comp.par[param_name]
-            if par is None:
-                continue
-            
-            # Skip parameters that are not in constant mode
-            if par.mode != ParMode.CONSTANT:
-                continue
-                
-            if par.isNumber:
-                # Scale randomization around current value
-                current = par.normVal
-                random_val = random.random()
-                # Blend between current value and random value based on degree
-                new_val = current + (random_val - current) * degree
-                # Ensure value stays within bounds
-                par.normVal = max(0.0, min(1.0, new_val))
-            elif par.isPulse:
-                # Only pulse with probability based on degree
-                if random.random() < degree:
-                    par.pulse()
-            elif par.isToggle:
-                # Only toggle with probability based on degree
-                if random.random() < degree:
-                    par.val = random.choice([True, False])
-            elif par.isMenu:
-                # Only change menu with probability based on degree
-                if random.random() < degree:
-                    par.menuIndex = random.randint(0, len(par.menuLabels)-1)
+        self.parent.debug("Randomizing controls of type '%s' with degree %s...", type, degree)
+        if self.plans is None:
+            self.buildPlans()
+        plan = self.plans.get(type)
+        if not plan:
+            return
+        if any(not par.valid for par in plan.numeric):
+            # Target's parameters were rebuilt since setup
+            self.buildPlans()
+            plan = self.plans[type]
+
+        n_numeric = len(plan.numeric)
+        n_switch = len(plan.pulses) + len(plan.toggles) + len(plan.menus)
+        draws = self.rng.random(n_numeric + n_switch + len(plan.toggles))
+        current = np.fromiter((par.normVal for par in plan.numeric), dtype=float, count=n_numeric)
+        # Blend between current value and random value based on degree, within bounds
+        targets = np.clip(current + (draws[:n_numeric] - current) * degree, 0.0, 1.0).tolist()
+        fire = (draws[n_numeric:n_numeric + n_switch] < degree).tolist()
+        coins = (draws[n_numeric + n_switch:] < 0.5).tolist()
+        choices = (self.rng.random(len(plan.menus)) * np.asarray(plan.menu_sizes)).astype(int).tolist()
+
+        self.applyNumeric(plan.numeric, targets)
+
+        # Pulses, toggles and menus only change with probability based on degree
+        n_pulses = len(plan.pulses)
+        n_toggles = len(plan.toggles)
+        for par, go in zip(plan.pulses, fire):
+            if go:
+                par.pulse()
+        for par, go, coin in zip(plan.toggles, fire[n_pulses:], coins):
+            if go:
+                par.val = coin
+        for par, go, index, size in zip(plan.menus, fire[n_pulses + n_toggles:], choices, plan.menu_sizes):
+            if go and size:
+                par.menuIndex = index
         return
 
+    @property
+    def glide_time(self) -> float:
+        """Seconds a randomize glides over: the fade-time fader, when glide is on."""
+        preset_manager = self.parent.preset_manager
+        if not self.config.randomize_glide or preset_manager is None:
+            return 0.0
+        return preset_manager.fade_time
+
+    def applyNumeric(self, pars, targets):
+        """Jump or glide to normalized targets; OnValueChange coalesces the sends into one flush."""
+        self.parent.tween_engine.add(pars, targets, self.glide_time)
+
     def randomize(self, index):
         """
         Trigger a specific randomization function by index
@@ -117,7 +183,7 @@ class RandomizeManager:
                 self.parent.osc_manager.sendOSC('/add_random', [
                     i+1, button, x, y, width, height, *self.config.color
                 ])
-                self.parent.debug(f"Added random button {button} to OSC at position ({x}, {y})")
+                self.parent.debug("Added random button %s to OSC at position (%s, %s)", button, x, y)
         
         # Add randomization amount slider
         self.parent.osc_manager.sendOSC('/modify_control', [
@@ -0,0 +1,221 @@
+"""
+BasicTouch extension - Snapshot store module.
+Built-in presets for when no external preset system is connected.
+
+A snapshot is the normVal of every numeric parameter of the target, plus the
+state of its toggles (0 or 1) and menus (menuIndex), stored as one fixed-layout
+float32 record. All records of a target live in a single
+memory-mapped file; a small JSON index next to it holds the record layout
+(parameter names) and which record belongs to which preset name.
+
+Parameters are resolved once by bind(), so recall is one array read handed to
+the tween engine, without looking anything up by name. Toggles and menus have
+no values in between; they are set at recall, whatever the fade time. Columns of parameters
+the target no longer has are kept, so their values come back with them.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+STORE_VERSION = 1
+RECORD_DTYPE = np.float32
+
+
+class SnapshotStore:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.folder = os.path.join(project.folder, 'BasicTouchPresets')
+        stem = re.sub(r'[^\w.-]+', '_', self.config.base_comp_path.strip('/')) or 'default'
+        self.index_path = os.path.join(self.folder, stem + '.json')
+        self.data_path = os.path.join(self.folder, stem + '.f32')
+
+        self.pars = []     # bound numeric Pars
+        self.slots = np.empty(0, dtype=np.intp)  # column of each bound numeric Par
+        self.switches = []  # bound toggle and menu Pars
+        self.switch_slots = np.empty(0, dtype=np.intp)
+        self.columns = []  # parameter names, in record order, including vanished ones
+        self.presets = {}  # preset name -> record number
+        self.revision = 0  # bumped on every change, the preset list's change token
+        self.capacity = 0
+        self.data = None   # np.memmap of shape (capacity, len(columns))
+        self._load()
+
+    def names(self):
+        """Preset names in the order they were first saved."""
+        return list(self.presets)
+
+    def bind(self):
+        """Resolve the target's numeric, toggle and menu parameters as the record layout.
+
+        Called once per setup; records get a column for every new parameter.
+        """
+        base_comp = self.parent.base_comp
+        pars, switches = [], []
+        for row in self.parent.layout_manager.rows:
+            par = base_comp.par[row.name]
+            if par is None:
+                continue
+            if par.isNumber:
+                pars.append(par)
+            elif par.isToggle or par.isMenu:
+                switches.append(par)
+        known = set(self.columns)
+        added = [par.name for par in pars + switches if par.name not in known]
+        if added:
+            self._relayout(self.columns + added)
+        columns = {name: i for i, name in enumerate(self.columns)}
+        self.slots = np.fromiter((columns[par.name] for par in pars), dtype=np.intp, count=len(pars))
+        self.switch_slots = np.fromiter((columns[par.name] for par in switches),
+                                        dtype=np.intp, count=len(switches))
+        self.pars = pars
+        self.switches = switches
+
+    def capture(self, name: str) -> bool:
+        """Store the current values under `name`, replacing an existing snapshot."""
+        if not self.pars and not self.switches:
+            self.parent.debug("No parameters to snapshot")
+            return False
+        row = self.presets.get(name)
+        if row is None:
+            row = self._free_row()
+            self.data[row] = np.nan
+        # Replacing a snapshot keeps its values of parameters not bound now
+        self.data[row, self.slots] = np.fromiter((par.normVal for par in self.pars),
+                                                 dtype=RECORD_DTYPE, count=len(self.pars))
+        self.data[row, self.switch_slots] = np.fromiter(
+            (par.menuIndex if par.isMenu else bool(par.eval()) for par in self.switches),
+            dtype=RECORD_DTYPE, count=len(self.switches))
+        self.data.flush()
+        self.presets[name] = row
+        self.revision += 1
+        self._save_index()
+        return True
+
+    def recall(self, name: str, fade_time: float = 0.0) -> bool:
+        """Move every stored parameter to the snapshot.
+
+        Numeric parameters glide over fade_time seconds; toggles and menus are set at once.
+        """
+        row = self.presets.get(name)
+        if row is None:
+            return False
+        values = np.asarray(self.data[row, self.slots], dtype=float)
+        # Columns unknown to an older snapshot are NaN and stay where they are;
+        # so do parameters that no longer follow the surface
+        live = ~np.isnan(values) & np.fromiter(
+            (par.valid and par.mode == ParMode.CONSTANT for par in self.pars),
+            dtype=bool, count=len(self.pars))
+        pars = self.pars
+        indices = np.flatnonzero(live).tolist()
+        self.parent.tween_engine.add([pars[i] for i in indices],
+                                     values[live].tolist(), fade_time)
+        self._set_switches(np.asarray(self.data[row, self.switch_slots], dtype=float))
+        return True
+
+    def _set_switches(self, values):
+        """Set toggles and menus to their stored state; NaN (not stored) leaves them alone."""
+        for par, value in zip(self.switches, values.tolist()):
+            if value != value or not par.valid or par.mode != ParMode.CONSTANT:
+                continue
+            if par.isMenu:
+                par.menuIndex = int(value)
+            else:
+                par.val = value >= 0.5
+
+    def delete(self, name: str) -> bool:
+        """Forget a snapshot; its record is reused by the next capture."""
+        if self.presets.pop(name, None) is None:
+            return False
+        self.revision += 1
+        self._save_index()
+        return True
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.parent.log.warning("Preset index unreadable, starting empty: %s", e)
+            return
+        if index.get('version') != STORE_VERSION:
+            return
+        self.columns = index['columns']
+        self.presets = index['presets']
+        self.capacity = index['capacity']
+        self._map()
+
+    def _map(self):
+        """(Re)open the data file for the current capacity and columns."""
+        if self.data is not None:
+            self.data.flush()
+            self.data = None
+        if not self.capacity or not self.columns:
+            return
+        size = self.capacity * len(self.columns) * np.dtype(RECORD_DTYPE).itemsize
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.data_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.data = np.memmap(self.data_path, dtype=RECORD_DTYPE, mode='r+',
+                              shape=(self.capacity, len(self.columns)))
+
+    def _free_row(self) -> int:
+        used = set(self.presets.values())
+        for row in range(self.capacity):
+            if row not in used:
+                return row
+        row = self.capacity
+        self.capacity = max(8, self.capacity * 2)
+        self._map()
+        return row
+
+    def _relayout(self, columns):
+        """Rewrite every record for a new column layout, moving values by parameter name.
+
+        The new data is written to a temporary file that replaces the old one
+        once its mapping is closed; Windows cannot replace a mapped file.
+        """
+        data = np.full((self.capacity, len(columns)), np.nan, dtype=RECORD_DTYPE)
+        if self.data is not None:
+            old_columns = {name: i for i, name in enumerate(self.columns)}
+            for j, name in enumerate(columns):
+                i = old_columns.get(name)
+                if i is not None:
+                    data[:, j] = self.data[:, i]
+            self.data.flush()
+            self.data = None
+        if self.capacity:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp = self.data_path + '.tmp'
+            data.tofile(tmp)
+            os.replace(tmp, self.data_path)
+        self.columns = columns
+        self._map()
+        if self.presets:
+            self.parent.debug("Snapshots remapped to %s parameters", len(columns))
+        self._save_index()
+
+    def _save_index(self):
+        index = {
+            'version': STORE_VERSION,
+            'columns': self.columns,
+            'presets': self.presets,
+            'capacity': self.capacity,
+        }
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            self.parent.log.warning("Could not write preset index: %s", e)
@@ -0,0 +1,186 @@
+"""
+BasicTouch extension - Stats module.
+Cheap always-on counters and latency histograms.
+
+Counters are plain dict increments keyed by name; OSC traffic is counted per
+address class (the address without its trailing control number, so /fader3
+and /fader12 are both /fader). Timings go into fixed-bucket histograms, which
+cost one bisect per sample and report percentiles as bucket upper bounds.
+
+The numbers are published to the `stats` table DAT every stats_interval
+frames, and sent to the surface as a /stats reply when it asks with /stats.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import re
+import time
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets, in milliseconds; one more bucket
+# collects everything slower
+BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+              25.0, 50.0, 100.0, 250.0, 1000.0)
+
+_TRAILING_INDEX = re.compile(r'\d+$')
+# Bytes of a /stats reply message besides its name/value pairs, inside a
+# bundle: bundle header and element size, address, <first>, fixed type tags
+_REPLY_OVERHEAD = 40
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th (0..1) sample, at most the maximum."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class Stats:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self.table = op('stats') or self._createTable()
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.perf_counter()
+        self._keys = {'in': {}, 'out': {}}  # direction -> address -> counter names
+        self._publish_scheduled = False
+        self._stopped = False
+        self.schedulePublish()
+
+    # -----------------------
+    # Recording
+    # -----------------------
+    def count(self, name: str, n: int = 1):
+        counters = self.counters
+        counters[name] = counters.get(name, 0) + n
+
+    def message(self, direction: str, address: str, nbytes: int = 0):
+        """Count one OSC message ('in' or 'out') and its size under its address class."""
+        keys = self._keys[direction].get(address)
+        if keys is None:
+            cls = _TRAILING_INDEX.sub('', address) if isinstance(address, str) else '?'
+            keys = (f'{direction} {cls}', f'{direction} bytes {cls}')
+            if len(self._keys[direction]) < 4096:
+                self._keys[direction][address] = keys
+        counters = self.counters
+        counters[keys[0]] = counters.get(keys[0], 0) + 1
+        if nbytes:
+            counters[keys[1]] = counters.get(keys[1], 0) + nbytes
+
+    def time(self, name: str, start: float):
+        """Record the time since `start` (a time.perf_counter() value) under name."""
+        ms = (time.perf_counter() - start) * 1000.0
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(ms)
+        if self.parent.profiler.capturing:
+            self.parent.profiler.span(name, start)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+        self.started = time.perf_counter()
+
+    # -----------------------
+    # Reporting
+    # -----------------------
+    def values(self):
+        """(name, value) pairs of everything recorded, for the table and the OSC reply."""
+        values = [('uptime s', round(time.perf_counter() - self.started, 1))]
+        values.extend(sorted(self.counters.items()))
+        # Outbound value pipeline (deadband, coalescing, echoes)
+        for name, value in self.parent.parameter_manager.counters.items():
+            values.append((f'values {name}', value))
+        values.extend(self.parent.latency_probe.values())
+        for name, histogram in sorted(self.histograms.items()):
+            values.append((f'{name} count', histogram.count))
+            for label, value in (('mean', histogram.mean_ms), ('p50', histogram.percentile(0.5)),
+                                 ('p95', histogram.percentile(0.95)), ('p99', histogram.percentile(0.99)),
+                                 ('max', histogram.max_ms)):
+                values.append((f'{name} {label} ms', round(value, 3)))
+        return values
+
+    def publish(self):
+        """Write the current numbers to the stats table DAT in one bulk operation."""
+        if self.table is None:
+            return
+        self.table.clear()
+        self.table.appendRows([['stat', 'value']] + [[name, value] for name, value in self.values()])
+
+    def _createTable(self):
+        """Add the stats table DAT to the component when it lacks one (older .tox files)."""
+        try:
+            table = self.parent.ownerComp.create(tableDAT, 'stats')
+        except Exception as e:
+            self.parent.log.warning("No stats DAT and could not create one, stats are only sent on /stats: %s", e)
+            return None
+        self.parent.log.warning("No stats DAT in %s, created one", self.parent.ownerComp.path)
+        return table
+
+    def schedulePublish(self):
+        interval = self.config.stats_interval
+        if interval > 0 and self.table is not None and not self._publish_scheduled and not self._stopped:
+            self._publish_scheduled = True
+            run("args[0]._publishTick()", self, delayFrames=interval)
+
+    def _publishTick(self):
+        self._publish_scheduled = False
+        if self._stopped:
+            return
+        self.publish()
+        self.schedulePublish()
+
+    def stop(self):
+        """End periodic publishing; called when the extension is torn down."""
+        self._stopped = True
+
+    def reply(self):
+        """Answer a /stats request with /stats <first> <name> <value> ... messages.
+
+        Each message fits a bundle of bundle_size bytes; <first> is the index of
+        its first name/value pair, so 0 starts a new reply.
+        """
+        limit = self.config.bundle_size - _REPLY_OVERHEAD
+        messages = []
+        args, size = [0], 0
+        for n, (name, value) in enumerate(self.values()):
+            name = str(name)
+            # Padded string, float, and their two type tags
+            pair = (len(name.encode('utf-8')) + 4) // 4 * 4 + 4 + 2
+            if size and size + pair > limit:
+                messages.append(args)
+                args, size = [n], 0
+            args += [name, float(value)]
+            size += pair
+        messages.append(args)
+        for args in messages:
+            self.parent.osc_manager.sendOSC('/stats', args)
@@ -0,0 +1,136 @@
+"""
+BasicTouch extension - Tween module.
+Frame-driven transitions of parameter values, shared by presets and randomize.
+
+All active tweens live in parallel arrays (start, target, start time,
+duration, curve) and advance together in one vectorized step per frame;
+finished tweens are retired by compacting the arrays. Values are
+normalized (Par.normVal) so every numeric parameter tweens the same way.
+
+Created by: @from.vacuum aka Serhiy P.
+
+Licence: CC0
+"""
+import time
+
+import numpy as np
+
+CURVES = {'linear': 0, 'smooth': 1, 'ease_in': 2, 'ease_out': 3}
+
+
+class TweenEngine:
+    def __init__(self, parent):
+        self.parent = parent
+        self.config = parent.config
+        self._scheduled = False
+        self.clear()
+
+    def clear(self):
+        """Drop every tween in flight, leaving parameters where they are."""
+        self.pars = []
+        self._slots = {}  # par name -> index into the arrays
+        self.start = np.empty(0)
+        self.target = np.empty(0)
+        self.t0 = np.empty(0)
+        self.duration = np.empty(0)
+        self.curve = np.empty(0, dtype=np.int8)
+
+    @property
+    def active(self) -> int:
+        return len(self.pars)
+
+    def add(self, pars, targets, duration: float, curve='smooth'):
+        """Tween each Par's normVal to its target over `duration` seconds.
+
+        A Par already in flight is retargeted from where it is now. With no
+        duration the targets are written right away.
+        """
+        if duration <= 0:
+            self.cancel(pars)
+            for par, value in zip(pars, targets):
+                par.normVal = value
+            return
+
+        now = time.perf_counter()
+        code = CURVES[curve]
+        new_pars, new_targets = [], []
+        for par, value in zip(pars, targets):
+            slot = self._slots.get(par.name)
+            if slot is None:
+                new_pars.append(par)
+                new_targets.append(value)
+                continue
+            self.start[slot] = par.normVal
+            self.target[slot] = value
+            self.t0[slot] = now
+            self.duration[slot] = duration
+            self.curve[slot] = code
+
+        if new_pars:
+            n = len(new_pars)
+            first = len(self.pars)
+            self.pars.extend(new_pars)
+            self._slots.update((par.name, first + i) for i, par in enumerate(new_pars))
+            self.start = np.concatenate((self.start, [par.normVal for par in new_pars]))
+            self.target = np.concatenate((self.target, new_targets))
+            self.t0 = np.concatenate((self.t0, np.full(n, now)))
+            self.duration = np.concatenate((self.duration, np.full(n, float(duration))))
+            self.curve = np.concatenate((self.curve, np.full(n, code, dtype=np.int8)))
+
+        self._schedule()
+
+    def cancel(self, pars=None):
+        """Stop tweening the given Pars (all when None), e.g. when the surface takes over."""
+        if not self._slots:
+            return
+        if pars is None:
+            self.clear()
+            return
+        keep = np.ones(len(self.pars), dtype=bool)
+        for par in pars:
+            slot = self._slots.get(par.name)
+            if slot is not None:
+                keep[slot] = False
+        if not keep.all():
+            self._compact(keep)
+
+    def step(self):
+        """Advance every tween to the current time and retire the finished ones."""
+        self._scheduled = False
+        if not self.pars:
+            return
+
+        progress = np.clip((time.perf_counter() - self.t0) / self.duration, 0.0, 1.0)
+        eased = np.select(
+            [self.curve == 1, self.curve == 2, self.curve == 3],
+            [progress * progress * (3.0 - 2.0 * progress),
+             progress * progress,
+             progress * (2.0 - progress)],
+            progress)
+        values = (self.start + (self.target - self.start) * eased).tolist()
+
+        pars = self.pars
+        for i, value in enumerate(values):
+            if pars[i].valid:
+                pars[i].normVal = value
+
+        done = progress >= 1.0
+        if done.any():
+            # Invalid Pars (target rebuilt) are retired too
+            self._compact(~done & np.fromiter((par.valid for par in pars), dtype=bool, count=len(pars)))
+        if self.pars:
+            self._schedule()
+
+    def _compact(self, keep):
+        self.pars = [par for par, k in zip(self.pars, keep) if k]
+        self._slots = {par.name: i for i, par in enumerate(self.pars)}
+        self.start = self.start[keep]
+        self.target = self.target[keep]
+        self.t0 = self.t0[keep]
+        self.duration = self.duration[keep]
+        self.curve = self.curve[keep]
+
+    def _schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            run("args[0].step()", self, delayFrames=1)
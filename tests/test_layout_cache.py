@@ -0,0 +1,59 @@
+"""
+Layout cache on the TouchDesigner stand-in runtime: hits and pruning of BasicTouchCache/.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+
+
+def cached_extension(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    runtime.addTarget(TARGET, touchdesigner.target_pars(20))
+    ext = runtime.createExtension(Base=TARGET, Layoutcache=True)
+    ext.Start(full=True)
+    runtime.settle()
+    return runtime, ext
+
+
+def entries(cache):
+    return sorted(name for name in os.listdir(cache.folder) if name.endswith('.json'))
+
+
+def test_second_start_is_a_cache_hit(tmp_path):
+    runtime, ext = cached_extension(tmp_path)
+    cache = ext.layout_cache
+    signature = cache.signature()
+    assert entries(cache) == [f'{signature}.json']
+    table, controls = cache.load(signature)
+    assert table == ext.layout_manager.commit()
+    assert set(controls) == set(ext.osc_manager.layoutMessages(1))
+
+
+def test_prune_keeps_the_most_recently_used(tmp_path):
+    runtime, ext = cached_extension(tmp_path)
+    cache = ext.layout_cache
+    signature = cache.signature()
+    table, controls = cache.load(signature)
+    for n in range(5):
+        cache.store(f'old{n}', table, controls)
+        os.utime(cache.path(f'old{n}'), (1000 + n, 1000 + n))
+    os.utime(cache.path(signature), (0, 0))
+
+    # A hit marks the entry as used
+    assert cache.load(signature) is not None
+    cache.prune(keep=3)
+    assert entries(cache) == [f'{signature}.json', 'old3.json', 'old4.json']
+
+
+def test_store_caps_the_folder(tmp_path):
+    runtime, ext = cached_extension(tmp_path)
+    cache = ext.layout_cache
+    table, controls = cache.load(cache.signature())
+    cache.max_entries = 4
+    for n in range(10):
+        cache.store(f'entry{n}', table, controls)
+    assert len(entries(cache)) == 4
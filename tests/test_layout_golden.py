@@ -0,0 +1,165 @@
+"""
+Golden tests for the in-memory layout model.
+
+golden/layout.json holds param_control tables produced by the original
+cell-at-a-time Layout for several targets, every supported style, with
+Scale Controls Height on and off and two Appearance settings. The row model
+plus commit() must give identical layout cells and the same warnings.
+
+Regenerate (only when the expected layout is meant to change) from a copy of
+the original module:
+
+    git show 3198bf4:sources/Layout.py > /tmp/Layout_baseline.py
+    python tests/test_layout_golden.py --regenerate /tmp/Layout_baseline.py
+"""
+import json
+import os
+import random
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'layout.json')
+COMPARED = ['name', 'mode', 'control_type', 'control_index', 'address', 'x', 'y', 'width', 'height']
+
+APPEARANCES = {
+    'landscape': {'doc_width': 1024.0, 'doc_height': 768.0, 'min_control_height': 60.0},
+    'portrait': {'doc_width': 768.0, 'doc_height': 1366.0, 'min_control_height': 100.0},
+}
+
+# Rows of one parameter per supported style, as the Parameter DAT lists them:
+# (name suffixes, style, size)
+STYLES = {
+    'float': ([''], 'Float', '1'),
+    'int': ([''], 'Int', '1'),
+    'pulse': ([''], 'Pulse', '1'),
+    'toggle': ([''], 'Toggle', '1'),
+    'momentary': ([''], 'Momentary', '1'),
+    'menu': ([''], 'Menu', '1'),
+    'float2': (['1', '2'], 'Float', '2'),
+    'xy': (['x', 'y'], 'XY', '2'),
+    'xyz': (['x', 'y', 'z'], 'XYZ', '3'),
+    'xyzw': (['x', 'y', 'z', 'w'], 'XYZW', '4'),
+    'rgb': (['r', 'g', 'b'], 'RGB', '3'),
+    'rgba': (['r', 'g', 'b', 'a'], 'RGBA', '4'),
+}
+
+
+def source_table(kinds):
+    rows = [['name', 'label', 'style', 'size', 'mode']]
+    for n, kind in enumerate(kinds, 1):
+        suffixes, style, size = STYLES[kind]
+        for suffix in suffixes:
+            rows.append([f'P{n}{suffix}', f'Param {n}', style, size, 'constant'])
+    return rows
+
+
+def targets():
+    """Parameter sets: every style, a few controls (where scaling shows), mixed, and over the limits."""
+    rng = random.Random(7)
+    return {
+        'every_style': source_table(list(STYLES)),
+        'few_controls': source_table(['float', 'toggle', 'rgb']),
+        'faders_buttons': source_table(['float'] * 6 + ['toggle', 'pulse', 'momentary'] * 3 + ['int'] * 3),
+        'pads_colors': source_table(['xy', 'rgb', 'float2', 'rgba', 'xyz', 'menu', 'xy', 'xyzw']),
+        'mixed_random': source_table([rng.choice(list(STYLES)) for _ in range(30)]),
+        'over_limits': source_table(['float'] * 20 + ['rgb'] * 4 + ['xy'] * 5 + ['menu'] * 5 + ['pulse'] * 18),
+        'empty': source_table([]),
+    }
+
+
+def cases():
+    for target, table in targets().items():
+        for appearance, settings in APPEARANCES.items():
+            for scale in (0, 1):
+                yield {
+                    'name': f'{target}-{appearance}-scale{scale}',
+                    'settings': dict(settings, scale_controls_height=scale),
+                    'source': table,
+                }
+
+
+def param_mode(par):
+    """Deterministic spread of modes, so mode cells are not all the same."""
+    return ('constant', 'constant', 'expression', 'readonly')[sum(map(ord, par.name)) % 4]
+
+
+def make_parent(table, settings):
+    """Parent extension with the config fields Layout reads; records warning dialogs.
+
+    The target has a Par for every parameter row of the table.
+    """
+    config = types.SimpleNamespace(
+        padding=10.0, tab_bar_height=50.0, paging=False,
+        control_limits={"label": 24, "fader": 16, "button": 16, "color": 3, "radio": 4, "xy": 4},
+        **settings)
+    base_comp = touchdesigner.COMP('/project1/target')
+    for row in table[1:]:
+        base_comp.addPar(row[0], 'Float')
+    parent = types.SimpleNamespace(config=config, base_comp=base_comp,
+                                   params_dat=touchdesigner.TableDAT('/project1/BasicTouch/param_control', table))
+    parent.dialogs = []
+    parent.debug = lambda *args: None
+    parent.showWarningDialog = lambda message, title='': parent.dialogs.append([message, title])
+    parent.parameter_manager = types.SimpleNamespace(param_mode=param_mode)
+    return parent
+
+
+def columns(table, names):
+    header = table[0] if table else []
+    index = [header.index(name) for name in names]
+    return [[row[i] for i in index] for row in table[1:]]
+
+
+def load_golden():
+    with open(GOLDEN, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('case', load_golden() if os.path.exists(GOLDEN) else [],
+                         ids=lambda case: case['name'])
+def test_row_model_matches_original_layout(case):
+    layout_module = touchdesigner.ModuleDAT('', 'Layout').module
+    parent = make_parent(case['source'], case['settings'])
+    layout = layout_module.Layout(parent)
+    layout.calculatePages()
+    layout.commit()
+
+    table = parent.params_dat.table()
+    assert columns(table, COMPARED) == columns(case['expected'], COMPARED)
+    assert parent.dialogs == case['dialogs']
+
+
+def test_golden_covers_every_style_and_setting():
+    golden = load_golden()
+    styles = {row[2] for case in golden for row in case['source'][1:]}
+    assert styles == {style for _, style, _ in STYLES.values()}
+    assert {case['settings']['scale_controls_height'] for case in golden} == {0, 1}
+    by_name = {case['name']: case['expected'] for case in golden}
+    assert by_name['few_controls-portrait-scale0'] != by_name['few_controls-portrait-scale1']
+    assert {(case['settings']['doc_width'], case['settings']['doc_height']) for case in golden} == {
+        (s['doc_width'], s['doc_height']) for s in APPEARANCES.values()}
+
+
+def regenerate(baseline_path):
+    baseline = touchdesigner.ModuleDAT('', 'Layout', file=baseline_path).module
+    golden = []
+    for case in cases():
+        parent = make_parent(case['source'], case['settings'])
+        layout = baseline.Layout(parent)
+        layout.calculateControlInfo()
+        layout.calculateControlPositions()
+        golden.append(dict(case, expected=parent.params_dat.table(), dialogs=parent.dialogs))
+    with open(GOLDEN, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=1)
+    print(f'{len(golden)} cases written to {GOLDEN}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != '--regenerate':
+        sys.exit(__doc__)
+    regenerate(sys.argv[2])
@@ -0,0 +1,167 @@
+"""
+Extension lifecycle on the TouchDesigner stand-in runtime (benchmarks/touchdesigner.py):
+re-initialization, teardown and the jobs that reschedule themselves.
+"""
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+
+
+@pytest.fixture
+def runtime(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    runtime.addTarget(TARGET, touchdesigner.target_pars(20))
+    return runtime
+
+
+def scheduled(runtime, code):
+    return sum(1 for item in runtime._queue if item[2].endswith(code))
+
+
+def run_frames(runtime, frames):
+    for _ in range(frames):
+        runtime.step()
+
+
+def test_teardown_stops_stats_publishing(runtime):
+    ext = runtime.createExtension(Base=TARGET)
+    assert scheduled(runtime, '._publishTick()') == 1
+    ext.onDestroyTD()
+    run_frames(runtime, 200)
+    assert scheduled(runtime, '._publishTick()') == 0
+
+
+def test_reinit_keeps_one_publish_loop(runtime):
+    for _ in range(3):
+        ext = runtime.createExtension(Base=TARGET)
+        run_frames(runtime, 200)
+        ext.onDestroyTD()
+    ext = runtime.createExtension(Base=TARGET)
+    run_frames(runtime, 200)
+    assert scheduled(runtime, '._publishTick()') == 1
+
+
+def test_teardown_stops_latency_probe(runtime):
+    ext = runtime.createExtension(Base=TARGET, Latencyprobe=0.5)
+    run_frames(runtime, 100)
+    assert scheduled(runtime, '._probeTick()') == 1
+    sent = ext.latency_probe.paths['udp'].sent
+    ext.onDestroyTD()
+    run_frames(runtime, 200)
+    assert scheduled(runtime, '._probeTick()') == 0
+    assert ext.latency_probe.paths['udp'].sent == sent
+
+
+def test_teardown_shuts_down_preset_reader(runtime):
+    callbacks = types.SimpleNamespace(readPresets=lambda: ['a', 'b'], presetsToken=lambda: 1)
+    runtime.add(types.SimpleNamespace(path='/project1/callbacks', module=callbacks))
+    ext = runtime.createExtension(Base=TARGET, Presetscallbacks='/project1/callbacks', Presetsasync=True)
+    manager = ext.preset_manager
+    manager.refreshPresets(force=True)
+    executor = manager._executor
+    assert executor is not None
+    runtime.settle()
+    assert manager.names == ['a', 'b']
+
+    ext.onDestroyTD()
+    assert manager._executor is None
+    for thread in executor._threads:
+        thread.join(timeout=5)
+    assert not any(t.name.startswith('BasicTouchPresets') for t in threading.enumerate())
+
+
+def test_start_follows_a_changed_target_base(runtime):
+    ext = runtime.createExtension(Base=TARGET)
+    ext.Start(full=True)
+    runtime.settle()
+    assert ext.setup_job.state == 'done'
+
+    other = '/project1/other'
+    runtime.addTarget(other, touchdesigner.target_pars(8, seed=2))
+    runtime.owner.par.Base.val = other
+    job = ext.Start()
+    runtime.settle()
+    assert job.state == 'done'
+    assert job.target == other
+    assert ext.base_comp.path == other
+    assert ext.osc_manager.sent_target == other
+    run_frames(runtime, 200)
+    assert scheduled(runtime, '._publishTick()') == 1
+
+
+def test_missing_stats_dat_is_created(runtime):
+    assert runtime.op('stats') is None
+    ext = runtime.createExtension(Base=TARGET)
+    assert runtime.op('stats') is ext.stats.table
+    assert any('No stats DAT' in record[2] for record in ext.log.records)
+    run_frames(runtime, ext.config.stats_interval)
+    assert ext.stats.table[0, 0].val == 'stat'
+
+
+def test_missing_parameters_are_added_with_defaults(runtime):
+    ext = runtime.createExtension(Base=TARGET, Latencyprobe=0.5)
+    owner = runtime.owner
+    page = owner.customPages[0]
+    assert page.name == 'Advanced'
+    extra = {name: default for name, _, default, _ in module_globals(ext)['EXTRA_PARS']}
+    # Given explicitly (the stand-in's defaults and Latencyprobe) are left alone
+    assert [par.name for par in page.pars] == [
+        name for name in extra if name not in ('Paging', 'Layoutcache', 'Latencyprobe')]
+    for par in page.pars:
+        assert par.eval() == extra[par.name]
+    assert owner.par.Latencyprobe.eval() == 0.5
+    assert not ext.config.presets_async and ext.config.log_echo
+    assert ext.config.profile_window == 10.0
+
+    ext.onDestroyTD()
+    runtime.createExtension(Base=TARGET, Latencyprobe=0.5)
+    owner.par.Profile.val = True
+    ext = type(ext)(owner)
+    assert len(owner.customPages) == 1
+    assert owner.par.Profile.eval() is True
+
+
+def module_globals(ext):
+    """Globals of the module the extension was loaded from (module DATs are not in sys.modules)."""
+    return type(ext).__init__.__globals__
+
+
+def test_teardown_ends_a_running_profile(runtime):
+    ext = runtime.createExtension(Base=TARGET, Profile=True)
+    ext.Start()
+    assert ext.profiler.capturing
+    ext.onDestroyTD()
+    assert not ext.profiler.capturing
+    assert sys.getprofile() is None
+    assert all(os.path.exists(path) for path in ext.profiler.last_files)
+
+
+def test_reinit_profile_is_not_ended_by_the_old_instance(runtime):
+    ext = runtime.createExtension(Base=TARGET, Profile=True, Profilewindow=0.5)
+    ext.Start()
+    while ext.setup_job.running:
+        runtime.step()
+    old_profiler = ext.profiler
+    run_frames(runtime, 10)
+
+    other = '/project1/other'
+    runtime.addTarget(other, touchdesigner.target_pars(8, seed=2))
+    runtime.owner.par.Base.val = other
+    ext.Start()
+    assert not old_profiler.capturing
+    assert ext.profiler is not old_profiler and ext.profiler.capturing
+    while ext.setup_job.running:
+        runtime.step()
+    # Past the old capture's scheduled end, before the new one's
+    run_frames(runtime, 25)
+    assert ext.profiler.capturing
+    assert sys.getprofile() is not None
+    ext.StopProfile()
@@ -0,0 +1,184 @@
+"""
+OSC encoding and routing: cached encodes must match the generic encoder,
+bundles must decode back to their messages, address patterns must match the
+controls OSC 1.0 says they do, and SLIP framing must survive any read
+boundaries.
+"""
+import os
+import random
+import re
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import slip  # noqa: E402
+import touchdesigner  # noqa: E402
+
+OSC = touchdesigner.ModuleDAT('', 'OSC').module
+
+
+def test_static_cache_keys_on_argument_types():
+    encoder = OSC.OSCEncoder()
+    for args in ([1], [True], [1.0], [0], [False], [0.0], ['label', 1], ['label', True]):
+        assert encoder.encode_static('/hide_control', args) == encoder.build('/hide_control', args)
+    assert len(encoder._static) == 8
+
+
+def test_static_cache_reuses_packets():
+    encoder = OSC.OSCEncoder()
+    first = encoder.encode_static('/hide_control', ['fader', 3])
+    assert encoder.encode_static('/hide_control', ('fader', 3)) is first
+
+
+def test_templates_match_generic_encoding():
+    encoder = OSC.OSCEncoder()
+    for args in ([0.5], [1, 2.5], [True, 1], ['x', 1.0, None]):
+        assert encoder.encode('/fader1', args) == encoder.build('/fader1', args)
+
+
+def decode(packet):
+    """(address, args) of every message in a packet, as OnReceiveOSC_TCP dispatches them."""
+    # Decoding keeps no state, so no TouchDesigner runtime is needed
+    return OSC.OSCManager._decode_osc_packet(OSC.OSCManager.__new__(OSC.OSCManager), packet)
+
+
+def test_bundle_round_trip():
+    encoder = OSC.OSCEncoder()
+    messages = [('/fader1', [0.5]), ('/label3', ['Level', 1]), ('/xy1', [0.25, 0.75])]
+    packet = encoder.bundle([encoder.encode(address, args) for address, args in messages])
+    assert packet.startswith(OSC.BUNDLE_TAG + OSC.TIMETAG_IMMEDIATE)
+    assert decode(packet) == messages
+
+
+def test_nested_bundles_decode_in_order():
+    encoder = OSC.OSCEncoder()
+    inner = encoder.bundle([encoder.encode('/fader2', [1.0]), encoder.encode('/fader3', [0.0])])
+    outer = encoder.bundle([encoder.encode('/fader1', [0.5]), inner, encoder.encode('/page', [2])])
+    assert decode(outer) == [('/fader1', [0.5]), ('/fader2', [1.0]), ('/fader3', [0.0]), ('/page', [2])]
+
+
+def test_bundle_time_tags_are_kept_and_dispatched_at_once():
+    encoder = OSC.OSCEncoder()
+    # NTP time, one second past the 1900 epoch
+    timetag = struct.pack('>II', 1, 0)
+    packet = encoder.bundle([encoder.encode('/fader1', [0.5])], timetag)
+    assert packet[8:16] == timetag
+    assert decode(packet) == [('/fader1', [0.5])]
+
+
+def test_truncated_bundle_is_rejected():
+    encoder = OSC.OSCEncoder()
+    packet = encoder.bundle([encoder.encode('/fader1', [0.5]), encoder.encode('/fader2', [0.5])])
+    with pytest.raises(ValueError):
+        decode(packet[:-4])
+
+
+def test_bundles_stay_within_max_size():
+    encoder = OSC.OSCEncoder()
+    packets = [encoder.encode(f'/fader{i}', [i / 100]) for i in range(100)]
+    large = encoder.encode('/label1', ['x' * 600])
+    bundles = list(encoder.bundles(packets[:50] + [large] + packets[50:], 512))
+    # The oversized message goes out on its own, as a plain message
+    assert large in bundles
+    assert all(len(bundle) <= 512 for bundle in bundles if bundle is not large)
+    assert [message for bundle in bundles for message in decode(bundle)] == [
+        decode(packet)[0] for packet in packets[:50] + [large] + packets[50:]]
+    assert list(encoder.bundles(packets[:1], 512)) == packets[:1]
+
+
+ADDRESSES = ['/fader1', '/fader2', '/fader12', '/button1', '/xy1', '/page', '/page/next', '/PBUTTONS/3']
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('/fader*', ['/fader1', '/fader2', '/fader12']),
+    ('/*1', ['/fader1', '/button1', '/xy1']),
+    ('/fader?', ['/fader1', '/fader2']),
+    ('/fader[1-2]', ['/fader1', '/fader2']),
+    ('/fader[!1]', ['/fader2']),
+    ('/[a-c]utton1', ['/button1']),
+    ('/{fader,xy}1', ['/fader1', '/xy1']),
+    ('/page/*', ['/page/next']),
+    ('/*', ['/fader1', '/fader2', '/fader12', '/button1', '/xy1', '/page']),
+    ('/PBUTTONS/[0-9]', ['/PBUTTONS/3']),
+])
+def test_address_patterns(pattern, expected):
+    regex = re.compile(OSC._osc_pattern_to_regex(pattern))
+    assert [address for address in ADDRESSES if regex.fullmatch(address)] == expected
+
+
+def test_pattern_dispatches_to_every_matching_control(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    target = runtime.addTarget('/project1/target', [
+        (name, 'Float', {'value': 0.0, 'label': name}) for name in ('Alpha', 'Beta', 'Gamma')])
+    ext = runtime.createExtension(Base='/project1/target', Scalecontrolsheight=0)
+    ext.Start(full=True)
+    runtime.settle()
+    osc = ext.osc_manager
+    assert len(osc.matchPattern('/fader[1-2]')) == 2
+    assert osc.matchPattern('/fader[1-2]') is osc.matchPattern('/fader[1-2]')
+
+    osc.OnReceiveOSC(None, -1, None, None, None, '/fader{1,3}', [0.5], None)
+    runtime.settle()
+    assert [par.normVal for par in (target.par.Alpha, target.par.Beta, target.par.Gamma)] == [0.5, 0.0, 0.5]
+
+    osc.OnReceiveOSC(None, -1, None, None, None, '/fader[', [1.0], None)
+    assert osc.matchPattern('/fader[') == ()
+    assert ext.stats.counters['in dropped'] == 1
+
+
+def fuzz_stream(rng):
+    """Random bytes biased towards the SLIP special characters."""
+    alphabet = [slip.END, slip.ESC, slip.ESC_END, slip.ESC_ESC, 0x00, 0x2F, 0x41]
+    return bytes(rng.choice(alphabet) if rng.random() < 0.5 else rng.randrange(256)
+                 for _ in range(rng.randrange(0, 64)))
+
+
+def test_slip_round_trip():
+    codec = OSC.SlipCodec()
+    payloads = [b'/fader1\x00', b'\xc0', b'\xdb', b'\xdb\xdc\xc0\xdb\xdd', bytes(range(256))]
+    stream = b''.join(codec.encode(payload) for payload in payloads)
+    assert OSC.SlipCodec().decode(stream) == payloads
+
+
+def test_slip_frames_split_at_an_escape():
+    codec = OSC.SlipCodec()
+    stream = codec.encode(b'a\xc0b') + codec.encode(b'c')
+    escape = stream.index(b'\xdb')
+    assert codec.decode(stream[:escape + 1]) == []
+    assert codec.decode(stream[escape + 1:]) == [b'a\xc0b', b'c']
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_slip_matches_the_per_byte_codec(seed):
+    """The previous per-byte encoder/decoder (benchmarks/slip.py) is the reference."""
+    rng = random.Random(seed)
+    for n in range(500):
+        payload = fuzz_stream(rng)
+        assert OSC.SlipCodec().encode(payload) == slip.legacy_encode(payload), n
+
+        # Raw streams (valid or not) decode like the per-byte loop did
+        stream = fuzz_stream(rng) + b'\xc0'
+        assert OSC.SlipCodec().decode(stream) == slip.legacy_decode(stream), n
+
+        # Arbitrary read boundaries reassemble to the same frames
+        codec = OSC.SlipCodec()
+        frames = []
+        pos = 0
+        while pos < len(stream):
+            step = rng.randrange(1, 8)
+            frames += codec.decode(stream[pos:pos + step])
+            pos += step
+        assert frames == slip.legacy_decode(stream), n
+
+
+def test_slip_buffer_is_compacted_on_a_long_stream():
+    codec = OSC.SlipCodec()
+    frame = codec.encode(b'/fader1\x00' * 8)
+    stream = frame * 200
+    frames = []
+    for pos in range(0, len(stream), 100):
+        frames += codec.decode(stream[pos:pos + 100])
+    assert len(frames) == 200
+    assert len(codec._buf) < codec.COMPACT_THRESHOLD + 100
@@ -0,0 +1,102 @@
+"""
+Outbound value deadband on the TouchDesigner stand-in runtime.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+
+
+@pytest.fixture
+def scene(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    target = runtime.addTarget(TARGET, [
+        ('Level', 'Float', {'value': 0.0, 'label': 'Level'}),
+        ('Count', 'Int', {'value': 0, 'normMax': 10.0, 'label': 'Count'}),
+    ])
+    ext = runtime.createExtension(Base=TARGET, Scalecontrolsheight=0)
+    ext.Start(full=True)
+    runtime.settle()
+    return runtime, target, ext
+
+
+def sends(ext, par, values):
+    manager = ext.parameter_manager
+    sent = 0
+    for value in values:
+        par.normVal = value
+        sent += manager.sendValue(par)
+    return sent
+
+
+def test_jitter_on_a_step_boundary_is_not_resent(scene):
+    runtime, target, ext = scene
+    steps = ext.config.deadband_steps
+    boundary = 100.5 / steps
+    par = target.par.Level
+    assert sends(ext, par, [boundary - 1e-6]) == 1
+    jitter = [boundary + 1e-6, boundary - 1e-6] * 20
+    assert sends(ext, par, jitter) == 0
+
+
+def test_a_full_step_is_resent(scene):
+    runtime, target, ext = scene
+    steps = ext.config.deadband_steps
+    par = target.par.Level
+    assert sends(ext, par, [100 / steps]) == 1
+    assert sends(ext, par, [100.9 / steps]) == 0
+    assert sends(ext, par, [101.01 / steps]) == 1
+    assert sends(ext, par, [100.2 / steps]) == 0
+    assert sends(ext, par, [99.9 / steps]) == 1
+
+
+def test_int_steps_are_exact(scene):
+    runtime, target, ext = scene
+    par = target.par.Count
+    # One step of an int is sent at once, without hysteresis
+    assert sends(ext, par, [0.3, 0.31, 0.4, 0.3]) == 3
+
+
+def test_a_failing_inbound_value_does_not_stall_the_queue(scene):
+    runtime, target, ext = scene
+    manager = ext.parameter_manager
+    manager.queue_parameter_value('level', target.par.Level, ['not a number'])
+    manager.queue_parameter_value('count', target.par.Count, [0.5])
+    runtime.settle()
+    assert target.par.Count.eval() == 5
+    assert manager.counters['applied'] == 1
+    assert ext.stats.counters['in errors'] == 1
+    assert any(level == 40 and 'Level' in msg % args for _, level, msg, args in ext.log.records)
+    assert not manager._drain_scheduled and not manager._inbound
+
+    manager.queue_parameter_value('level', target.par.Level, [0.25])
+    runtime.settle()
+    assert target.par.Level.normVal == pytest.approx(0.25)
+
+
+def test_values_from_the_surface_are_not_echoed_back(scene):
+    runtime, target, ext = scene
+    manager = ext.parameter_manager
+    osc = ext.osc_manager
+    osc.OnReceiveOSC(None, -1, None, None, None, '/fader1', [0.3], None)
+    runtime.settle()
+    assert target.par.Level.normVal == pytest.approx(0.3)
+    assert manager.counters['echoes'] == 1
+    assert manager.counters['sent'] == 0
+
+    # Only that one value is expected back: the next local change goes out
+    target.par.Level.normVal = 0.6
+    runtime.settle()
+    assert manager.counters['sent'] == 1
+
+    # Per control: an echo expected on one does not hold back another
+    osc.OnReceiveOSC(None, -1, None, None, None, '/fader1', [0.1], None)
+    target.par.Count.normVal = 0.5
+    runtime.settle()
+    assert manager.counters['echoes'] == 2
+    assert manager.counters['sent'] == 2
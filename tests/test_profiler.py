@@ -0,0 +1,85 @@
+"""
+Profiler captures around "Setup Controls" on the TouchDesigner stand-in runtime.
+"""
+import cProfile
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+WINDOW_FRAMES = 30  # Profilewindow 0.5 s at 60 fps
+
+
+@pytest.fixture
+def scene(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    runtime.addTarget(TARGET, touchdesigner.target_pars(20))
+    ext = runtime.createExtension(Base=TARGET, Profile=True, Profilewindow=0.5)
+    yield runtime, ext
+    ext.StopProfile()
+
+
+def run_frames(runtime, frames):
+    for _ in range(frames):
+        runtime.step()
+
+
+def finish_setup(runtime, ext):
+    """Step until the setup job is over; settle() would also wait for the capture's end."""
+    while ext.setup_job.running:
+        runtime.step()
+
+
+def test_capture_ends_a_window_after_the_setup(scene):
+    runtime, ext = scene
+    ext.Start()
+    finish_setup(runtime, ext)
+    assert ext.profiler.capturing
+    run_frames(runtime, WINDOW_FRAMES)
+    assert not ext.profiler.capturing
+    assert all(os.path.exists(path) for path in ext.profiler.last_files)
+
+
+def test_cancelled_setup_does_not_end_the_capture(scene):
+    runtime, ext = scene
+    ext.Start()
+    assert ext.setup_job.running
+    ext.CancelSetup()
+    run_frames(runtime, WINDOW_FRAMES * 2)
+    assert ext.profiler.capturing
+
+    ext.Start()
+    finish_setup(runtime, ext)
+    assert ext.setup_job.state == 'done'
+    assert ext.profiler.capturing
+    run_frames(runtime, WINDOW_FRAMES)
+    assert not ext.profiler.capturing
+
+
+def test_new_setup_drops_the_previous_scheduled_end(scene):
+    runtime, ext = scene
+    ext.Start()
+    finish_setup(runtime, ext)
+    run_frames(runtime, WINDOW_FRAMES // 2)
+    ext.Start()
+    finish_setup(runtime, ext)
+    run_frames(runtime, WINDOW_FRAMES // 2 + 2)
+    assert ext.profiler.capturing
+    run_frames(runtime, WINDOW_FRAMES)
+    assert not ext.profiler.capturing
+
+
+def test_begin_with_another_profiler_active(scene, monkeypatch):
+    runtime, ext = scene
+
+    def enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, 'enable', enable)
+    ext.StartProfile()
+    assert not ext.profiler.capturing
+    assert any('Could not start profiling' in record[2] for record in ext.log.records)
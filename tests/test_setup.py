@@ -0,0 +1,42 @@
+"""
+"Setup Controls" on the TouchDesigner stand-in runtime: full setups and diff re-setups.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+
+
+@pytest.fixture
+def scene(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    runtime.addTarget(TARGET, touchdesigner.target_pars(20))
+    ext = runtime.createExtension(Base=TARGET)
+    return runtime, ext
+
+
+def setup_bytes(runtime, ext, **kwargs):
+    """Bytes a setup put on the wire (each frame's messages go out as one bundle)."""
+    runtime.udp.reset()
+    ext.Start(**kwargs)
+    runtime.settle()
+    assert ext.setup_job.state == 'done'
+    return runtime.udp.bytes
+
+
+def test_setup_controls_resends_everything(scene):
+    # A UDP surface that restarted gives no sign of it; pressing the button again must restore it
+    runtime, ext = scene
+    first = setup_bytes(runtime, ext)
+    assert setup_bytes(runtime, ext) == first
+
+
+def test_diff_setup_sends_only_changes(scene):
+    runtime, ext = scene
+    first = setup_bytes(runtime, ext)
+    assert setup_bytes(runtime, ext, full=False) < first / 2
@@ -0,0 +1,114 @@
+"""
+Built-in snapshot store on the TouchDesigner stand-in runtime, across changes of the target's parameters.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+PARS = [(name, 'Float', {'value': 0.0, 'label': name}) for name in ('Alpha', 'Beta', 'Gamma')]
+
+
+@pytest.fixture
+def scene(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    target = runtime.addTarget(TARGET, PARS)
+    ext = runtime.createExtension(Base=TARGET, Nativepresets=True)
+    ext.Start(full=True)
+    runtime.settle()
+    return runtime, target, ext
+
+
+def set_pars(runtime, target, names):
+    """Give the target exactly `names`, keeping the Pars it already has, and set it up again."""
+    existing = target.par._pars
+    for name in list(existing):
+        if name not in names:
+            del existing[name]
+    for name in names:
+        if name not in existing:
+            target.addPar(name, 'Float', value=0.0, label=name)
+    runtime.op('source_parameters')._rows = touchdesigner.TableDAT('', target.source_parameters())._rows
+
+
+def restart(runtime, ext):
+    ext.Start()
+    runtime.settle()
+
+
+def test_values_of_vanished_parameters_survive(scene):
+    runtime, target, ext = scene
+    store = ext.snapshot_store
+    for value, par in zip((0.25, 0.5, 0.75), (target.par.Alpha, target.par.Beta, target.par.Gamma)):
+        par.normVal = value
+    assert store.capture('one')
+
+    set_pars(runtime, target, ['Alpha', 'Gamma', 'Delta'])
+    restart(runtime, ext)
+    assert store.columns == ['Alpha', 'Beta', 'Gamma', 'Delta']
+    target.par.Delta.normVal = 0.125
+    assert store.capture('one')
+
+    set_pars(runtime, target, ['Alpha', 'Beta', 'Gamma', 'Delta'])
+    target.par.Beta.normVal = 0.0
+    restart(runtime, ext)
+    assert store.recall('one')
+    runtime.settle()
+    assert target.par.Beta.normVal == pytest.approx(0.5)
+    assert target.par.Delta.normVal == pytest.approx(0.125)
+
+
+def test_relayout_replaces_the_data_file(scene):
+    runtime, target, ext = scene
+    store = ext.snapshot_store
+    target.par.Alpha.normVal = 0.5
+    store.capture('one')
+    mapped = store.data
+
+    set_pars(runtime, target, ['Alpha', 'Beta', 'Gamma', 'Delta'])
+    restart(runtime, ext)
+    assert store.data is not mapped
+    assert not os.path.exists(store.data_path + '.tmp')
+    assert os.path.getsize(store.data_path) == store.capacity * 4 * 4
+    assert np.isnan(store.data[store.presets['one'], 3])
+
+    # The index and data file reopen with the same layout
+    reopened = type(store)(ext)
+    assert reopened.columns == store.columns
+    assert reopened.data[reopened.presets['one'], 0] == pytest.approx(0.5)
+
+
+def test_toggles_and_menus_are_set_at_recall(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    target = runtime.addTarget(TARGET, PARS[:1] + [
+        ('Enabled', 'Toggle', {'value': False}),
+        ('Shape', 'Menu', {'value': 'circle', 'menuNames': ['circle', 'square', 'star']}),
+    ])
+    ext = runtime.createExtension(Base=TARGET, Nativepresets=True)
+    ext.Start(full=True)
+    runtime.settle()
+    store = ext.snapshot_store
+    assert [par.name for par in store.switches] == ['Enabled', 'Shape']
+
+    target.par.Alpha.normVal = 1.0
+    target.par.Enabled.val = True
+    target.par.Shape.menuIndex = 2
+    assert store.capture('one')
+    assert store.data[store.presets['one'], store.switch_slots].tolist() == [1.0, 2.0]
+
+    target.par.Alpha.normVal = 0.0
+    target.par.Enabled.val = False
+    target.par.Shape.menuIndex = 0
+    assert store.recall('one', fade_time=1.0)
+    # Straight to the stored state, no in-between menu entry or toggle flicker
+    assert target.par.Enabled.eval() is True
+    assert target.par.Shape.menuIndex == 2
+    assert ext.tween_engine.pars == [target.par.Alpha]
+    runtime.settle()
+    assert target.par.Alpha.normVal == pytest.approx(1.0)
+    assert target.par.Shape.eval() == 'star'
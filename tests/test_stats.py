@@ -0,0 +1,34 @@
+"""
+Stats replies on the TouchDesigner stand-in runtime (benchmarks/touchdesigner.py).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+import touchdesigner  # noqa: E402
+
+TARGET = '/project1/target'
+# Bundle header and the element's size field
+BUNDLE_FRAMING = 20
+
+
+def test_reply_is_split_into_bundle_sized_messages(tmp_path):
+    runtime = touchdesigner.Runtime(project_folder=str(tmp_path))
+    runtime.addTarget(TARGET, touchdesigner.target_pars(4))
+    ext = runtime.createExtension(Base=TARGET)
+    for n in range(200):
+        ext.stats.count(f'counter with a fairly long name {n}', n)
+    sent = []
+    ext.osc_manager.sendOSC = lambda address, args, static=False: sent.append((address, args))
+
+    ext.stats.reply()
+
+    assert len(sent) > 1
+    pairs = []
+    for address, args in sent:
+        assert address == '/stats'
+        assert len(ext.osc_manager.encoder.build(address, args)) <= ext.config.bundle_size - BUNDLE_FRAMING
+        assert args[0] == len(pairs)
+        pairs.extend(zip(args[1::2], args[2::2]))
+    assert [name for name, _ in pairs] == [str(name) for name, _ in ext.stats.values()]
+    assert dict(pairs)['counter with a fairly long name 199'] == 199.0